@@ -0,0 +1,67 @@
+"""
+Сравнение скорости парсеров HTML ЕИС (bs4 и lxml).
+
+Запуск:
+    python benchmarks/bench_html_parsers.py [--repeat 200] [--dir tests/fixtures/eis]
+
+В --dir можно положить реальные сохранённые страницы: search_page.html,
+documents.html, print_form.html.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from services.eis_html_parser import PARSERS, get_html_parser
+
+PAGES = {
+    "search_page.html": "parse_search_results",
+    "documents.html": "parse_documents_list",
+    "print_form.html": "parse_print_form",
+}
+
+
+def bench(parser, method: str, html: str, repeat: int) -> float:
+    """Среднее время одного разбора в миллисекундах."""
+    fn = getattr(parser, method)
+    fn(html)  # прогрев
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(html)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--repeat", type=int, default=200)
+    arg_parser.add_argument("--dir", default=str(ROOT / "tests" / "fixtures" / "eis"))
+    args = arg_parser.parse_args()
+
+    parsers = []
+    for name in PARSERS:
+        parser = get_html_parser(name)
+        try:
+            parser.parse_print_form("<p>x</p>")
+        except ImportError as e:
+            print(f"{name}: не установлен ({e})")
+            continue
+        parsers.append(parser)
+
+    print(f"{'страница':<20} {'КБ':>6} " + " ".join(f"{p.name:>10}" for p in parsers))
+    for file_name, method in PAGES.items():
+        path = Path(args.dir) / file_name
+        if not path.exists():
+            continue
+        html = path.read_text(encoding="utf-8")
+        timings = [bench(p, method, html, args.repeat) for p in parsers]
+        print(
+            f"{file_name:<20} {len(html.encode('utf-8')) / 1024:>6.1f} "
+            + " ".join(f"{t:>8.3f}мс" for t in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Время холодного импорта модулей CLI и API (python -X importtime).
+
+Запуск:
+    python benchmarks/bench_import_time.py [--repeat 5] [--top 8] [--budget main=150 ...]
+
+Каждый модуль импортируется в новом процессе repeat раз, берётся медиана
+суммарного времени импорта (без site). Для модуля выводятся самые долгие
+вложенные импорты и «тяжёлые» библиотеки, которые он не должен тянуть
+при старте. Если бюджет превышен или тяжёлая библиотека импортирована,
+скрипт завершается с кодом 1 — его можно запускать в CI.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+
+# Модуль -> бюджет, мс (с накладными расходами самого -X importtime)
+BUDGETS_MS = {
+    "text_extraction": 100,
+    "pipeline": 150,
+    "main": 150,
+}
+
+# Библиотеки, которые загружаются только при первом использовании
+HEAVY_MODULES = ["requests", "bs4", "lxml", "pdfplumber", "pypdfium2", "openpyxl", "docx", "xlrd", "olefile"]
+
+
+def import_profile(module: str) -> list:
+    """Строки -X importtime для импорта модуля: [(self_us, cumulative_us, depth, name)]."""
+    code = (
+        f"import sys; sys.path.insert(0, {str(SRC)!r}); import {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True, cwd=str(SRC)
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    heavy = [m for m in result.stdout.strip().split(",") if m]
+    return rows, heavy
+
+
+def module_block(rows: list, module: str) -> list:
+    """Строки импорта самого модуля: importtime печатает вложенные импорты до родителя."""
+    block = []
+    for row in rows:
+        block.append(row)
+        if row[2] == 0:
+            if row[3] == module:
+                return block
+            block = []
+    return []
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--top", type=int, default=8, help="Сколько самых долгих импортов показать")
+    arg_parser.add_argument(
+        "--budget", action="append", default=[], metavar="МОДУЛЬ=МС",
+        help="Бюджет модуля, мс (можно несколько раз; модуль добавляется к списку)"
+    )
+    args = arg_parser.parse_args()
+
+    budgets = dict(BUDGETS_MS)
+    for item in args.budget:
+        module, _, ms = item.partition("=")
+        budgets[module] = float(ms)
+
+    failed = False
+    for module, budget_ms in budgets.items():
+        totals = []
+        block = []
+        heavy = []
+        for _ in range(args.repeat):
+            rows, heavy = import_profile(module)
+            block = module_block(rows, module)
+            totals.append(block[-1][1] / 1000 if block else 0.0)
+        median_ms = statistics.median(totals)
+        over = median_ms > budget_ms
+        failed = failed or over or bool(heavy)
+
+        status = "ПРЕВЫШЕН" if over else "ok"
+        print(f"\n{module}: {median_ms:.1f} мс (бюджет {budget_ms:.0f} мс) — {status}")
+        if heavy:
+            print(f"  тяжёлые библиотеки при импорте: {', '.join(heavy)}")
+        slowest = sorted(block[:-1], key=lambda row: row[1], reverse=True)[:args.top]
+        for _self_us, cumulative_us, depth, name in slowest:
+            print(f"  {cumulative_us / 1000:>8.1f} мс  {'  ' * (depth - 1)}{name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
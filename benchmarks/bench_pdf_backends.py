@@ -0,0 +1,73 @@
+"""
+Сравнение бэкендов извлечения текста из PDF (pypdfium2, pdfminer, pdfplumber).
+
+Запуск:
+    python benchmarks/bench_pdf_backends.py [--dir папка_с_pdf] [--repeat 3] [--max-pages 0]
+
+В --dir кладутся реальные PDF закупок (ищутся рекурсивно). Для каждого
+бэкенда выводятся файлов и страниц в секунду, МБ/с, объём извлечённого
+текста и число файлов, на которых бэкенд упал.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from text_extraction import PDF_BACKENDS
+
+
+def bench(backend, files, repeat: int, max_pages: int) -> dict:
+    """Суммарные показатели бэкенда по корпусу (лучший из repeat прогонов)."""
+    best = None
+    for _ in range(repeat):
+        pages = chars = failed = 0
+        start = time.perf_counter()
+        for path in files:
+            try:
+                texts = backend(str(path), max_pages)
+            except ImportError:
+                raise
+            except Exception:  # битый файл считается ошибкой бэкенда
+                failed += 1
+                continue
+            pages += len(texts)
+            chars += sum(len(t) for t in texts)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best["elapsed"]:
+            best = {"elapsed": elapsed, "pages": pages, "chars": chars, "failed": failed}
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--dir", default=str(ROOT / "tests" / "fixtures" / "pdf"))
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--max-pages", type=int, default=0, help="Страниц на файл (0 — все)")
+    args = arg_parser.parse_args()
+
+    files = sorted(Path(args.dir).rglob("*.pdf"))
+    if not files:
+        print(f"Нет PDF в {args.dir}")
+        return
+    total_mb = sum(f.stat().st_size for f in files) / 1024 / 1024
+    print(f"Корпус: {len(files)} файлов, {total_mb:.1f} МБ\n")
+
+    print(f"{'бэкенд':<12} {'файл/с':>8} {'стр/с':>8} {'МБ/с':>8} {'символов':>10} {'ошибок':>7}")
+    for name, backend in PDF_BACKENDS.items():
+        try:
+            result = bench(backend, files, args.repeat, args.max_pages)
+        except ImportError as e:
+            print(f"{name:<12} не установлен ({e})")
+            continue
+        elapsed = result["elapsed"] or 1e-9
+        print(
+            f"{name:<12} {len(files) / elapsed:>8.1f} {result['pages'] / elapsed:>8.1f} "
+            f"{total_mb / elapsed:>8.2f} {result['chars']:>10} {result['failed']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -25,14 +25,17 @@ pipeline_instance: Pipeline = None
 async def lifespan(app: FastAPI):
     """
     Управление жизненным циклом приложения.
-    Инициализирует пайплайн при запуске.
+    Инициализирует пайплайн при запуске и останавливает его сервисы при выключении.
     """
     global pipeline_instance
     pipeline_instance = Pipeline()
     pipeline_instance.init_database()
     print("Pipeline initialized for API")
-    yield
-    print("API shutdown")
+    try:
+        yield
+    finally:
+        pipeline_instance.close()
+        print("API shutdown")
 
 
 def create_app() -> FastAPI:
@@ -0,0 +1,124 @@
+"""
+Профили поиска закупок на ЕИС.
+
+Профиль задаёт параметры расширенного поиска: коды ОКПД2, строку
+поиска, размер страницы и произвольные параметры запроса. Профили
+читаются из JSON-файла EIS_SEARCH_PROFILES_PATH (список объектов с
+полями SearchProfile), без файла используется профиль "default" —
+покупка жилья, ОКПД2 68.10.11.
+"""
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+from config.settings import settings
+
+
+SEARCH_RESULTS_URL = "https://zakupki.gov.ru/epz/order/extendedsearch/results.html"
+
+# Размеры страницы, которые принимает ЕИС
+RECORDS_PER_PAGE_CHOICES = (10, 20, 50, 100, 500)
+
+# Общие параметры расширенного поиска:
+#   - sortBy=UPDATE_DATE — сортировка по дате обновления (нужна для отметки обхода)
+#   - fz44=on — только 44-ФЗ
+#   - orderStages=AF — стадия "подача заявок" (AF = Application Filing)
+BASE_SEARCH_PARAMS = {
+    "morphology": "on",
+    "search-filter": "Дате обновления",
+    "sortDirection": "false",
+    "showLotsInfoHidden": "false",
+    "sortBy": "UPDATE_DATE",
+    "fz44": "on",
+    "af": "on",
+    "orderStages": "AF",
+    "currencyIdGeneral": "-1",
+}
+
+
+@dataclass
+class SearchProfile:
+    """Профиль поиска закупок."""
+    name: str
+    okpd2_codes: List[str] = field(default_factory=list)
+    okpd2_ids: List[str] = field(default_factory=list)  # внутренние id ЕИС для кодов
+    search_string: str = ""
+    records_per_page: int = 0  # 0 — EIS_RECORDS_PER_PAGE
+    params: Dict[str, str] = field(default_factory=dict)  # дополняют/заменяют BASE_SEARCH_PARAMS
+
+    def __post_init__(self):
+        if not self.records_per_page:
+            self.records_per_page = settings.eis_records_per_page
+        if self.records_per_page not in RECORDS_PER_PAGE_CHOICES:
+            raise ValueError(
+                f"Профиль {self.name}: recordsPerPage={self.records_per_page}, "
+                f"допустимо {RECORDS_PER_PAGE_CHOICES}"
+            )
+
+    def search_url(self, page: int) -> str:
+        """URL страницы результатов поиска."""
+        params = dict(BASE_SEARCH_PARAMS)
+        params["recordsPerPage"] = f"_{self.records_per_page}"
+        if self.search_string:
+            params["searchString"] = self.search_string
+        if self.okpd2_ids:
+            params["okpd2Ids"] = ",".join(self.okpd2_ids)
+        if self.okpd2_codes:
+            params["okpd2IdsCodes"] = ",".join(self.okpd2_codes)
+        params.update(self.params)
+        params["pageNumber"] = str(page)
+        return f"{SEARCH_RESULTS_URL}?{urlencode(params)}"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SearchProfile":
+        """Создаёт профиль из словаря (элемента JSON-файла)."""
+        return cls(
+            name=data["name"],
+            okpd2_codes=list(data.get("okpd2_codes", [])),
+            okpd2_ids=[str(i) for i in data.get("okpd2_ids", [])],
+            search_string=data.get("search_string", ""),
+            records_per_page=int(data.get("records_per_page", 0)),
+            params={k: str(v) for k, v in data.get("params", {}).items()},
+        )
+
+
+def default_search_profile() -> SearchProfile:
+    """Профиль по умолчанию: покупка жилья (ОКПД2 68.10.11)."""
+    return SearchProfile(
+        name="default",
+        okpd2_codes=["68.10.11.000"],
+        okpd2_ids=["8890776"],
+    )
+
+
+def load_search_profiles(path: Optional[str] = None) -> List[SearchProfile]:
+    """
+    Загружает профили поиска.
+
+    Args:
+        path: JSON-файл со списком профилей (по умолчанию — EIS_SEARCH_PROFILES_PATH);
+            относительный путь отсчитывается от src/
+
+    Returns:
+        Профили из файла или [default_search_profile()], если файл не задан
+    """
+    path = path or settings.eis_search_profiles_path
+    if not path:
+        return [default_search_profile()]
+
+    profiles_path = Path(path)
+    if not profiles_path.is_absolute():
+        profiles_path = Path(__file__).resolve().parent.parent / profiles_path
+
+    with open(profiles_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    profiles = [SearchProfile.from_dict(item) for item in data]
+    names = [p.name for p in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Повторяющиеся имена профилей поиска в {path}")
+    if not profiles:
+        raise ValueError(f"Нет профилей поиска в {path}")
+    return profiles
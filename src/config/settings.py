@@ -30,6 +30,67 @@ class Settings:
     stage4_max_retries: int = 3
     stage4_scroll_timeout_s: int = 30
     
+    # EIS downloader
+    eis_download_workers: int = 8
+    eis_per_host_connections: int = 4
+    eis_parallel_purchases: int = 3
+    eis_max_download_mb: int = 100
+    eis_skip_extensions: tuple = (".bin",)
+    eis_spool_max_mb: int = 16
+    eis_attachment_budget_mb: int = 50
+    eis_attachment_budget_s: float = 120.0
+    eis_attachment_budget_chars: int = 200000
+    eis_attachment_window: int = 2
+    eis_html_parser: str = "auto"
+    eis_search_prefetch_pages: int = 3
+    eis_search_workers: int = 2
+    eis_records_per_page: int = 50
+    eis_search_profiles_path: str = ""
+    
+    # Text extraction
+    pdf_backends: str = "pypdfium2,pdfplumber"
+    pdf_max_pages: int = 0
+    sheet_max_rows: int = 10000
+    sheet_max_cols: int = 100
+    sheet_max_chars: int = 200000
+    text_normalize_enabled: bool = True
+    text_dedup_min_chars: int = 40
+    extract_pool_enabled: bool = True
+    extract_workers: int = 0
+    extract_timeout_s: float = 120.0
+    extract_memory_mb: int = 2048
+    extract_max_tasks_per_child: int = 50
+    text_cache_enabled: bool = True
+    text_cache_dir: str = ""
+    zip_max_depth: int = 2
+    zip_max_total_mb: int = 200
+    zip_max_member_mb: int = 100
+    zip_max_ratio: int = 100
+    
+    # HTTP client
+    http_pool_size: int = 10
+    http_http2: bool = True
+    http_dns_cache_ttl_s: int = 300
+    http_max_retries: int = 3
+    http_backoff_base_s: float = 1.0
+    http_backoff_max_s: float = 60.0
+    
+    # HTTP cache
+    http_cache_enabled: bool = True
+    http_cache_dir: str = ""
+    http_cache_max_mb: int = 2048
+    http_cache_ttl_s: int = 3600
+    
+    # Rate limits (запросов в секунду: начальная и максимальная)
+    eis_rate_per_s: float = 2.0
+    eis_rate_max_per_s: float = 8.0
+    openrouter_rate_per_s: float = 1.0
+    openrouter_rate_max_per_s: float = 5.0
+    openrouter_max_in_flight: int = 4
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_days: float = 30.0
+    llm_cache_max_entries: int = 10000
+    
     # Proxy
     proxy_url: Optional[str] = None
     
@@ -57,6 +118,73 @@ class Settings:
         self.stage4_use_real_chrome = os.getenv("STAGE4_USE_REAL_CHROME", "true").lower() == "true"
         self.stage4_page_timeout_s = int(os.getenv("STAGE4_PAGE_TIMEOUT_S", "60"))
         
+        # EIS downloader
+        self.eis_download_workers = int(os.getenv("EIS_DOWNLOAD_WORKERS", "8"))
+        self.eis_per_host_connections = int(os.getenv("EIS_PER_HOST_CONNECTIONS", "4"))
+        self.eis_parallel_purchases = int(os.getenv("EIS_PARALLEL_PURCHASES", "3"))
+        self.eis_max_download_mb = int(os.getenv("EIS_MAX_DOWNLOAD_MB", "100"))
+        self.eis_skip_extensions = tuple(
+            ext.strip().lower()
+            for ext in os.getenv("EIS_SKIP_EXTENSIONS", ".bin").split(",")
+            if ext.strip()
+        )
+        self.eis_spool_max_mb = int(os.getenv("EIS_SPOOL_MAX_MB", "16"))
+        self.eis_attachment_budget_mb = int(os.getenv("EIS_ATTACHMENT_BUDGET_MB", "50"))
+        self.eis_attachment_budget_s = float(os.getenv("EIS_ATTACHMENT_BUDGET_S", "120.0"))
+        self.eis_attachment_budget_chars = int(os.getenv("EIS_ATTACHMENT_BUDGET_CHARS", "200000"))
+        self.eis_attachment_window = int(os.getenv("EIS_ATTACHMENT_WINDOW", "2"))
+        self.eis_html_parser = os.getenv("EIS_HTML_PARSER", "auto").lower()
+        self.eis_search_prefetch_pages = int(os.getenv("EIS_SEARCH_PREFETCH_PAGES", "3"))
+        self.eis_search_workers = int(os.getenv("EIS_SEARCH_WORKERS", "2"))
+        self.eis_records_per_page = int(os.getenv("EIS_RECORDS_PER_PAGE", "50"))
+        self.eis_search_profiles_path = os.getenv("EIS_SEARCH_PROFILES_PATH", "")
+        
+        # Text extraction
+        self.pdf_backends = os.getenv("PDF_BACKENDS", "pypdfium2,pdfplumber")
+        self.pdf_max_pages = int(os.getenv("PDF_MAX_PAGES", "0"))
+        self.sheet_max_rows = int(os.getenv("SHEET_MAX_ROWS", "10000"))
+        self.sheet_max_cols = int(os.getenv("SHEET_MAX_COLS", "100"))
+        self.sheet_max_chars = int(os.getenv("SHEET_MAX_CHARS", "200000"))
+        self.text_normalize_enabled = os.getenv("TEXT_NORMALIZE_ENABLED", "true").lower() == "true"
+        self.text_dedup_min_chars = int(os.getenv("TEXT_DEDUP_MIN_CHARS", "40"))
+        self.extract_pool_enabled = os.getenv("EXTRACT_POOL_ENABLED", "true").lower() == "true"
+        self.extract_workers = int(os.getenv("EXTRACT_WORKERS", "0"))
+        self.extract_timeout_s = float(os.getenv("EXTRACT_TIMEOUT_S", "120.0"))
+        self.extract_memory_mb = int(os.getenv("EXTRACT_MEMORY_MB", "2048"))
+        self.extract_max_tasks_per_child = int(os.getenv("EXTRACT_MAX_TASKS_PER_CHILD", "50"))
+        self.text_cache_enabled = os.getenv("TEXT_CACHE_ENABLED", "true").lower() == "true"
+        default_text_cache_dir = str(self.base_dir / "results" / "text_cache")
+        self.text_cache_dir = os.getenv("TEXT_CACHE_DIR", default_text_cache_dir)
+        self.zip_max_depth = int(os.getenv("ZIP_MAX_DEPTH", "2"))
+        self.zip_max_total_mb = int(os.getenv("ZIP_MAX_TOTAL_MB", "200"))
+        self.zip_max_member_mb = int(os.getenv("ZIP_MAX_MEMBER_MB", "100"))
+        self.zip_max_ratio = int(os.getenv("ZIP_MAX_RATIO", "100"))
+        
+        # HTTP client
+        self.http_pool_size = int(os.getenv("HTTP_POOL_SIZE", "10"))
+        self.http_http2 = os.getenv("HTTP_HTTP2", "true").lower() == "true"
+        self.http_dns_cache_ttl_s = int(os.getenv("HTTP_DNS_CACHE_TTL_S", "300"))
+        self.http_max_retries = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+        self.http_backoff_base_s = float(os.getenv("HTTP_BACKOFF_BASE_S", "1.0"))
+        self.http_backoff_max_s = float(os.getenv("HTTP_BACKOFF_MAX_S", "60.0"))
+        
+        # HTTP cache
+        self.http_cache_enabled = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+        default_cache_dir = str(self.base_dir / "results" / "http_cache")
+        self.http_cache_dir = os.getenv("HTTP_CACHE_DIR", default_cache_dir)
+        self.http_cache_max_mb = int(os.getenv("HTTP_CACHE_MAX_MB", "2048"))
+        self.http_cache_ttl_s = int(os.getenv("HTTP_CACHE_TTL_S", "3600"))
+        
+        # Rate limits
+        self.eis_rate_per_s = float(os.getenv("EIS_RATE_PER_S", "2.0"))
+        self.eis_rate_max_per_s = float(os.getenv("EIS_RATE_MAX_PER_S", "8.0"))
+        self.openrouter_rate_per_s = float(os.getenv("OPENROUTER_RATE_PER_S", "1.0"))
+        self.openrouter_rate_max_per_s = float(os.getenv("OPENROUTER_RATE_MAX_PER_S", "5.0"))
+        self.openrouter_max_in_flight = int(os.getenv("OPENROUTER_MAX_IN_FLIGHT", "4"))
+        self.llm_cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.llm_cache_ttl_days = float(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+        self.llm_cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+        
         # Proxy
         self.proxy_url = os.getenv("PROXY_URL")
     
@@ -7,6 +7,7 @@ CLI для запуска каждого этапа пайплайна.
 import argparse
 import json
 from utils.logger import setup_logger, get_logger
+from config.search_profiles import load_search_profiles
 from pipeline import Pipeline
 
 
@@ -20,13 +21,42 @@ def cmd_stats(pipeline: Pipeline, args):
 
 
 def cmd_stage1(pipeline: Pipeline, args):
-    """Stage 1: Загрузка закупок (ОКПД2 68.10.11)."""
-    result = pipeline.run_stage1(limit=args.limit)
+    """Stage 1: Загрузка закупок по профилям поиска."""
+    profiles = None
+    if args.profiles:
+        names = [n.strip() for n in args.profiles.split(',') if n.strip()]
+        profiles = [p for p in load_search_profiles() if p.name in names]
+        unknown = set(names) - {p.name for p in profiles}
+        if unknown:
+            print(f"Неизвестные профили поиска: {', '.join(sorted(unknown))}")
+            return
+    result = pipeline.run_stage1(limit=args.limit, incremental=not args.full, profiles=profiles)
     print(f"\n{result}")
     if result.errors:
         print(f"  Ошибки: {result.errors}")
 
 
+def cmd_stage1_xml(pipeline: Pipeline, args):
+    """Stage 1 из XML-выгрузок ЕИС."""
+    result = pipeline.run_stage1_xml(
+        args.path,
+        limit=args.limit,
+        download_attachments=not args.no_download
+    )
+    print(f"\n{result}")
+    if result.errors:
+        print(f"  Ошибки: {result.errors}")
+
+
+def cmd_fetch_skipped(pipeline: Pipeline, args):
+    """Догрузка вложений, пропущенных в Stage 1 из-за бюджета."""
+    for reg_number in args.reg_numbers:
+        if pipeline.fetch_skipped_attachments(reg_number):
+            print(f"  {reg_number}: текст дополнен")
+        else:
+            print(f"  {reg_number}: нечего догружать")
+
+
 def cmd_stage2(pipeline: Pipeline, args):
     """Stage 2: ИИ-обработка."""
     result = pipeline.run_stage2(limit=args.limit)
@@ -96,8 +126,20 @@ def main():
     stats_parser = subparsers.add_parser('stats', help='Показать статистику')
     
     # stage1
-    stage1_parser = subparsers.add_parser('stage1', help='Stage 1: Загрузка закупок (ОКПД2 68.10.11)')
+    stage1_parser = subparsers.add_parser('stage1', help='Stage 1: Загрузка закупок (профили поиска ЕИС)')
     stage1_parser.add_argument('--limit', type=int, default=10, help='Макс. количество')
+    stage1_parser.add_argument('--full', action='store_true', help='Игнорировать отметку прошлого обхода')
+    stage1_parser.add_argument('--profiles', default=None, help='Профили поиска через запятую (по умолчанию все)')
+    
+    # stage1-xml
+    stage1_xml_parser = subparsers.add_parser('stage1-xml', help='Stage 1: Загрузка закупок из XML-выгрузок ЕИС')
+    stage1_xml_parser.add_argument('path', help='Каталог с zip/xml выгрузки или файл')
+    stage1_xml_parser.add_argument('--limit', type=int, default=None, help='Макс. количество')
+    stage1_xml_parser.add_argument('--no-download', action='store_true', help='Не скачивать вложения (только текст извещения)')
+    
+    # fetch-skipped
+    fetch_skipped_parser = subparsers.add_parser('fetch-skipped', help='Догрузить вложения, пропущенные из-за бюджета')
+    fetch_skipped_parser.add_argument('reg_numbers', nargs='+', help='Номера закупок')
     
     # stage2
     stage2_parser = subparsers.add_parser('stage2', help='Stage 2: ИИ-обработка')
@@ -140,6 +182,8 @@ def main():
     commands = {
         'stats': cmd_stats,
         'stage1': cmd_stage1,
+        'stage1-xml': cmd_stage1_xml,
+        'fetch-skipped': cmd_fetch_skipped,
         'stage2': cmd_stage2,
         'stage3': cmd_stage3,
         'stage3': cmd_stage3,
@@ -147,10 +191,14 @@ def main():
         'server': cmd_server,
     }
     
-    if args.command in commands:
-        commands[args.command](pipeline, args)
-    else:
-        parser.print_help()
+    try:
+        if args.command in commands:
+            commands[args.command](pipeline, args)
+        else:
+            parser.print_help()
+    finally:
+        if pipeline is not None:
+            pipeline.close()
     
     print()
     return 0
@@ -0,0 +1,110 @@
+"""
+Модель состояния инкрементального обхода ЕИС.
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+
+@dataclass
+class CrawlRange:
+    """
+    Непрерывный участок выдачи поиска выше watermark, пройденный обходом,
+    который остановился по лимиту, не дойдя до watermark.
+    
+    Обработаны закупки с update_date строго между low и high, а на самих
+    границах — только перечисленные в low_seen/high_seen: обход мог
+    остановиться посреди закупок с одной датой.
+    """
+    low: datetime
+    high: datetime
+    low_seen: List[str] = field(default_factory=list)
+    high_seen: List[str] = field(default_factory=list)
+    
+    def covers(self, update_date: datetime, reg_number: str) -> bool:
+        """Проверяет, входит ли закупка в участок."""
+        if self.low < update_date < self.high:
+            return True
+        if update_date == self.low and reg_number in self.low_seen:
+            return True
+        return update_date == self.high and reg_number in self.high_seen
+    
+    def merge(self, other: 'CrawlRange') -> 'CrawlRange':
+        """Объединяет участок с пересекающимся или примыкающим к нему."""
+        def edge(date, *ranges_seen):
+            return sorted({reg for d, seen in ranges_seen if d == date for reg in seen})
+        low = min(self.low, other.low)
+        high = max(self.high, other.high)
+        return CrawlRange(
+            low=low,
+            high=high,
+            low_seen=edge(low, (self.low, self.low_seen), (other.low, other.low_seen)),
+            high_seen=edge(high, (self.high, self.high_seen), (other.high, other.high_seen))
+        )
+    
+    def to_dict(self) -> dict:
+        return {
+            "low": self.low.isoformat(),
+            "high": self.high.isoformat(),
+            "low_seen": sorted(self.low_seen),
+            "high_seen": sorted(self.high_seen),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CrawlRange':
+        return cls(
+            low=datetime.fromisoformat(data["low"]),
+            high=datetime.fromisoformat(data["high"]),
+            low_seen=list(data.get("low_seen", [])),
+            high_seen=list(data.get("high_seen", []))
+        )
+
+
+@dataclass
+class CrawlState:
+    """
+    Отметка (high-watermark) последнего обхода поиска ЕИС.
+    
+    Всё, что обновлено раньше watermark, уже обработано прошлыми обходами.
+    seen_reg_numbers — закупки с датой ровно watermark: на одну дату
+    обновления может приходиться несколько закупок.
+    
+    ranges — участки выше watermark, пройденные обходами, которые
+    остановил лимит. Следующий обход пропускает их и листает дальше;
+    когда обход доходит до watermark, отметка сдвигается вверх.
+    """
+    profile: str                                        # Профиль поиска
+    watermark: Optional[datetime] = None                # Самая свежая update_date
+    seen_reg_numbers: List[str] = field(default_factory=list)
+    updated_at: Optional[datetime] = None               # Время последнего обхода
+    ranges: List[CrawlRange] = field(default_factory=list)
+    
+    def is_behind(self, update_date: datetime, reg_number: str) -> bool:
+        """Проверяет, обработана ли закупка одним из прошлых обходов."""
+        if update_date in (None, datetime.min):
+            return False
+        if self.watermark is not None:
+            if update_date < self.watermark:
+                return True
+            if update_date == self.watermark and reg_number in self.seen_reg_numbers:
+                return True
+        return any(r.covers(update_date, reg_number) for r in self.ranges)
+    
+    def reached(self, update_date: datetime) -> bool:
+        """Закупка не новее watermark: дальше листать профиль не нужно."""
+        if self.watermark is None or update_date in (None, datetime.min):
+            return False
+        return update_date <= self.watermark
+    
+    @classmethod
+    def from_row(cls, row) -> 'CrawlState':
+        """Создаёт объект из строки БД."""
+        ranges = row['ranges'] if 'ranges' in row.keys() else None
+        return cls(
+            profile=row['profile'],
+            watermark=datetime.fromisoformat(row['watermark']) if row['watermark'] else None,
+            seen_reg_numbers=json.loads(row['seen_reg_numbers'] or '[]'),
+            updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None,
+            ranges=[CrawlRange.from_dict(r) for r in json.loads(ranges or '[]')]
+        )
@@ -0,0 +1,45 @@
+"""
+Модель записи кэша ответов LLM (Stage 2).
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class LLMCacheEntry:
+    """
+    Ответ модели на конкретный запрос. Ключ — модель, хэш системного
+    промпта и хэш подготовленного текста закупки: при смене модели или
+    промпта старые ответы перестают находиться.
+    """
+    model: str                              # Имя модели OpenRouter
+    prompt_hash: str                        # SHA-256 системного промпта
+    text_hash: str                          # SHA-256 пользовательского промпта с текстом
+    response: str                           # Ответ модели как есть (JSON-строка)
+    created_at: Optional[datetime] = None
+    last_used_at: Optional[datetime] = None
+    hits: int = 0                           # Сколько раз ответ взят из кэша
+    
+    @staticmethod
+    def make_key(model: str, prompt_hash: str, text_hash: str) -> str:
+        """Первичный ключ записи."""
+        return hashlib.sha256(f"{model}\n{prompt_hash}\n{text_hash}".encode("utf-8")).hexdigest()
+    
+    @property
+    def cache_key(self) -> str:
+        return self.make_key(self.model, self.prompt_hash, self.text_hash)
+    
+    @classmethod
+    def from_row(cls, row) -> 'LLMCacheEntry':
+        """Создаёт объект из строки БД."""
+        return cls(
+            model=row['model'],
+            prompt_hash=row['prompt_hash'],
+            text_hash=row['text_hash'],
+            response=row['response'],
+            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
+            last_used_at=datetime.fromisoformat(row['last_used_at']) if row['last_used_at'] else None,
+            hits=row['hits'] or 0
+        )
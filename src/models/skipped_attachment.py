@@ -0,0 +1,37 @@
+"""
+Модель вложения закупки, пропущенного при загрузке Stage 1.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class SkippedAttachment:
+    """
+    Вложение, которое не скачивалось: бюджет закупки на вложения
+    (байты, время, символы текста) был исчерпан. Такие вложения
+    можно догрузить по запросу.
+    """
+    reg_number: str                         # Закупка
+    url: str                                # Ссылка на файл в ЕИС
+    name: str = ""                          # Имя файла
+    priority: int = 0                       # Приоритет (меньше — важнее)
+    reason: str = ""                        # Какой бюджет исчерпан: bytes, time, chars
+    created_at: Optional[datetime] = None
+    
+    def to_doc(self) -> dict:
+        """Описание вложения в формате списка документов ЕИС."""
+        return {"name": self.name, "url": self.url}
+    
+    @classmethod
+    def from_row(cls, row) -> 'SkippedAttachment':
+        """Создаёт объект из строки БД."""
+        return cls(
+            reg_number=row['reg_number'],
+            url=row['url'],
+            name=row['name'] or "",
+            priority=row['priority'] or 0,
+            reason=row['reason'] or "",
+            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None
+        )
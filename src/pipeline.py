@@ -1,22 +1,55 @@
 """
 Pipeline — оркестратор для объединения всех стадий обработки.
 """
-from typing import Optional, List
+from contextlib import ExitStack
+import threading
+from datetime import datetime
+from typing import Optional, List, Dict
+from config.search_profiles import SearchProfile, load_search_profiles
 from config.settings import settings
 from services.database_service import DatabaseService
 from services.eis_service import EISService
 from services.ai_service import AIService
 from services.gis_service import GISService
 from services.scraper_service import ScraperService
-from services.eis_downloader_service import EISDownloaderService
-from services.ai_processor_service import AIProcessorService
+from services.search_prefetcher import interleave_pages
 from models.zakupka import Zakupka
+from models.crawl_state import CrawlRange, CrawlState
 from models.ai_result import AIResult
 from models.listing import ListingResult
 from models.stage_result import StageResult
 from utils.logger import get_logger
 
 
+class _service_property:
+    """
+    Как functools.cached_property, но сервис создаётся под блокировкой
+    экземпляра: Stage 1 и Stage 2 из API идут в разных потоках, и без неё
+    каждый поток мог построить свой пул процессов или HTTP-клиент.
+    Готовый сервис лежит в __dict__ экземпляра и читается без блокировки.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            pass
+        # RLock: загрузчик при создании обращается к http и extractor
+        with instance._services_lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.func(instance)
+            return instance.__dict__[self.name]
+
+
 class Pipeline:
     """
     Оркестратор для выполнения полного пайплайна обработки закупок.
@@ -28,15 +61,21 @@ class Pipeline:
     4. Сбор объявлений
     """
     
+    # Сколько страниц поиска Stage 1 листает в каждом профиле
+    STAGE1_MAX_PAGES = 50
+    
     def __init__(self, db_path: str = None):
         """
         Args:
             db_path: Путь к БД. Если не указан, берётся из settings.
         """
         self.logger = get_logger("Pipeline")
+        self._services_lock = threading.RLock()
         
         # Инициализируем DatabaseService
         self.db = DatabaseService(db_path)
+        # Под этим именем БД используют Stage 1/2 и маршруты API
+        self.db_service = self.db
         
         # Инициализируем сервисы с репозиториями из DatabaseService
         self.eis = EISService(self.db.zakupki)
@@ -44,12 +83,59 @@ class Pipeline:
         self.gis = GISService()
         self.scraper = ScraperService(self.db.listings)
         
-        # Новые ООП-сервисы для Stage 1 и 2
-        self.eis_downloader = EISDownloaderService(self.db.zakupki)
-        self.ai_processor = AIProcessorService(self.db.ai_results)
-        
         self.logger.info("Pipeline инициализирован")
     
+    # Тяжёлые сервисы (requests, пул процессов) создаются при первом
+    # обращении: команды вроде `stats` и воркеры API их не трогают
+    
+    @_service_property
+    def http(self):
+        """Общий пул HTTP-соединений для всех запросов к zakupki.gov.ru."""
+        from services.http_client import HttpClient
+        return HttpClient()
+    
+    @_service_property
+    def extractor(self):
+        """Пул процессов для извлечения текста из вложений (или None)."""
+        from services.extraction_service import TextExtractionService
+        return TextExtractionService() if settings.extract_pool_enabled else None
+    
+    @_service_property
+    def eis_downloader(self):
+        """Загрузка закупок и вложений с ЕИС (Stage 1)."""
+        from services.eis_downloader_service import EISDownloaderService
+        return EISDownloaderService(
+            self.db.zakupki,
+            http_client=self.http,
+            skipped_repo=self.db.skipped_attachments,
+            extractor=self.extractor
+        )
+    
+    @_service_property
+    def ai_processor(self):
+        """ИИ-обработка закупок через OpenRouter (Stage 2)."""
+        from services.ai_processor_service import AIProcessorService
+        return AIProcessorService(
+            self.db.ai_results,
+            cache_repo=self.db.llm_cache if settings.llm_cache_enabled else None
+        )
+    
+    def close(self):
+        """
+        Останавливает созданные тяжёлые сервисы: потоки загрузки,
+        процессы извлечения текста и HTTP-соединения.
+        """
+        with self._services_lock:
+            downloader = self.__dict__.get("eis_downloader")
+            extractor = self.__dict__.get("extractor")
+            http = self.__dict__.get("http")
+        if downloader is not None:
+            downloader.close()
+        if extractor is not None:
+            extractor.shutdown()
+        if http is not None:
+            http.close()
+    
     def init_database(self) -> bool:
         """Инициализирует базу данных."""
         return self.db.init_database()
@@ -241,121 +327,163 @@ class Pipeline:
     # Методы для запуска каждого этапа отдельно (для CLI и дашборда)
     # ================================================================
     
-    def run_stage1(self, limit: int = 10) -> StageResult:
+    def run_stage1(
+        self,
+        limit: int = 10,
+        incremental: bool = True,
+        profiles: List[SearchProfile] = None
+    ) -> StageResult:
         """
-        Stage 1: Загрузка закупок с ЕИС через EISDownloaderService (ОКПД2 68.10.11).
+        Stage 1: Загрузка закупок с ЕИС через EISDownloaderService
+        по профилям поиска (по умолчанию — ОКПД2 68.10.11).
         
         Логика:
         1. Ищем закупки на ЕИС
         2. Пропускаем те, что уже есть в БД
-        3. Загружаем документы и создаём combined_text
+        3. Загружаем документы новых закупок страницы параллельно
+           и собираем combined_text в памяти
         4. Сохраняем в БД
-        5. Удаляем папку с документами (текст уже в БД)
+        
+        Профили листаются одновременно, страницы обрабатываются по
+        очереди; закупка, найденная несколькими профилями, загружается
+        один раз. В инкрементальном режиме листание профиля
+        останавливается на странице, где встретились закупки старше
+        отметки его прошлого обхода (crawl_state хранится по профилю),
+        а участки, пройденные прошлыми обходами до лимита, пропускаются.
         
         Args:
             limit: Количество НОВЫХ закупок для загрузки
+            incremental: Останавливаться на отметке прошлого обхода
+            profiles: Профили поиска (по умолчанию — из EIS_SEARCH_PROFILES_PATH)
         
         Returns:
             StageResult с данными о загрузке
         """
-        import os
-        import shutil
-        
-        self.logger.info(f"Stage 1: Загрузка закупок ОКПД2 68.10.11 (limit={limit})")
+        profiles = profiles or load_search_profiles()
+        self.logger.info(
+            f"Stage 1: Загрузка закупок, профили: {', '.join(p.name for p in profiles)} "
+            f"(limit={limit}, incremental={incremental})"
+        )
         
         errors = []
         saved = 0
         skipped = 0
         found = 0  # Все найденные подходящие закупки (для остановки)
-        processed_reg_numbers = set()  # Для дедупликации
+        processed_reg_numbers = set()  # Для дедупликации (общая для всех профилей)
+        # По профилям: reg_number -> update_date
+        crawled: Dict[str, Dict[str, datetime]] = {p.name: {} for p in profiles}
+        failed: Dict[str, Dict[str, datetime]] = {p.name: {} for p in profiles}  # не удалось загрузить/сохранить
+        # Профиль пройден до отметки прошлого обхода или до конца выдачи
+        # (неполной страницы); упор в STAGE1_MAX_PAGES — не конец выдачи
+        complete: Dict[str, bool] = {p.name: False for p in profiles}
+        page_sizes = {p.name: p.records_per_page for p in profiles}
+        # Профили с незагрузившейся страницей: закупки ниже неё не идут в отметку
+        broken = set()
+        
+        states: Dict[str, Optional[CrawlState]] = {}
+        for profile in profiles:
+            states[profile.name] = self.db.crawl_state.get_by_id(profile.name)
+            state = states[profile.name]
+            if incremental and state and state.watermark:
+                self.logger.info(f"[{profile.name}] Отметка прошлого обхода: {state.watermark}")
         
         try:
-            page = 1
-            max_pages = 50
+            max_pages = self.STAGE1_MAX_PAGES
             
-            while found < limit and page <= max_pages:
-                self.logger.info(f"Страница {page}...")
-                
-                # Используем ООП-сервис EISDownloaderService
-                html = self.eis_downloader._fetch_search_page(page)
-                if not html:
-                    page += 1
-                    continue
-                
-                page_purchases = self.eis_downloader._parse_purchases_from_html(html)
-                if not page_purchases:
-                    page += 1
-                    continue
-                
-                for p in page_purchases:
-                    if found >= limit:
-                        break
-                    
-                    reg_number = p.get('reg_number', '')
-                    
-                    # Пропускаем дубликаты на текущей странице
-                    if reg_number in processed_reg_numbers:
+            # Страницы всех профилей загружаются и парсятся в фоне,
+            # пока скачиваются документы закупок текущей страницы
+            with ExitStack() as stack:
+                sources = {
+                    profile.name: stack.enter_context(
+                        self.eis_downloader.iter_search_pages(max_pages, profile)
+                    )
+                    for profile in profiles
+                }
+                for name, page, page_purchases in interleave_pages(sources):
+                    self.logger.info(f"[{name}] Страница {page}...")
+                    if page_purchases is None:
+                        broken.add(name)
                         continue
-                    processed_reg_numbers.add(reg_number)
-                    
-                    # Проверяем есть ли в БД
-                    existing = self.eis.get_zakupka(reg_number)
-                    if existing and existing.combined_text:
-                        self.logger.info(f"  ⏭️ {reg_number} — уже в БД")
-                        skipped += 1
-                        found += 1
+                    # Неполная (или пустая) страница — выдача профиля закончилась
+                    results_ended = len(page_purchases) < page_sizes[name]
+                    if not page_purchases:
+                        sources[name].close()
+                        complete[name] = True
                         continue
+                    state = states[name]
                     
-                    # Загружаем документы через ООП-сервис
-                    try:
-                        self.logger.info(f"📥 Обработка {reg_number}...")
-                        
-                        # EISDownloaderService.download_documents уже загружает 
-                        # печатную форму и документы, создаёт combined_text.txt
-                        combined_path = self.eis_downloader.download_documents(reg_number)
+                    # Отбрасываем закупки, обработанные прошлыми обходами
+                    reached_watermark = False
+                    if incremental and state:
+                        reached_watermark = any(state.reached(p.get('update_date')) for p in page_purchases)
+                        page_purchases = [
+                            p for p in page_purchases
+                            if not state.is_behind(p.get('update_date'), p.get('reg_number', ''))
+                        ]
+                    
+                    # Наличие в БД проверяется одним запросом на страницу
+                    has_text = self.eis.get_text_presence(
+                        [p.get('reg_number', '') for p in page_purchases]
+                    )
+                    
+                    # Новые закупки копятся в пачку и загружаются параллельно;
+                    # пачка не больше числа оставшихся до лимита мест
+                    batch = []
+                    cut = False  # страница пройдена не до конца
+                    for p in page_purchases:
+                        if found + len(batch) >= limit:
+                            batch_saved = self._save_stage1_batch(batch, found, limit, errors, failed[name])
+                            saved += batch_saved
+                            found += batch_saved
+                            batch = []
+                            if found >= limit:
+                                cut = True
+                                break
                         
-                        # Читаем текст
-                        combined_text = ""
-                        if combined_path and os.path.exists(combined_path):
-                            with open(combined_path, 'r', encoding='utf-8') as f:
-                                combined_text = f.read()
+                        reg_number = p.get('reg_number', '')
                         
-                        if not combined_text.strip():
-                            self.logger.warning(f"Нет текста для {reg_number}")
+                        # Пропускаем дубликаты (в том числе найденные другим профилем);
+                        # в отметку обхода профиля закупка попадает в любом случае
+                        if name not in broken:
+                            crawled[name][reg_number] = p.get('update_date')
+                        if reg_number in processed_reg_numbers:
                             continue
+                        processed_reg_numbers.add(reg_number)
                         
-                        # Сохраняем в БД
-                        zakupka = Zakupka(
-                            reg_number=reg_number,
-                            description=p.get('description', ''),
-                            update_date=str(p.get('update_date', '')),
-                            link=p.get('link', ''),
-                            combined_text=combined_text
-                        )
-                        if self.eis.save_zakupka(zakupka):
-                            saved += 1
+                        # Проверяем есть ли в БД
+                        if has_text.get(reg_number):
+                            self.logger.info(f"  ⏭️ {reg_number} — уже в БД")
+                            skipped += 1
                             found += 1
-                            
-                            # Обновляем статус на 'raw' (Этап 2)
-                            self.db_service.zakupki.update_status(reg_number, 'raw')
-                            
-                            self.logger.info(f"✅ Сохранена закупка {reg_number} ({found}/{limit})")
-                            
-                            # Удаляем папку — текст уже в БД
-                            zakupka_dir = self.eis_downloader.zakupki_dir / reg_number
-                            if zakupka_dir.exists():
-                                shutil.rmtree(zakupka_dir, ignore_errors=True)
-                                self.logger.debug(f"Удалена папка {reg_number}")
+                            continue
                         
-                    except Exception as e:
-                        errors.append(f"{reg_number}: {e}")
-                        self.logger.error(f"Ошибка обработки {reg_number}: {e}")
-                
-                page += 1
+                        batch.append(p)
+                    
+                    if batch:
+                        batch_saved = self._save_stage1_batch(batch, found, limit, errors, failed[name])
+                        saved += batch_saved
+                        found += batch_saved
+                    
+                    if reached_watermark:
+                        self.logger.info(f"[{name}] Достигнута отметка прошлого обхода на странице {page}")
+                    if reached_watermark or results_ended:
+                        sources[name].close()
+                        complete[name] = not cut
+                    if found >= limit:
+                        break
             
             if found >= limit:
                 self.logger.info(f"Достигнут лимит {limit} закупок")
             
+            for profile in profiles:
+                self._update_crawl_state(
+                    profile.name,
+                    states[profile.name],
+                    crawled[profile.name],
+                    failed[profile.name],
+                    complete[profile.name] and profile.name not in broken
+                )
+            
             success = saved > 0 or len(errors) == 0
             message = f"Загружено {saved} новых закупок (пропущено {skipped} существующих)"
             
@@ -370,10 +498,238 @@ class Pipeline:
             stage=1,
             success=success,
             message=message,
-            data={"limit": limit, "downloaded": saved, "skipped": skipped},
+            data={
+                "limit": limit,
+                "downloaded": saved,
+                "skipped": skipped,
+                "text_cache": self._text_cache_stats(),
+                "text_normalization": self.eis_downloader.normalization_stats.to_dict()
+            },
             errors=errors
         )
     
+    def run_stage1_xml(
+        self,
+        path: str,
+        limit: Optional[int] = None,
+        download_attachments: bool = True
+    ) -> StageResult:
+        """
+        Stage 1 из XML-выгрузок ЕИС вместо страниц поиска.
+        
+        Args:
+            path: Каталог с zip/xml выгрузки или файл
+            limit: Количество НОВЫХ закупок для загрузки
+            download_attachments: Скачивать вложения из извещений
+        
+        Returns:
+            StageResult с данными о загрузке
+        """
+        self.logger.info(f"Stage 1 (XML): {path} (limit={limit}, download={download_attachments})")
+        
+        from services.eis_xml_ingest_service import EISXmlIngestService
+        ingest = EISXmlIngestService(self.db.zakupki, self.eis_downloader)
+        try:
+            saved, skipped, errors = ingest.ingest(path, limit=limit, download_attachments=download_attachments)
+            success = saved > 0 or len(errors) == 0
+            message = f"Загружено {saved} новых закупок из XML (пропущено {skipped} существующих)"
+        except Exception as e:
+            saved, skipped, errors = 0, 0, [str(e)]
+            success = False
+            message = f"Ошибка загрузки XML: {e}"
+        
+        self.logger.info(message)
+        
+        return StageResult(
+            stage=1,
+            success=success,
+            message=message,
+            data={
+                "limit": limit,
+                "downloaded": saved,
+                "skipped": skipped,
+                "text_cache": self._text_cache_stats(),
+                "text_normalization": self.eis_downloader.normalization_stats.to_dict()
+            },
+            errors=errors
+        )
+    
+    def _text_cache_stats(self) -> Optional[dict]:
+        """Попадания и промахи кэша текста (в этом процессе)."""
+        text_cache = self.eis_downloader.text_cache
+        return dict(text_cache.stats) if text_cache is not None else None
+    
+    def fetch_skipped_attachments(self, reg_number: str) -> bool:
+        """
+        Догружает вложения закупки, пропущенные в Stage 1 из-за бюджета,
+        и дописывает их текст в combined_text.
+        
+        Returns:
+            True, если текст закупки дополнен
+        """
+        zakupka = self.eis.get_zakupka(reg_number)
+        if not zakupka:
+            self.logger.warning(f"Закупка {reg_number} не найдена")
+            return False
+        
+        text, fetched_urls = self.eis_downloader.fetch_skipped_attachments(reg_number)
+        if not text:
+            self.logger.info(f"{reg_number}: нечего догружать")
+            return False
+        
+        zakupka.combined_text = f"{zakupka.combined_text}\n{text}" if zakupka.combined_text else text
+        if not self.eis.save_zakupka(zakupka):
+            return False
+        # Записи удаляются только после сохранения текста и только для
+        # вложений, давших текст: остальные можно будет догрузить снова
+        self.db.skipped_attachments.delete_many(reg_number, fetched_urls)
+        return True
+    
+    def _save_stage1_batch(
+        self,
+        batch: List[dict],
+        found: int,
+        limit: int,
+        errors: List[str],
+        failed: Dict[str, datetime]
+    ) -> int:
+        """
+        Параллельно загружает документы пачки закупок и сохраняет их в БД.
+        
+        Args:
+            batch: Закупки со страницы поиска
+            found: Сколько закупок уже найдено (для логов)
+            limit: Лимит Stage 1 (для логов)
+            errors: Список ошибок, дополняется на месте
+            failed: Несохранённые закупки (reg_number -> update_date),
+                дополняется на месте
+        
+        Returns:
+            Количество сохранённых закупок
+        """
+        saved = 0
+        for p in batch:
+            self.logger.info(f"📥 Обработка {p.get('reg_number', '')}...")
+        
+        # EISDownloaderService.fetch_combined_text загружает печатную форму
+        # и документы и собирает текст в памяти, без папки закупки
+        futures = self.eis_downloader.fetch_combined_text_many(
+            [p.get('reg_number', '') for p in batch]
+        )
+        
+        for p in batch:
+            reg_number = p.get('reg_number', '')
+            failed[reg_number] = p.get('update_date')
+            try:
+                combined_text = futures[reg_number].result() or ""
+                
+                if not combined_text.strip():
+                    self.logger.warning(f"Нет текста для {reg_number}")
+                    continue
+                
+                # Сохраняем в БД
+                zakupka = Zakupka(
+                    reg_number=reg_number,
+                    description=p.get('description', ''),
+                    update_date=str(p.get('update_date', '')),
+                    link=p.get('link', ''),
+                    combined_text=combined_text
+                )
+                if self.eis.save_zakupka(zakupka):
+                    saved += 1
+                    del failed[reg_number]
+                    
+                    # Обновляем статус на 'raw' (Этап 2)
+                    self.db_service.zakupki.update_status(reg_number, 'raw')
+                    
+                    self.logger.info(f"✅ Сохранена закупка {reg_number} ({found + saved}/{limit})")
+                
+            except Exception as e:
+                errors.append(f"{reg_number}: {e}")
+                self.logger.error(f"Ошибка обработки {reg_number}: {e}")
+        
+        return saved
+    
+    def _update_crawl_state(
+        self,
+        profile: str,
+        state: Optional[CrawlState],
+        crawled: Dict[str, datetime],
+        failed: Dict[str, datetime],
+        complete: bool
+    ):
+        """
+        Запоминает участок выдачи, пройденный обходом профиля.
+        
+        Выдача идёт от свежих закупок к старым, поэтому обход покрывает
+        участок от самой свежей до самой старой обработанной закупки.
+        Если обход дошёл до прошлой отметки (или до конца выдачи), отметка
+        сдвигается на верх участка. Если его остановил лимит, участок
+        сохраняется отдельно (ranges): отметка остаётся, и следующий обход
+        пропустит участок и продолжит со старых закупок.
+        
+        Несохранённые закупки в участок не входят (отметка не поднимается
+        выше самой старой из них), чтобы следующий обход попробовал
+        загрузить их снова.
+        """
+        dates = [d for d in crawled.values() if d and d != datetime.min]
+        if not dates:
+            return
+        
+        def seen_at(date: datetime) -> List[str]:
+            return sorted(reg for reg, d in crawled.items() if d == date and reg not in failed)
+        
+        # Несохранённые закупки делят пройденный участок на части: сами
+        # они не входят ни в одну, и следующий обход загрузит их снова
+        failed_dates = sorted({d for reg, d in failed.items() if reg in crawled and d and d != datetime.min})
+        bounds = [min(dates)] + [d for d in failed_dates if d > min(dates)]
+        bounds.append(max(max(dates), bounds[-1]))
+        segments = [
+            CrawlRange(low=a, high=b, low_seen=seen_at(a), high_seen=seen_at(b))
+            for a, b in zip(bounds, bounds[1:])
+        ]
+        
+        # Обход шёл от верха выдачи, поэтому прошёл все участки прошлых
+        # обходов выше самой старой обработанной закупки
+        ranges = []
+        for r in (state.ranges if state else []):
+            if r.high <= segments[0].low:
+                ranges.append(r)
+                continue
+            index = max(i for i, seg in enumerate(segments) if seg.low < r.high or i == 0)
+            segments[index] = segments[index].merge(r)
+        
+        watermark = state.watermark if state else None
+        seen = set(state.seen_reg_numbers) if state else set()
+        # Полный обход (incremental=False) тоже мог пройти ниже отметки
+        complete = complete or (watermark is not None and segments[0].low < watermark)
+        
+        if complete:
+            # Отметка поднимается до первой несохранённой закупки
+            first = segments.pop(0)
+            if watermark is None or first.high > watermark:
+                watermark, seen = first.high, set(first.high_seen)
+            elif first.high == watermark:
+                seen |= set(first.high_seen)
+            # Участки ниже новой отметки больше не нужны
+            ranges = [r for r in ranges if r.high > watermark]
+        ranges = sorted(ranges + segments, key=lambda r: r.low)
+        
+        self.db.crawl_state.save(CrawlState(
+            profile=profile,
+            watermark=watermark,
+            seen_reg_numbers=sorted(seen),
+            updated_at=datetime.now(),
+            ranges=ranges
+        ))
+        if complete:
+            self.logger.info(f"[{profile}] Отметка обхода: {watermark} ({len(seen)} закупок на эту дату)")
+        else:
+            self.logger.info(
+                f"[{profile}] Обход остановлен до отметки {watermark}: пройдено "
+                f"{segments[0].low} — {segments[-1].high}, участков выше отметки: {len(ranges)}"
+            )
+    
     def _get_print_form(self, reg_number: str) -> str:
         """
         Получает текст печатной формы закупки с ЕИС.
@@ -384,14 +740,13 @@ class Pipeline:
         Returns:
             Текст печатной формы или пустая строка
         """
-        import requests
         from bs4 import BeautifulSoup
         from config import DEFAULT_HEADERS
         
         url = f"https://zakupki.gov.ru/epz/order/notice/zk20/view/common-info.html?regNumber={reg_number}"
         
         try:
-            resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=30)
+            resp = self.http.get(url, headers=DEFAULT_HEADERS, timeout=30)
             resp.raise_for_status()
             
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -456,7 +811,8 @@ class Pipeline:
             
             self.logger.info(f"Найдено {len(zakupki)} закупок для ИИ-обработки")
             
-            for i, zakupka in enumerate(zakupki, 1):
+            pending = []
+            for zakupka in zakupki:
                 reg_number = zakupka.reg_number
                 
                 if not zakupka.combined_text:
@@ -471,12 +827,21 @@ class Pipeline:
                     skipped_already_processed += 1
                     continue
                 
+                pending.append(zakupka)
+            
+            # Запросы к OpenRouter идут параллельно (до OPENROUTER_MAX_IN_FLIGHT),
+            # результаты сохраняются в этом потоке по мере готовности
+            self.logger.info(
+                f"Обработка ИИ: {len(pending)} закупок, одновременно до {settings.openrouter_max_in_flight}"
+            )
+            for i, (zakupka, ai_result, error) in enumerate(self.ai_processor.process_many(pending), 1):
+                reg_number = zakupka.reg_number
+                if error is not None:
+                    errors.append(f"{reg_number}: {error}")
+                    self.logger.error(f"Ошибка ИИ для {reg_number}: {error}")
+                    continue
+                
                 try:
-                    self.logger.info(f"[{i}/{len(zakupki)}] Обработка ИИ: {reg_number}...")
-                    
-                    # Используем ООП-сервис AIProcessorService
-                    ai_result = self.ai_processor.process_zakupka(zakupka)
-                    
                     if ai_result and self.ai.save_result(ai_result):
                         processed += 1
                         if ai_result.city and ai_result.city not in cities:
@@ -485,7 +850,7 @@ class Pipeline:
                         # Обновляем статус на 'ai_ready' (Этап 2)
                         self.db_service.zakupki.update_status(reg_number, 'ai_ready')
                         
-                        self.logger.info(f"✅ Сохранён результат для {reg_number}")
+                        self.logger.info(f"✅ [{i}/{len(pending)}] Сохранён результат для {reg_number}")
                     
                 except Exception as e:
                     errors.append(f"{reg_number}: {e}")
@@ -523,7 +888,7 @@ class Pipeline:
             stage=2,
             success=success,
             message=message,
-            data={"limit": limit, "processed": processed},
+            data={"limit": limit, "processed": processed, "llm_cache": dict(self.ai_processor.cache_stats)},
             errors=errors
         )
     
@@ -0,0 +1,92 @@
+"""
+Репозиторий состояния инкрементального обхода ЕИС.
+"""
+import json
+from datetime import datetime
+from typing import Optional, List
+from repositories.base import BaseRepository
+from models.crawl_state import CrawlState
+
+
+class CrawlStateRepository(BaseRepository[CrawlState]):
+    """Репозиторий для CRUD операций с crawl_state."""
+    
+    def create_table(self) -> bool:
+        """Создаёт таблицу crawl_state."""
+        sql = """
+        CREATE TABLE IF NOT EXISTS crawl_state (
+            profile TEXT PRIMARY KEY,
+            watermark TEXT,
+            seen_reg_numbers TEXT,
+            updated_at TIMESTAMP,
+            ranges TEXT
+        )
+        """
+        try:
+            with self.get_connection() as conn:
+                conn.execute(sql)
+                # Старые БД: участки, пройденные обходами до отметки
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(crawl_state)").fetchall()]
+                if 'ranges' not in columns:
+                    conn.execute("ALTER TABLE crawl_state ADD COLUMN ranges TEXT")
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Ошибка создания таблицы crawl_state: {e}")
+            return False
+    
+    def save(self, state: CrawlState) -> bool:
+        """Сохраняет состояние обхода (upsert по профилю)."""
+        sql = """
+        INSERT OR REPLACE INTO crawl_state (profile, watermark, seen_reg_numbers, updated_at, ranges)
+        VALUES (?, ?, ?, ?, ?)
+        """
+        try:
+            with self.get_connection() as conn:
+                conn.execute(sql, (
+                    state.profile,
+                    state.watermark.isoformat() if state.watermark else None,
+                    json.dumps(sorted(state.seen_reg_numbers)),
+                    (state.updated_at or datetime.now()).isoformat(),
+                    json.dumps([r.to_dict() for r in state.ranges])
+                ))
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Ошибка сохранения crawl_state: {e}")
+            return False
+    
+    def get_by_id(self, profile: str) -> Optional[CrawlState]:
+        """Получает состояние обхода профиля."""
+        sql = "SELECT * FROM crawl_state WHERE profile = ?"
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute(sql, (profile,)).fetchone()
+                if row:
+                    return CrawlState.from_row(row)
+        except Exception as e:
+            self.logger.error(f"Ошибка получения crawl_state: {e}")
+        return None
+    
+    def get_all(self) -> List[CrawlState]:
+        """Получает состояния всех профилей."""
+        sql = "SELECT * FROM crawl_state"
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute(sql).fetchall()
+                return [CrawlState.from_row(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Ошибка получения crawl_state: {e}")
+            return []
+    
+    def delete(self, profile: str) -> bool:
+        """Сбрасывает состояние профиля (следующий обход будет полным)."""
+        sql = "DELETE FROM crawl_state WHERE profile = ?"
+        try:
+            with self.get_connection() as conn:
+                conn.execute(sql, (profile,))
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Ошибка удаления crawl_state: {e}")
+            return False
@@ -0,0 +1,162 @@
+"""
+Репозиторий кэша ответов LLM.
+"""
+from datetime import datetime, timedelta
+from typing import Optional, List
+from repositories.base import BaseRepository
+from models.llm_cache_entry import LLMCacheEntry
+
+
+class LLMCacheRepository(BaseRepository[LLMCacheEntry]):
+    """Репозиторий для CRUD операций с llm_cache."""
+    
+    def create_table(self) -> bool:
+        """Создаёт таблицу llm_cache."""
+        sql = """
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            prompt_hash TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at TIMESTAMP,
+            last_used_at TIMESTAMP,
+            hits INTEGER DEFAULT 0
+        )
+        """
+        try:
+            with self.get_connection() as conn:
+                conn.execute(sql)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at)")
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Ошибка создания таблицы llm_cache: {e}")
+            return False
+    
+    def save(self, entry: LLMCacheEntry) -> bool:
+        """Сохраняет ответ модели (заменяет запись с тем же ключом)."""
+        def _save():
+            now = datetime.now().isoformat()
+            with self.get_connection() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO llm_cache
+                    (cache_key, model, prompt_hash, text_hash, response, created_at, last_used_at, hits)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    entry.cache_key,
+                    entry.model,
+                    entry.prompt_hash,
+                    entry.text_hash,
+                    entry.response,
+                    entry.created_at.isoformat() if entry.created_at else now,
+                    entry.last_used_at.isoformat() if entry.last_used_at else now,
+                    entry.hits
+                ))
+                conn.commit()
+                return True
+        
+        return self.execute_with_retry(_save) or False
+    
+    def get_by_id(self, cache_key: str) -> Optional[LLMCacheEntry]:
+        """Получает запись по ключу."""
+        def _get():
+            with self.get_connection() as conn:
+                row = conn.execute(
+                    "SELECT * FROM llm_cache WHERE cache_key = ?",
+                    (cache_key,)
+                ).fetchone()
+                return LLMCacheEntry.from_row(row) if row else None
+        
+        return self.execute_with_retry(_get)
+    
+    def get(
+        self,
+        model: str,
+        prompt_hash: str,
+        text_hash: str,
+        ttl_s: float = 0
+    ) -> Optional[LLMCacheEntry]:
+        """
+        Ответ на запрос или None. Запись старше ttl_s секунд (0 — без
+        ограничения) считается отсутствующей. Найденная запись отмечается
+        использованной (hits, last_used_at).
+        """
+        cache_key = LLMCacheEntry.make_key(model, prompt_hash, text_hash)
+        
+        def _get():
+            with self.get_connection() as conn:
+                sql = "SELECT * FROM llm_cache WHERE cache_key = ?"
+                params = [cache_key]
+                if ttl_s:
+                    sql += " AND created_at >= ?"
+                    params.append((datetime.now() - timedelta(seconds=ttl_s)).isoformat())
+                row = conn.execute(sql, params).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE llm_cache SET hits = hits + 1, last_used_at = ? WHERE cache_key = ?",
+                    (datetime.now().isoformat(), cache_key)
+                )
+                conn.commit()
+                return LLMCacheEntry.from_row(row)
+        
+        return self.execute_with_retry(_get)
+    
+    def get_all(self) -> List[LLMCacheEntry]:
+        """Получает все записи (последние использованные — первыми)."""
+        def _get_all():
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    "SELECT * FROM llm_cache ORDER BY last_used_at DESC"
+                ).fetchall()
+                return [LLMCacheEntry.from_row(row) for row in rows]
+        
+        return self.execute_with_retry(_get_all) or []
+    
+    def count(self) -> int:
+        """Количество записей."""
+        def _count():
+            with self.get_connection() as conn:
+                return conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        
+        return self.execute_with_retry(_count) or 0
+    
+    def delete(self, cache_key: str) -> bool:
+        """Удаляет запись."""
+        def _delete():
+            with self.get_connection() as conn:
+                cursor = conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (cache_key,))
+                conn.commit()
+                return cursor.rowcount > 0
+        
+        return self.execute_with_retry(_delete) or False
+    
+    def evict(self, ttl_s: float = 0, max_entries: int = 0) -> int:
+        """
+        Удаляет записи старше ttl_s секунд, затем — давно не
+        использованные сверх max_entries (0 — без ограничения).
+        
+        Returns:
+            Сколько записей удалено
+        """
+        def _evict():
+            removed = 0
+            with self.get_connection() as conn:
+                if ttl_s:
+                    cutoff = (datetime.now() - timedelta(seconds=ttl_s)).isoformat()
+                    removed += conn.execute(
+                        "DELETE FROM llm_cache WHERE created_at < ?", (cutoff,)
+                    ).rowcount
+                if max_entries:
+                    removed += conn.execute("""
+                        DELETE FROM llm_cache WHERE cache_key IN (
+                            SELECT cache_key FROM llm_cache
+                            ORDER BY last_used_at DESC
+                            LIMIT -1 OFFSET ?
+                        )
+                    """, (max_entries,)).rowcount
+                conn.commit()
+            return removed
+        
+        return self.execute_with_retry(_evict) or 0
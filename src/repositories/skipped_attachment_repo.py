@@ -0,0 +1,144 @@
+"""
+Репозиторий вложений, пропущенных из-за бюджета загрузки.
+"""
+from datetime import datetime
+from typing import Optional, List
+from repositories.base import BaseRepository
+from models.skipped_attachment import SkippedAttachment
+
+
+class SkippedAttachmentRepository(BaseRepository[SkippedAttachment]):
+    """Репозиторий для CRUD операций с skipped_attachments."""
+    
+    def create_table(self) -> bool:
+        """Создаёт таблицу skipped_attachments."""
+        sql = """
+        CREATE TABLE IF NOT EXISTS skipped_attachments (
+            reg_number TEXT NOT NULL,
+            url TEXT NOT NULL,
+            name TEXT,
+            priority INTEGER,
+            reason TEXT,
+            created_at TIMESTAMP,
+            PRIMARY KEY (reg_number, url)
+        )
+        """
+        try:
+            with self.get_connection() as conn:
+                conn.execute(sql)
+                conn.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Ошибка создания таблицы skipped_attachments: {e}")
+            return False
+    
+    def save(self, attachment: SkippedAttachment) -> bool:
+        """Сохраняет пропущенное вложение."""
+        return self.save_many([attachment]) == 1
+    
+    def save_many(self, attachments: List[SkippedAttachment]) -> int:
+        """Сохраняет пропущенные вложения одной транзакцией."""
+        if not attachments:
+            return 0
+        
+        def _save_many():
+            with self.get_connection() as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO skipped_attachments
+                    (reg_number, url, name, priority, reason, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        a.reg_number,
+                        a.url,
+                        a.name,
+                        a.priority,
+                        a.reason,
+                        (a.created_at or datetime.now()).isoformat()
+                    )
+                    for a in attachments
+                ])
+                conn.commit()
+                return len(attachments)
+        
+        return self.execute_with_retry(_save_many) or 0
+    
+    def get_by_id(self, url: str) -> Optional[SkippedAttachment]:
+        """Получает пропущенное вложение по ссылке."""
+        def _get():
+            with self.get_connection() as conn:
+                row = conn.execute(
+                    "SELECT * FROM skipped_attachments WHERE url = ?",
+                    (url,)
+                ).fetchone()
+                return SkippedAttachment.from_row(row) if row else None
+        
+        return self.execute_with_retry(_get)
+    
+    def get_for_zakupka(self, reg_number: str) -> List[SkippedAttachment]:
+        """Пропущенные вложения закупки в порядке приоритета."""
+        def _get():
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    "SELECT * FROM skipped_attachments WHERE reg_number = ? ORDER BY priority, rowid",
+                    (reg_number,)
+                ).fetchall()
+                return [SkippedAttachment.from_row(row) for row in rows]
+        
+        return self.execute_with_retry(_get) or []
+    
+    def get_all(self) -> List[SkippedAttachment]:
+        """Получает все пропущенные вложения."""
+        def _get_all():
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    "SELECT * FROM skipped_attachments ORDER BY reg_number, priority"
+                ).fetchall()
+                return [SkippedAttachment.from_row(row) for row in rows]
+        
+        return self.execute_with_retry(_get_all) or []
+    
+    def delete(self, reg_number: str, url: str) -> bool:
+        """
+        Удаляет запись о вложении закупки (после догрузки). Одна ссылка
+        бывает у вложений разных закупок — их записи остаются.
+        """
+        def _delete():
+            with self.get_connection() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM skipped_attachments WHERE reg_number = ? AND url = ?",
+                    (reg_number, url)
+                )
+                conn.commit()
+                return cursor.rowcount > 0
+        
+        return self.execute_with_retry(_delete) or False
+    
+    def delete_many(self, reg_number: str, urls: List[str]) -> int:
+        """Удаляет записи о вложениях закупки (после догрузки и сохранения текста)."""
+        if not urls:
+            return 0
+        
+        def _delete_many():
+            with self.get_connection() as conn:
+                cursor = conn.executemany(
+                    "DELETE FROM skipped_attachments WHERE reg_number = ? AND url = ?",
+                    [(reg_number, url) for url in urls]
+                )
+                conn.commit()
+                return cursor.rowcount
+        
+        return self.execute_with_retry(_delete_many) or 0
+    
+    def delete_for_zakupka(self, reg_number: str) -> int:
+        """Удаляет все записи закупки."""
+        def _delete():
+            with self.get_connection() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM skipped_attachments WHERE reg_number = ?",
+                    (reg_number,)
+                )
+                conn.commit()
+                return cursor.rowcount
+        
+        return self.execute_with_retry(_delete) or 0
@@ -1,7 +1,7 @@
 """
 Репозиторий для работы с закупками.
 """
-from typing import Optional, List
+from typing import Optional, List, Dict
 from .base import BaseRepository
 from models.zakupka import Zakupka
 
@@ -27,9 +27,23 @@ class ZakupkaRepository(BaseRepository[Zakupka]):
                         processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         status TEXT DEFAULT 'raw',
                         prepared_by_user_id INTEGER,
-                        prepared_at TIMESTAMP
+                        prepared_at TIMESTAMP,
+                        text_length INTEGER DEFAULT 0
                     )
                 """)
+                
+                # Старые БД: добавляем text_length и заполняем один раз
+                cursor.execute("PRAGMA table_info(zakupki)")
+                columns = [row[1] for row in cursor.fetchall()]
+                if 'text_length' not in columns:
+                    self.logger.info("Добавляем колонку 'text_length' в таблицу zakupki...")
+                    cursor.execute("ALTER TABLE zakupki ADD COLUMN text_length INTEGER DEFAULT 0")
+                    cursor.execute("UPDATE zakupki SET text_length = COALESCE(length(combined_text), 0)")
+                
+                # Покрывающий индекс для get_text_presence: combined_text не читается
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_zakupki_text_length ON zakupki(reg_number, text_length)"
+                )
                 conn.commit()
                 return True
         
@@ -46,8 +60,8 @@ class ZakupkaRepository(BaseRepository[Zakupka]):
                 
                 cursor.execute("""
                     INSERT OR REPLACE INTO zakupki
-                    (reg_number, description, update_date, bid_end_date, initial_price, link, combined_text, two_gis_url, status, prepared_by_user_id, prepared_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    (reg_number, description, update_date, bid_end_date, initial_price, link, combined_text, two_gis_url, status, prepared_by_user_id, prepared_at, text_length)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     zakupka.reg_number,
                     zakupka.description,
@@ -59,13 +73,52 @@ class ZakupkaRepository(BaseRepository[Zakupka]):
                     zakupka.two_gis_url,
                     zakupka.status,
                     zakupka.prepared_by_user_id,
-                    prepared_at_str
+                    prepared_at_str,
+                    len(zakupka.combined_text or "")
                 ))
                 conn.commit()
                 return cursor.rowcount > 0
         
         return self.execute_with_retry(_save) or False
     
+    def save_many(self, zakupki: List[Zakupka]) -> int:
+        """
+        Сохраняет пачку закупок одной транзакцией.
+        
+        Returns:
+            Количество сохранённых закупок
+        """
+        if not zakupki:
+            return 0
+        
+        def _save_many():
+            with self.get_connection() as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO zakupki
+                    (reg_number, description, update_date, bid_end_date, initial_price, link, combined_text, two_gis_url, status, prepared_by_user_id, prepared_at, text_length)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        z.reg_number,
+                        z.description,
+                        z.update_date,
+                        z.bid_end_date,
+                        z.initial_price,
+                        z.link,
+                        z.combined_text,
+                        z.two_gis_url,
+                        z.status,
+                        z.prepared_by_user_id,
+                        z.prepared_at.isoformat() if z.prepared_at else None,
+                        len(z.combined_text or "")
+                    )
+                    for z in zakupki
+                ])
+                conn.commit()
+                return len(zakupki)
+        
+        return self.execute_with_retry(_save_many) or 0
+    
     def get_by_id(self, reg_number: str) -> Optional[Zakupka]:
         """Получает закупку по номеру."""
         def _get():
@@ -98,6 +151,36 @@ class ZakupkaRepository(BaseRepository[Zakupka]):
                 
         return self.execute_with_retry(_get_many) or []
 
+    def get_text_presence(self, reg_numbers: List[str]) -> Dict[str, bool]:
+        """
+        Проверяет наличие закупок и текста одним запросом.
+        
+        Читает только покрывающий индекс (reg_number, text_length),
+        сам combined_text не загружается.
+        
+        Args:
+            reg_numbers: Номера закупок
+        
+        Returns:
+            Словарь reg_number -> есть ли combined_text; отсутствующих
+            в БД закупок в словаре нет
+        """
+        if not reg_numbers:
+            return {}
+        
+        def _get():
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                placeholders = ','.join(['?'] * len(reg_numbers))
+                cursor.execute(
+                    f"SELECT reg_number, text_length FROM zakupki INDEXED BY idx_zakupki_text_length "
+                    f"WHERE reg_number IN ({placeholders})",
+                    list(reg_numbers)
+                )
+                return {row['reg_number']: bool(row['text_length']) for row in cursor.fetchall()}
+        
+        return self.execute_with_retry(_get) or {}
+    
     def get_all(self) -> List[Zakupka]:
         """Получает все закупки."""
         def _get_all():
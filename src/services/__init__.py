@@ -1,19 +1,24 @@
 # services/__init__.py
-from .database_service import DatabaseService, get_database_service
-from .eis_service import EISService
-from .ai_service import AIService
-from .gis_service import GISService
-from .scraper_service import ScraperService
-from .eis_downloader_service import EISDownloaderService
-from .ai_processor_service import AIProcessorService
+# Сервисы импортируются при первом обращении: `from services.database_service
+# import ...` не должен тянуть requests и остальные сервисы
+import importlib
 
-__all__ = [
-    'DatabaseService',
-    'get_database_service',
-    'EISService',
-    'AIService',
-    'GISService',
-    'ScraperService',
-    'EISDownloaderService',
-    'AIProcessorService'
-]
+_EXPORTS = {
+    'DatabaseService': '.database_service',
+    'get_database_service': '.database_service',
+    'EISService': '.eis_service',
+    'AIService': '.ai_service',
+    'GISService': '.gis_service',
+    'ScraperService': '.scraper_service',
+    'EISDownloaderService': '.eis_downloader_service',
+    'AIProcessorService': '.ai_processor_service',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -1,10 +1,15 @@
 """
 Сервис для ИИ-обработки закупок через OpenRouter.
 """
+import hashlib
+import itertools
 import json
 import os
 import re
-from typing import Optional, Dict, Any, List
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+from urllib.parse import urlparse
 import requests
 from requests.exceptions import JSONDecodeError
 
@@ -13,10 +18,14 @@ from config import (
     OPENROUTER_API_URL,
     OPENROUTER_MODEL,
 )
+from config.settings import settings
 from models.ai_result import AIResult
+from models.llm_cache_entry import LLMCacheEntry
 from models.zakupka import Zakupka
 from repositories.ai_result_repo import AIResultRepository
+from repositories.llm_cache_repo import LLMCacheRepository
 from utils.logger import get_logger
+from utils.rate_limiter import get_rate_limiter
 
 
 class AIProcessorService:
@@ -74,18 +83,28 @@ class AIProcessorService:
         self,
         ai_result_repo: AIResultRepository = None,
         api_key: str = None,
-        model_name: str = None
+        model_name: str = None,
+        cache_repo: LLMCacheRepository = None
     ):
         """
         Args:
             ai_result_repo: Репозиторий для сохранения результатов
             api_key: API ключ OpenRouter (по умолчанию из env)
             model_name: Название модели (по умолчанию из config)
+            cache_repo: Кэш ответов модели (None — без кэша)
         """
         self.repo = ai_result_repo
         self.api_key = api_key or os.getenv(OPENROUTER_API_KEY_ENV)
         self.model_name = model_name or OPENROUTER_MODEL
+        self.limiter = get_rate_limiter("openrouter")
         self.logger = get_logger("AIProcessorService")
+        
+        # Ответы кэшируются по (модель, хэш промпта, хэш текста): смена
+        # SYSTEM_PROMPT или модели автоматически даёт новые ключи
+        self.cache_repo = cache_repo
+        self.prompt_hash = hashlib.sha256(self.SYSTEM_PROMPT.encode("utf-8")).hexdigest()
+        self.cache_stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0}
+        self._stats_lock = threading.Lock()
     
     def _prepare_text(self, text: str) -> tuple[str, bool]:
         """Подготавливает текст для промпта (обрезает если нужно)."""
@@ -97,10 +116,10 @@ class AIProcessorService:
         return head + marker + tail, True
     
     def _call_openrouter(self, text: str) -> Dict[str, Any]:
-        """Вызывает OpenRouter API и возвращает извлечённые поля."""
-        if not self.api_key:
-            raise RuntimeError(f"Не найден API ключ в переменной окружения {OPENROUTER_API_KEY_ENV}")
-        
+        """
+        Вызывает OpenRouter API и возвращает извлечённые поля.
+        Ответ на уже встречавшийся текст берётся из кэша без запроса.
+        """
         prepared_text, truncated = self._prepare_text(text)
         user_prompt = (
             "Ниже приведён объединённый текст по закупке.\n"
@@ -111,6 +130,16 @@ class AIProcessorService:
         if truncated:
             user_prompt += "\n(Текст был автоматически сокращён.)"
         
+        text_hash = hashlib.sha256(user_prompt.encode("utf-8")).hexdigest()
+        cached = self._cache_get(text_hash)
+        if cached is not None:
+            result = self._parse_content(cached)
+            if result is not None:
+                return result
+        
+        if not self.api_key:
+            raise RuntimeError(f"Не найден API ключ в переменной окружения {OPENROUTER_API_KEY_ENV}")
+        
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -126,11 +155,15 @@ class AIProcessorService:
             "transforms": ["middle-out"],
         }
         
-        resp = requests.post(
-            OPENROUTER_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=120,
+        # 429/5xx повторяются с backoff и с учётом Retry-After
+        resp = self.limiter.call(
+            urlparse(OPENROUTER_API_URL).netloc,
+            lambda: requests.post(
+                OPENROUTER_API_URL,
+                headers=headers,
+                json=payload,
+                timeout=120,
+            ),
         )
         
         self.logger.debug(f"OpenRouter status: {resp.status_code}")
@@ -146,7 +179,15 @@ class AIProcessorService:
             self.logger.error(f"Ошибка парсинга ответа API: {e}")
             return self._empty_result()
         
-        # Парсим JSON из content
+        result = self._parse_content(content)
+        if result is None:
+            return self._empty_result()
+        # В кэш попадают только ответы, которые удалось разобрать
+        self._cache_put(text_hash, content)
+        return result
+    
+    def _parse_content(self, content: str) -> Optional[Dict[str, Any]]:
+        """Разбирает JSON из ответа модели; None — ответ не разобран."""
         try:
             content = content.strip()
             if content.startswith("```"):
@@ -160,11 +201,65 @@ class AIProcessorService:
                 self.logger.warning("OpenRouter вернул список, используем первый элемент или пустой результат")
                 if result and isinstance(result[0], dict):
                     return result[0]
-                return self._empty_result()
+                return None
             return result
         except Exception as e:
             self.logger.error(f"Ошибка парсинга JSON от модели: {e}")
-            return self._empty_result()
+            return None
+    
+    # ---- Кэш ответов ----
+    
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.cache_stats[key] += 1
+    
+    def _cache_get(self, text_hash: str) -> Optional[str]:
+        """Ответ модели из кэша или None. Ошибка кэша не прерывает обработку."""
+        if self.cache_repo is None:
+            return None
+        try:
+            entry = self.cache_repo.get(
+                self.model_name,
+                self.prompt_hash,
+                text_hash,
+                ttl_s=settings.llm_cache_ttl_days * 86400
+            )
+        except Exception as e:
+            self.logger.warning(f"Кэш ответов LLM недоступен: {e}")
+            return None
+        self._count("misses" if entry is None else "hits")
+        return entry.response if entry else None
+    
+    def _cache_put(self, text_hash: str, content: str):
+        if self.cache_repo is None:
+            return
+        entry = LLMCacheEntry(
+            model=self.model_name,
+            prompt_hash=self.prompt_hash,
+            text_hash=text_hash,
+            response=content
+        )
+        try:
+            if self.cache_repo.save(entry):
+                self._count("stores")
+        except Exception as e:
+            self.logger.warning(f"Не удалось сохранить ответ LLM в кэш: {e}")
+    
+    def evict_cache(self) -> int:
+        """Удаляет устаревшие (LLM_CACHE_TTL_DAYS) и лишние (LLM_CACHE_MAX_ENTRIES) ответы."""
+        if self.cache_repo is None:
+            return 0
+        try:
+            removed = self.cache_repo.evict(
+                ttl_s=settings.llm_cache_ttl_days * 86400,
+                max_entries=settings.llm_cache_max_entries
+            )
+        except Exception as e:
+            self.logger.warning(f"Ошибка очистки кэша ответов LLM: {e}")
+            return 0
+        if removed:
+            self.logger.info(f"Кэш ответов LLM: удалено {removed} записей")
+        return removed
     
     def _empty_result(self) -> Dict[str, Any]:
         """Возвращает пустую структуру результата."""
@@ -344,17 +439,60 @@ class AIProcessorService:
             self.logger.error(f"Ошибка обработки {zakupka.reg_number}: {e}")
             return None
     
+    def process_many(
+        self,
+        zakupki: List[Zakupka],
+        max_in_flight: int = None
+    ) -> Iterator[Tuple[Zakupka, Optional[AIResult], Optional[Exception]]]:
+        """
+        Обрабатывает закупки параллельно в пуле потоков.
+        
+        Одновременно выполняется не больше max_in_flight запросов к
+        OpenRouter (частоту запросов по-прежнему ограничивает limiter).
+        Следующая закупка отправляется, как только освобождается место,
+        поэтому Stage 2 упирается в пропускную способность API, а не в
+        задержку одного ответа.
+        
+        Args:
+            zakupki: Закупки для обработки
+            max_in_flight: Одновременных запросов (по умолчанию — OPENROUTER_MAX_IN_FLIGHT)
+        
+        Yields:
+            (закупка, AIResult или None, исключение или None) — в порядке
+            готовности, а не в порядке zakupki
+        """
+        max_in_flight = max(1, max_in_flight or settings.openrouter_max_in_flight)
+        self.evict_cache()
+        queue = iter(zakupki)
+        in_flight: Dict[Future, Zakupka] = {}
+        
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="stage2") as executor:
+            def fill():
+                for zakupka in itertools.islice(queue, max_in_flight - len(in_flight)):
+                    in_flight[executor.submit(self.process_zakupka, zakupka)] = zakupka
+            
+            fill()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    zakupka = in_flight.pop(future)
+                    error = future.exception()
+                    yield zakupka, (None if error else future.result()), error
+                fill()
+    
     def process_and_save(
         self,
         zakupki: List[Zakupka],
-        skip_existing: bool = True
+        skip_existing: bool = True,
+        max_in_flight: int = None
     ) -> tuple[int, List[str], List[str]]:
         """
-        Обрабатывает список закупок и сохраняет результаты.
+        Обрабатывает список закупок и сохраняет результаты по мере готовности.
         
         Args:
             zakupki: Список закупок
             skip_existing: Пропускать уже обработанные
+            max_in_flight: Одновременных запросов к OpenRouter
         
         Returns:
             Кортеж (обработано, список городов, список ошибок)
@@ -363,6 +501,7 @@ class AIProcessorService:
         cities = []
         errors = []
         
+        pending = []
         for zakupka in zakupki:
             # Проверяем существующий результат
             if skip_existing and self.repo:
@@ -370,9 +509,14 @@ class AIProcessorService:
                 if existing:
                     self.logger.debug(f"Пропуск {zakupka.reg_number} — уже обработан")
                     continue
-            
+            pending.append(zakupka)
+        
+        # Сохранение — в этом потоке, запросы к API — в пуле
+        for zakupka, ai_result, error in self.process_many(pending, max_in_flight):
+            if error is not None:
+                errors.append(f"{zakupka.reg_number}: {error}")
+                continue
             try:
-                ai_result = self.process_zakupka(zakupka)
                 if ai_result:
                     # Сохраняем
                     if self.repo and self.repo.save(ai_result):
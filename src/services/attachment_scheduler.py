@@ -0,0 +1,153 @@
+"""
+Очерёдность и бюджет загрузки вложений закупки.
+
+Для Stage 2 обычно достаточно печатной формы, технического задания
+(описания объекта закупки) и проекта контракта, а сметы, чертежи и
+сканы только расходуют трафик и время. Вложения ранжируются по имени
+и типу файла и скачиваются по порядку, пока не исчерпан бюджет
+закупки; остальные записываются как пропущенные.
+"""
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+
+
+# Шаблоны имён (в нижнем регистре) -> приоритет; меньше — важнее
+NAME_PRIORITIES: List[Tuple[re.Pattern, int]] = [
+    (re.compile(r"техническ\w*\s+задани|(^|[^а-яё])т\.?\s?з([^а-яё]|$)"), 0),
+    (re.compile(r"описани\w*\s+объект\w*\s+закупк|(^|[^а-яё])ооз([^а-яё]|$)"), 0),
+    (re.compile(r"характеристик\w*\s+(объект|жил|квартир|помещ)"), 1),
+    (re.compile(r"проект\w*\s+(государствен\w*\s+|муниципальн\w*\s+)?(контракт|договор)"), 2),
+    (re.compile(r"извещени|требовани\w*\s+к\s+содержани"), 3),
+    (re.compile(r"обосновани\w*|нмцк|начальн\w*\s+\(?максимальн"), 6),
+    (re.compile(r"смет|чертеж|чертёж|план\w*|схем\w*|фото|скан|локальн"), 8),
+]
+DEFAULT_NAME_PRIORITY = 5
+
+# Тип по расширению имени: текстовые документы раньше таблиц и архивов
+TYPE_PRIORITIES: Dict[str, int] = {
+    ".docx": 0, ".doc": 0, ".rtf": 0, ".txt": 0,
+    ".pdf": 1,
+    ".xlsx": 2, ".xls": 2,
+    ".zip": 3, ".rar": 3, ".7z": 3,
+}
+DEFAULT_TYPE_PRIORITY = 4
+
+
+def attachment_priority(doc: Dict) -> int:
+    """Приоритет вложения по имени и расширению (меньше — важнее)."""
+    name = (doc.get("name") or "").lower()
+    name_priority = DEFAULT_NAME_PRIORITY
+    for pattern, priority in NAME_PRIORITIES:
+        if pattern.search(name):
+            name_priority = priority
+            break
+    ext = PurePosixPath(name).suffix
+    return name_priority * 10 + TYPE_PRIORITIES.get(ext, DEFAULT_TYPE_PRIORITY)
+
+
+def rank_attachments(docs: List[Dict]) -> List[Dict]:
+    """Вложения в порядке загрузки; при равном приоритете — как на ЕИС."""
+    return sorted(docs, key=attachment_priority)
+
+
+@dataclass
+class AttachmentBudget:
+    """Бюджет закупки на вложения (0 — без ограничения)."""
+    max_bytes: int = 0          # Суммарный размер скачанных файлов
+    max_seconds: float = 0.0    # Время с начала загрузки вложений
+    max_chars: int = 0          # Суммарная длина извлечённого текста
+
+    @classmethod
+    def from_settings(cls) -> "AttachmentBudget":
+        """Бюджет из EIS_ATTACHMENT_BUDGET_*."""
+        return cls(
+            max_bytes=settings.eis_attachment_budget_mb * 1024 * 1024,
+            max_seconds=settings.eis_attachment_budget_s,
+            max_chars=settings.eis_attachment_budget_chars,
+        )
+
+
+class AttachmentScheduler:
+    """
+    Выдаёт вложения закупки по приоритету и следит за бюджетом.
+
+    Бюджет проверяется перед началом каждой загрузки. Одновременно
+    идёт не больше window загрузок (submit), поэтому бюджет может
+    быть превышен не больше чем на window - 1 файл. Всё, что не начато
+    к моменту исчерпания бюджета, попадает в skipped с причиной.
+
+    Пример:
+        scheduler = AttachmentScheduler(docs)
+        for doc, future in scheduler.submit(lambda doc: pool.submit(download, doc)):
+            text = future.result()  # download вызывает scheduler.record
+    """
+
+    def __init__(self, docs: List[Dict], budget: AttachmentBudget = None, window: int = None):
+        """
+        Args:
+            docs: Вложения [{"name", "url"}]
+            budget: Бюджет (по умолчанию — из settings)
+            window: Сколько загрузок идёт одновременно (по умолчанию —
+                EIS_ATTACHMENT_WINDOW)
+        """
+        self.budget = budget or AttachmentBudget.from_settings()
+        self.window = max(1, window or settings.eis_attachment_window)
+        self.ordered = rank_attachments(docs)
+        self.skipped: List[Tuple[Dict, str]] = []
+        self.bytes_used = 0
+        self.chars_used = 0
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def exhausted(self) -> Optional[str]:
+        """Какой бюджет исчерпан (bytes, time, chars) или None."""
+        budget = self.budget
+        if budget.max_bytes and self.bytes_used >= budget.max_bytes:
+            return "bytes"
+        if budget.max_chars and self.chars_used >= budget.max_chars:
+            return "chars"
+        if budget.max_seconds and time.monotonic() - self._started_at >= budget.max_seconds:
+            return "time"
+        return None
+
+    def try_start(self, doc: Dict) -> bool:
+        """
+        Можно ли начинать загрузку вложения. Если бюджет исчерпан,
+        вложение записывается в skipped.
+        """
+        with self._lock:
+            reason = self.exhausted()
+            if reason:
+                self.skipped.append((doc, reason))
+                return False
+            return True
+
+    def submit(self, start: Callable[[Dict], Future]) -> Iterator[Tuple[Dict, Future]]:
+        """
+        Запускает загрузки по приоритету через start, не больше window
+        за раз, и отдаёт (вложение, Future) в том же порядке. Следующее
+        вложение проверяется по бюджету, когда вызывающий забрал самую
+        старую загрузку, — к этому моменту она учтена в record.
+        """
+        pending: deque = deque()
+        for doc in self.ordered:
+            while len(pending) >= self.window:
+                yield pending.popleft()
+            if self.try_start(doc):
+                pending.append((doc, start(doc)))
+        while pending:
+            yield pending.popleft()
+
+    def record(self, doc: Dict, size: int, chars: int):
+        """Учитывает скачанное вложение в бюджете."""
+        with self._lock:
+            self.bytes_used += size or 0
+            self.chars_used += chars or 0
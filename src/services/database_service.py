@@ -7,6 +7,9 @@ from config.settings import settings
 from repositories import ZakupkaRepository, AIResultRepository, ListingRepository, UserRepository, DecisionRepository
 from repositories.user_override_repo import UserOverrideRepository
 from repositories.user_selection_repo import UserSelectionRepository
+from repositories.crawl_state_repo import CrawlStateRepository
+from repositories.skipped_attachment_repo import SkippedAttachmentRepository
+from repositories.llm_cache_repo import LLMCacheRepository
 from utils.logger import get_logger
 
 
@@ -32,6 +35,9 @@ class DatabaseService:
         self.decisions = DecisionRepository(self.db_path)
         self.user_overrides = UserOverrideRepository(self.db_path)
         self.user_selections = UserSelectionRepository(self.db_path)
+        self.crawl_state = CrawlStateRepository(self.db_path)
+        self.skipped_attachments = SkippedAttachmentRepository(self.db_path)
+        self.llm_cache = LLMCacheRepository(self.db_path)
         
         self.logger.debug(f"DatabaseService инициализирован: {self.db_path}")
     
@@ -55,7 +61,10 @@ class DatabaseService:
             self.users.create_table(),
             self.decisions.create_table(),
             self.user_overrides.create_table(),
-            self.user_selections.create_table()
+            self.user_selections.create_table(),
+            self.crawl_state.create_table(),
+            self.skipped_attachments.create_table(),
+            self.llm_cache.create_table()
         ])
         
         if success:
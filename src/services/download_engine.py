@@ -0,0 +1,74 @@
+"""
+Движок параллельной загрузки документов с ЕИС.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from config.settings import settings
+from utils.logger import get_logger
+
+
+class DownloadEngine:
+    """
+    Ограниченный пул потоков для загрузки файлов.
+
+    Два уровня параллельности:
+        - закупки (submit_purchase) — несколько закупок одновременно;
+        - файлы (submit) — печатная форма и вложения одной закупки.
+
+    Пулы разделены, чтобы задача закупки, ожидающая свои вложения,
+    не занимала поток, нужный этим вложениям (иначе возможен deadlock).
+    Число одновременных соединений с одним хостом ограничивает HttpClient.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_purchases: int = None
+    ):
+        """
+        Args:
+            max_workers: Потоков для загрузки файлов
+            max_purchases: Закупок, обрабатываемых одновременно
+        """
+        self.max_workers = max_workers or settings.eis_download_workers
+        self.max_purchases = max_purchases or settings.eis_parallel_purchases
+        self.logger = get_logger("DownloadEngine")
+
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = None
+        self._purchase_executor: ThreadPoolExecutor = None
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Ставит в очередь задачу уровня файла."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="eis-download"
+                )
+            executor = self._executor
+        return executor.submit(fn, *args, **kwargs)
+
+    def submit_purchase(self, fn: Callable, *args, **kwargs) -> Future:
+        """Ставит в очередь задачу уровня закупки."""
+        with self._lock:
+            if self._purchase_executor is None:
+                self._purchase_executor = ThreadPoolExecutor(
+                    max_workers=self.max_purchases,
+                    thread_name_prefix="eis-purchase"
+                )
+            executor = self._purchase_executor
+        return executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        """Останавливает пулы потоков."""
+        with self._lock:
+            executors = [self._purchase_executor, self._executor]
+            self._executor = None
+            self._purchase_executor = None
+        # Сначала закупки: они ждут результатов из пула файлов
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=wait)
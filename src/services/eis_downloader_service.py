@@ -5,18 +5,32 @@ import os
 import re
 import time
 import hashlib
+import tempfile
+import threading
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import Future
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import BinaryIO, Callable, List, Dict, Optional, Tuple
 from pathlib import Path
 from urllib.parse import urlparse, unquote
 
-import requests
-from bs4 import BeautifulSoup
-
+from config.search_profiles import SearchProfile, default_search_profile, load_search_profiles
 from config.settings import settings
+from models.skipped_attachment import SkippedAttachment
 from models.zakupka import Zakupka
+from repositories.skipped_attachment_repo import SkippedAttachmentRepository
 from repositories.zakupka_repo import ZakupkaRepository
+from services.attachment_scheduler import AttachmentBudget, AttachmentScheduler, attachment_priority
+from services.download_engine import DownloadEngine
+from services.eis_html_parser import BaseEISParser, get_html_parser
+from services.extraction_service import TextExtractionService
+from services.http_cache import HttpCache
+from services.http_client import HttpClient
+from services.search_prefetcher import SearchPagePrefetcher, interleave_pages
+from services.text_cache import TextCache, get_text_cache
+from text_normalization import NormalizationStats, ParagraphDeduplicator, join_pages, normalize_text
 from utils.logger import get_logger
+from utils.rate_limiter import RETRY_STATUSES, backoff_delay
 
 
 class EISDownloaderService:
@@ -24,40 +38,25 @@ class EISDownloaderService:
     Сервис для загрузки закупок с ЕИС.
     
     Методы:
-        search_zakupki: Поиск закупок по запросу
-        download_documents: Загрузка документов закупки
+        search_zakupki: Поиск закупок по профилям поиска
+        fetch_combined_text: Загрузка документов закупки и сборка текста в памяти
+        fetch_combined_text_many: То же для нескольких закупок параллельно
+        download_documents: Загрузка документов закупки в папку с combined_text.txt
+        download_documents_many: Параллельная загрузка нескольких закупок
+        fetch_skipped_attachments: Догрузка вложений, пропущенных из-за бюджета
         download_and_save: Полный цикл загрузки и сохранения
     """
     
-    # URL для поиска закупок (ОКПД2 68.10.11 = покупка жилья)
-    # Параметры:
-    #   - sortBy=UPDATE_DATE — сортировка по дате обновления
-    #   - fz44=on — только 44-ФЗ
-    #   - orderStages=AF — стадия "подача заявок" (AF = Application Filing)
-    #   - okpd2IdsCodes=68.10.11.000 — код ОКПД2 (покупка жилья)
-    BASE_SEARCH_URL = (
-        "https://zakupki.gov.ru/epz/order/extendedsearch/results.html"
-        "?morphology=on"
-        "&search-filter=%D0%94%D0%B0%D1%82%D0%B5+%D0%BE%D0%B1%D0%BD%D0%BE%D0%B2%D0%BB%D0%B5%D0%BD%D0%B8%D1%8F"
-        "&sortDirection=false"
-        "&recordsPerPage=_10"
-        "&showLotsInfoHidden=false"
-        "&sortBy=UPDATE_DATE"
-        "&fz44=on"
-        "&af=on"
-        "&orderStages=AF"
-        "&currencyIdGeneral=-1"
-        "&okpd2Ids=8890776"
-        "&okpd2IdsCodes=68.10.11.000"
-        "&pageNumber={page}"
-    )
-    
     DEFAULT_HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
     }
     
+    # Потоковая загрузка: размер куска и сколько байт нужно для определения типа
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    SNIFF_BYTES = 2048
+    
     # Ключевые слова для исключения
     EXCLUDED_KEYWORDS = [
         "многолотовый", "несколько объектов", "комплекс",
@@ -68,69 +67,111 @@ class EISDownloaderService:
     def __init__(
         self,
         zakupka_repo: ZakupkaRepository = None,
-        zakupki_dir: str = None
+        zakupki_dir: str = None,
+        engine: DownloadEngine = None,
+        http_client: HttpClient = None,
+        html_parser: BaseEISParser = None,
+        cache: HttpCache = None,
+        skipped_repo: SkippedAttachmentRepository = None,
+        extractor: TextExtractionService = None,
+        text_cache: TextCache = None
     ):
         """
         Args:
             zakupka_repo: Репозиторий для сохранения закупок
             zakupki_dir: Директория для хранения документов
+            engine: Движок параллельной загрузки (по умолчанию — из settings)
+            http_client: Общий HTTP-клиент с пулом соединений
+            html_parser: Парсер HTML-страниц ЕИС (по умолчанию — EIS_HTML_PARSER)
+            cache: Дисковый кэш страниц и вложений (по умолчанию — если HTTP_CACHE_ENABLED)
+            skipped_repo: Куда записывать вложения, пропущенные из-за бюджета
+            extractor: Пул процессов для извлечения текста (по умолчанию —
+                если EXTRACT_POOL_ENABLED; иначе текст извлекается в потоке загрузки)
+            text_cache: Кэш извлечённого текста (по умолчанию — если TEXT_CACHE_ENABLED)
         """
         self.repo = zakupka_repo
         self.zakupki_dir = Path(zakupki_dir or settings.zakupki_dir)
+        self.engine = engine or DownloadEngine()
+        self.http = http_client or HttpClient()
+        self.html_parser = html_parser or get_html_parser()
+        self.cache = cache or (HttpCache() if settings.http_cache_enabled else None)
+        self.skipped_repo = skipped_repo
+        self.extractor = extractor or (TextExtractionService() if settings.extract_pool_enabled else None)
+        # Переданные снаружи клиент и пул закрывает их владелец
+        self._owns_http = http_client is None
+        self._owns_extractor = extractor is None
+        self.text_cache = text_cache or get_text_cache()
         self.logger = get_logger("EISDownloaderService")
+        
+        # Сколько текста убрала нормализация (по всем закупкам)
+        self.normalization_stats = NormalizationStats()
+        self._stats_lock = threading.Lock()
     
     def search_zakupki(
         self,
         limit: int = 10,
-        pages_to_scan: int = 20
+        pages_to_scan: int = 20,
+        profiles: List[SearchProfile] = None
     ) -> List[Dict]:
         """
-        Поиск закупок на ЕИС по ОКП2 68.10.11 (покупка жилья).
+        Поиск закупок на ЕИС по профилям поиска (по умолчанию —
+        ОКПД2 68.10.11, покупка жилья).
+        
+        Профили листаются одновременно; закупка, найденная несколькими
+        профилями, попадает в результат один раз.
         
         Args:
             limit: Максимальное количество результатов
-            pages_to_scan: Количество страниц для сканирования
+            pages_to_scan: Количество страниц для сканирования (на профиль)
+            profiles: Профили поиска (по умолчанию — из EIS_SEARCH_PROFILES_PATH)
         
         Returns:
-            Список словарей с данными закупок
+            Список словарей с данными закупок (profile — имя профиля)
         """
-        self.logger.info(f"Поиск закупок ОКПД2 68.10.11, лимит: {limit}")
+        profiles = profiles or load_search_profiles()
+        self.logger.info(
+            f"Поиск закупок, профили: {', '.join(p.name for p in profiles)}, лимит: {limit}"
+        )
         
         all_purchases: List[Dict] = []
-        page = 1
-        
-        while page <= pages_to_scan and len(all_purchases) < limit * 5:
-            self.logger.debug(f"Загружаем страницу {page}...")
-            
-            html = self._fetch_search_page(page)
-            if not html:
-                # Если первая страница не загрузилась — сайт недоступен, прерываем
-                if page == 1:
-                    self.logger.error("Сайт ЕИС недоступен (первая страница не загрузилась после 3 попыток)")
-                    return []
-                # Для остальных страниц — продолжаем, возможно временный сбой
-                page += 1
-                continue
-            
-            page_purchases = self._parse_purchases_from_html(html)
-            if not page_purchases:
-                page += 1
-                continue
-            
-            # Фильтруем по исключающим ключевым словам
-            for p in page_purchases:
-                desc_lower = (p.get("description") or "").lower()
-                excluded = False
-                for keyword in self.EXCLUDED_KEYWORDS:
-                    if keyword in desc_lower:
-                        self.logger.debug(f"Пропуск {p['reg_number']}: '{keyword}'")
-                        excluded = True
-                        break
-                if not excluded:
-                    all_purchases.append(p)
-            
-            page += 1
-            time.sleep(1)
+        seen_reg_numbers = set()
+        
+        # Следующие страницы загружаются и парсятся, пока разбирается текущая
+        with ExitStack() as stack:
+            sources = {
+                profile.name: stack.enter_context(self.iter_search_pages(pages_to_scan, profile))
+                for profile in profiles
+            }
+            for name, page, page_purchases in interleave_pages(sources):
+                if page_purchases is None:
+                    # Если первая страница не загрузилась — сайт недоступен, профиль прерываем
+                    if page == 1:
+                        self.logger.error(
+                            f"Сайт ЕИС недоступен (первая страница профиля {name} не загрузилась)"
+                        )
+                        sources[name].close()
+                    # Для остальных страниц — продолжаем, возможно временный сбой
+                    continue
+                
+                # Фильтруем по исключающим ключевым словам
+                for p in page_purchases:
+                    if p["reg_number"] in seen_reg_numbers:
+                        continue
+                    seen_reg_numbers.add(p["reg_number"])
+                    
+                    desc_lower = (p.get("description") or "").lower()
+                    excluded = False
+                    for keyword in self.EXCLUDED_KEYWORDS:
+                        if keyword in desc_lower:
+                            self.logger.debug(f"Пропуск {p['reg_number']}: '{keyword}'")
+                            excluded = True
+                            break
+                    if not excluded:
+                        p["profile"] = name
+                        all_purchases.append(p)
+                
+                if len(all_purchases) >= limit * 5:
+                    break
         
         # Сортируем по дате и берём нужное количество
         all_purchases.sort(key=lambda x: x.get("update_date", datetime.min), reverse=True)
@@ -139,13 +180,118 @@ class EISDownloaderService:
         self.logger.info(f"Найдено {len(selected)} закупок")
         return selected
     
-    def download_documents(self, reg_number: str) -> Optional[str]:
+    def iter_search_pages(
+        self,
+        max_pages: int = 20,
+        profile: SearchProfile = None
+    ) -> SearchPagePrefetcher:
+        """
+        Листает страницы поиска с упреждающей загрузкой.
+        
+        Использовать в with: выход из блока прекращает загрузку
+        оставшихся страниц.
+        
+        Args:
+            max_pages: Сколько страниц можно просмотреть
+            profile: Профиль поиска (по умолчанию — ОКПД2 68.10.11)
+        
+        Returns:
+            Итератор (номер страницы, закупки или None, если страница не загрузилась)
+        """
+        profile = profile or default_search_profile()
+        return SearchPagePrefetcher(
+            lambda page: self._fetch_search_page(page, profile),
+            self._parse_purchases_from_html,
+            max_pages
+        )
+    
+    def fetch_combined_text(
+        self,
+        reg_number: str,
+        docs: Optional[List[Dict]] = None,
+        print_form_text: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Загружает документы закупки и возвращает объединённый текст.
+        
+        Печатная форма и вложения скачиваются параллельно, текст из
+        каждого файла извлекается сразу после его загрузки. Вложения
+        скачиваются по приоритету, пока не исчерпан бюджет закупки
+        (EIS_ATTACHMENT_BUDGET_*); пропущенные записываются в
+        skipped_repo. Вложения читаются в память (большие — во временный файл, см.
+        EIS_SPOOL_MAX_MB); на диск они попадают, только если включён
+        кэш. Папка закупки и combined_text.txt не создаются.
+        
+        Args:
+            reg_number: Регистрационный номер закупки
+            docs: Готовый список вложений [{"name", "url"}] — тогда
+                страница документов не запрашивается
+            print_form_text: Готовый текст извещения — тогда печатная
+                форма не запрашивается
+        
+        Returns:
+            Текст: печатная форма, затем документы; None, если текста нет
+        """
+        return self._collect_texts(reg_number, docs, print_form_text)
+    
+    def fetch_skipped_attachments(self, reg_number: str) -> Tuple[Optional[str], List[str]]:
+        """
+        Догружает вложения закупки, пропущенные из-за бюджета, без
+        ограничений бюджета.
+        
+        Записи о пропущенных вложениях не удаляются: вызывающий удаляет
+        их (skipped_repo.delete_many) после того, как сохранит текст,
+        иначе при сбое вложения уже нельзя будет догрузить.
+        
+        Returns:
+            (текст догруженных документов — части "=== Документ: ... ===" —
+            или None, URL вложений, из которых извлёкся текст)
+        """
+        if self.skipped_repo is None:
+            return None, []
+        skipped = self.skipped_repo.get_for_zakupka(reg_number)
+        if not skipped:
+            return None, []
+        
+        fetched: List[Dict] = []
+        text = self._collect_texts(
+            reg_number,
+            [a.to_doc() for a in skipped],
+            print_form_text="",
+            budget=AttachmentBudget(),
+            fetched=fetched
+        )
+        return text, [doc["url"] for doc in fetched]
+    
+    def fetch_combined_text_many(
+        self,
+        reg_numbers: List[str]
+    ) -> Dict[str, Future]:
+        """
+        Запускает параллельную загрузку текстов нескольких закупок.
+        
+        Returns:
+            Словарь reg_number -> Future с результатом fetch_combined_text
+        """
+        return {
+            reg_number: self.engine.submit_purchase(self.fetch_combined_text, reg_number)
+            for reg_number in reg_numbers
+        }
+    
+    def download_documents(
+        self,
+        reg_number: str,
+        docs: Optional[List[Dict]] = None,
+        print_form_text: Optional[str] = None
+    ) -> Optional[str]:
         """
-        Загружает все документы закупки и создаёт combined_text.txt.
-        Сначала загружается печатная форма, затем документы.
+        Загружает все документы закупки в zakupki/<reg_number>/documents
+        и создаёт combined_text.txt (см. fetch_combined_text).
         
         Args:
             reg_number: Регистрационный номер закупки
+            docs: Готовый список вложений [{"name", "url"}]
+            print_form_text: Готовый текст извещения
         
         Returns:
             Путь к combined_text.txt или None
@@ -160,41 +306,134 @@ class EISDownloaderService:
             self.logger.debug(f"combined_text.txt для {reg_number} уже существует")
             return str(combined_path)
         
-        all_texts = []
+        combined_text = self._collect_texts(
+            reg_number, docs, print_form_text, zakupka_dir / "documents"
+        )
+        if combined_text is None:
+            return None
+        
+        # Сохраняем объединённый текст
+        with open(combined_path, "w", encoding="utf-8") as f:
+            f.write(combined_text)
+        
+        self.logger.info(f"Сохранён combined_text.txt для {reg_number}")
+        return str(combined_path)
+    
+    def _collect_texts(
+        self,
+        reg_number: str,
+        docs: Optional[List[Dict]],
+        print_form_text: Optional[str],
+        docs_dir: Optional[Path] = None,
+        budget: AttachmentBudget = None,
+        fetched: Optional[List[Dict]] = None
+    ) -> Optional[str]:
+        """
+        Скачивает печатную форму и вложения и собирает combined_text:
+        печатная форма, затем документы в порядке приоритета.
         
-        # 1. Загружаем печатную форму
-        print_form_text = self._get_print_form(reg_number)
+        Args:
+            docs_dir: Куда сохранять вложения; None — держать в памяти
+            budget: Бюджет на вложения (по умолчанию — из settings)
+            fetched: Куда дописать вложения, из которых извлёкся текст
+        """
+        all_texts = []
+        # Колонтитулы, штампы ЭП, лишние пробелы и абзацы, повторяющие
+        # предыдущие документы закупки, убираются до сохранения
+        stats = NormalizationStats() if settings.text_normalize_enabled else None
+        dedup = ParagraphDeduplicator(settings.text_dedup_min_chars) if settings.text_dedup_min_chars else None
+        
+        # 1. Печатная форма грузится параллельно со списком документов
+        print_form_future = None
+        if print_form_text is None:
+            print_form_future = self.engine.submit(self._get_print_form, reg_number)
+        
+        # 2. Получаем список документов и скачиваем их по приоритету:
+        # несколько загрузок за раз, чтобы бюджет мог остановить остальные
+        doc_texts: List[Tuple[Dict, Optional[str]]] = []
+        if docs is None:
+            docs = self._get_documents_list(reg_number)
+        scheduler = AttachmentScheduler(docs or [], budget)
+        if docs:
+            if docs_dir is not None:
+                docs_dir.mkdir(exist_ok=True)
+            
+            def start(doc: Dict) -> Future:
+                return self.engine.submit(self._scheduled_download, scheduler, doc, docs_dir)
+            
+            for doc, future in scheduler.submit(start):
+                try:
+                    doc_texts.append((doc, future.result()))
+                except Exception as e:
+                    self.logger.warning(f"Ошибка обработки документа {doc.get('name')}: {e}")
+        
+        if print_form_future is not None:
+            print_form_text = print_form_future.result()
+        if print_form_text:
+            print_form_text = normalize_text(print_form_text, stats) if stats is not None else join_pages(print_form_text)
+        if print_form_text and dedup is not None:
+            print_form_text = dedup.dedupe(print_form_text, stats)
         if print_form_text:
             all_texts.append(f"=== ПЕЧАТНАЯ ФОРМА ===\n{print_form_text}\n")
             self.logger.debug(f"Печатная форма загружена для {reg_number}")
         
-        # 2. Получаем список документов
-        docs = self._get_documents_list(reg_number)
-        if docs:
-            # Скачиваем и извлекаем текст
-            docs_dir = zakupka_dir / "documents"
-            docs_dir.mkdir(exist_ok=True)
-            
-            for doc in docs:
-                file_path = self._download_document(doc, docs_dir)
-                if not file_path:
-                    continue
-                
-                text = self._extract_text(file_path)
-                if text:
-                    all_texts.append(f"=== Документ: {doc['name']} ===\n{text}\n")
+        for doc, text in doc_texts:
+            if text:
+                # Без нормализации разделители страниц PDF заменяются переводом строки
+                text = normalize_text(text, stats) if stats is not None else join_pages(text)
+            if text and dedup is not None:
+                # Заголовок документа остаётся, даже если весь текст — повтор
+                text = dedup.dedupe(text, stats) or "(текст повторяет предыдущие документы)"
+            if text:
+                all_texts.append(f"=== Документ: {doc['name']} ===\n{text}\n")
+                if fetched is not None:
+                    fetched.append(doc)
+        
+        if scheduler.skipped:
+            self._record_skipped(reg_number, scheduler)
+        if stats is not None and stats.documents:
+            self._record_normalization(reg_number, stats)
         
         if not all_texts:
             self.logger.warning(f"Не удалось извлечь текст для {reg_number}")
             return None
         
-        # Сохраняем объединённый текст
-        combined_text = "\n".join(all_texts)
-        with open(combined_path, "w", encoding="utf-8") as f:
-            f.write(combined_text)
+        return "\n".join(all_texts)
+    
+    def close(self):
+        """Останавливает потоки загрузки и созданные сервисом пул процессов и HTTP-клиент."""
+        self.engine.shutdown()
+        if self._owns_extractor and self.extractor is not None:
+            self.extractor.shutdown()
+        if self._owns_http:
+            self.http.close()
+    
+    def _record_normalization(self, reg_number: str, stats: NormalizationStats):
+        """Пишет в лог, сколько текста закупки убрала нормализация."""
+        saved = stats.bytes_before - stats.bytes_after
+        share = saved * 100 / stats.bytes_before if stats.bytes_before else 0.0
+        self.logger.info(
+            f"Текст {reg_number}: {stats.bytes_before} -> {stats.bytes_after} байт "
+            f"(-{share:.1f}%, колонтитулов {stats.repeated_lines}, служебных строк {stats.boilerplate_lines}, "
+            f"повторов {stats.duplicate_lines})"
+        )
+        with self._stats_lock:
+            self.normalization_stats.add(stats)
+    
+    def download_documents_many(self, reg_numbers: List[str]) -> Dict[str, Future]:
+        """
+        Запускает параллельную загрузку документов нескольких закупок.
         
-        self.logger.info(f"Сохранён combined_text.txt для {reg_number}")
-        return str(combined_path)
+        Args:
+            reg_numbers: Регистрационные номера закупок
+        
+        Returns:
+            Словарь reg_number -> Future с результатом download_documents
+        """
+        return {
+            reg_number: self.engine.submit_purchase(self.download_documents, reg_number)
+            for reg_number in reg_numbers
+        }
     
     def _get_print_form(self, reg_number: str) -> Optional[str]:
         """
@@ -210,21 +449,7 @@ class EISDownloaderService:
         url = f"https://zakupki.gov.ru/epz/order/notice/printForm/view.html?regNumber={reg_number}"
         
         try:
-            resp = requests.get(url, headers=self.DEFAULT_HEADERS, timeout=30)
-            resp.raise_for_status()
-            
-            soup = BeautifulSoup(resp.text, "html.parser")
-            
-            # Удаляем скрипты и стили
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Извлекаем весь текст страницы
-            text = soup.get_text(separator="\n", strip=True)
-            
-            # Убираем лишние пустые строки
-            lines = [line.strip() for line in text.split("\n") if line.strip()]
-            result = "\n".join(lines)
+            result = self.html_parser.parse_print_form(self._fetch_page(url))
             
             if result and len(result) > 100:
                 self.logger.debug(f"Печатная форма загружена для {reg_number}: {len(result)} символов")
@@ -253,18 +478,13 @@ class EISDownloaderService:
         
         # Поиск закупок
         purchases = self.search_zakupki(limit)
+        futures = self.fetch_combined_text_many([p.get("reg_number", "") for p in purchases])
         
         for p in purchases:
             reg_number = p.get("reg_number", "")
             try:
-                # Загружаем документы
-                combined_path = self.download_documents(reg_number)
-                
-                # Читаем текст
-                combined_text = ""
-                if combined_path and os.path.exists(combined_path):
-                    with open(combined_path, "r", encoding="utf-8") as f:
-                        combined_text = f.read()
+                # Ждём загрузку документов
+                combined_text = futures[reg_number].result() or ""
                 
                 # Создаём объект Zakupka
                 zakupka = Zakupka(
@@ -290,200 +510,295 @@ class EISDownloaderService:
     
     # ---- Приватные методы ----
     
-    def _fetch_search_page(self, page: int) -> Optional[str]:
-        """Загружает HTML страницы поиска."""
-        url = self.BASE_SEARCH_URL.format(page=page)
+    def _fetch_search_page(self, page: int, profile: SearchProfile = None) -> Optional[str]:
+        """Загружает HTML страницы поиска (повторы — внутри HttpClient)."""
+        url = (profile or default_search_profile()).search_url(page)
         
-        for attempt in range(3):
-            try:
-                resp = requests.get(url, headers=self.DEFAULT_HEADERS, timeout=30)
-                resp.raise_for_status()
-                return resp.text
-            except Exception as e:
-                self.logger.warning(f"Попытка {attempt+1}/3: {e}")
-                time.sleep(5)
+        try:
+            resp = self.http.get(url, headers=self.DEFAULT_HEADERS, timeout=30)
+            resp.raise_for_status()
+            return resp.text
+        except Exception as e:
+            self.logger.warning(f"Не удалось загрузить страницу {page}: {e}")
         
         return None
     
     def _parse_purchases_from_html(self, html: str) -> List[Dict]:
         """Парсит HTML страницы поиска."""
-        soup = BeautifulSoup(html, "html.parser")
-        blocks = soup.find_all("div", class_="search-registry-entry-block")
-        if not blocks:
-            blocks = soup.find_all("div", class_="registry-entry__form")
-        
-        results = []
-        for block in blocks:
-            try:
-                # Номер и ссылка
-                num_block = block.find("div", class_="registry-entry__header-mid__number")
-                if not num_block:
-                    continue
-                
-                link_el = num_block.find("a", href=True)
-                if not link_el:
-                    continue
-                
-                href = link_el["href"]
-                if "regNumber=" in href:
-                    reg_number = href.split("regNumber=")[1].split("&")[0]
-                else:
-                    reg_number = link_el.get_text(strip=True)
-                
-                purchase_link = "https://zakupki.gov.ru" + href if href.startswith("/") else href
-                
-                # Описание
-                desc_el = block.find("div", class_="registry-entry__body-value")
-                description = desc_el.get_text(strip=True) if desc_el else ""
-                
-                # Дата обновления
-                date_el = block.find("div", class_="data-block__value")
-                date_text = date_el.get_text(strip=True) if date_el else ""
-                update_date = self._parse_date(date_text)
-                
-                # --- Логика извлечения цены и даты окончания ---
-                bid_end_date = ""
-                initial_price = None
-
-                # Собираем все возможные блоки с информацией
-                possible_blocks = block.select(".data-block, .registry-entry__body-block, .price-block")
-                
-                for db in possible_blocks:
-                    # Ищем заголовок (title)
-                    title_el = db.select_one(".data-block__title, .registry-entry__body-title, .price-block__title")
-                    
-                    if not title_el:
-                        continue
-                        
-                    title_text = title_el.get_text(strip=True).lower()
-                    
-                    # Ищем значение (value)
-                    value_el = db.select_one(".data-block__value, .registry-entry__body-value, .price-block__value")
-                    
-                    if not value_el:
-                        continue
-                        
-                    if "окончани" in title_text:
-                        bid_end_date = value_el.get_text(strip=True)
-                    elif "начальная цена" in title_text:
-                        price_text = value_el.get_text(strip=True)
-                        # Парсим цену: "1 234 567,89 ₽" -> 1234567.89
-                        # Убираем пробелы, '₽', 'р', 'руб'
-                        price_clean = (
-                            price_text.replace(" ", "")
-                            .replace("\xa0", "")
-                            .replace("₽", "")
-                            .replace("руб", "")
-                            .replace("р", "")
-                            .replace(",", ".")
-                            .strip()
-                        )
-                        try:
-                            initial_price = float(price_clean)
-                        except ValueError:
-                            self.logger.warning(f"Ошибка парсинга цены '{price_clean}' (исходная: '{price_text}') для {reg_number}")
-                            initial_price = None
-
-                
-                results.append({
-                    "reg_number": reg_number,
-                    "description": description,
-                    "update_date": update_date,
-                    "bid_end_date": bid_end_date,
-                    "initial_price": initial_price,
-                    "link": purchase_link,
-                })
-            except Exception as e:
-                self.logger.debug(f"Ошибка парсинга блока: {e}")
-                continue
-        
-        return results
-    
-    def _parse_date(self, date_str: str) -> datetime:
-        """Парсит дату из строки."""
-        if not date_str:
-            return datetime.min
-        date_str = date_str.strip()
-        for fmt in ("%d.%m.%Y %H:%M", "%d.%m.%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        return datetime.min
+        return self.html_parser.parse_search_results(html)
     
     def _get_documents_list(self, reg_number: str) -> List[Dict]:
         """Получает список документов закупки."""
         url = f"https://zakupki.gov.ru/epz/order/notice/zk20/view/documents.html?regNumber={reg_number}"
         
-        for attempt in range(3):
-            try:
-                resp = requests.get(url, headers=self.DEFAULT_HEADERS, timeout=30)
-                resp.raise_for_status()
-                break
-            except Exception as e:
-                self.logger.warning(f"Попытка {attempt+1}/3 загрузки документов: {e}")
-                time.sleep(5)
-        else:
+        try:
+            html = self._fetch_page(url)
+        except Exception as e:
+            self.logger.warning(f"Ошибка загрузки списка документов {reg_number}: {e}")
             return []
         
-        soup = BeautifulSoup(resp.text, "html.parser")
-        docs = []
-        
-        for block in soup.find_all("div", class_="attachment"):
-            try:
-                name_el = block.find("span", class_="section__value")
-                if not name_el:
-                    continue
-                
-                link_el = block.find("a", href=lambda href: href and "uid=" in href)
-                if not link_el:
-                    continue
-                
-                href = link_el["href"]
-                uid = href.split("uid=")[1].split("&")[0]
-                download_url = f"https://zakupki.gov.ru/44fz/filestore/public/1.0/download/priz/file.html?uid={uid}"
-                
-                docs.append({
-                    "name": name_el.get_text(strip=True),
-                    "url": download_url
-                })
-            except Exception:
-                continue
-        
-        return docs
+        return self.html_parser.parse_documents_list(html)
+    
+    def _fetch_page(self, url: str) -> str:
+        """
+        Загружает страницу ЕИС через кэш: свежая копия отдаётся без
+        запроса, устаревшая перепроверяется условным GET.
+        """
+        if self.cache is None:
+            resp = self.http.get(url, headers=self.DEFAULT_HEADERS, timeout=30)
+            resp.raise_for_status()
+            return resp.text
+        
+        entry = self.cache.lookup(url)
+        if entry and entry.is_fresh(self.cache.ttl_s):
+            with self.cache.pinned():
+                if self.cache.hit(entry):
+                    return self.cache.read_text(entry)
+            # Объект вытеснен после lookup — загружаем заново
+            entry = None
+        
+        headers = {**self.DEFAULT_HEADERS, **self.cache.conditional_headers(entry)}
+        resp = self.http.get(url, headers=headers, timeout=30)
+        if entry and resp.status_code == 304:
+            with self.cache.pinned():
+                if self.cache.hit(entry, revalidated=True, headers=resp.headers):
+                    return self.cache.read_text(entry)
+            resp = self.http.get(url, headers=self.DEFAULT_HEADERS, timeout=30)
+        resp.raise_for_status()
+        
+        self.cache.miss()
+        text = resp.text
+        self.cache.put_bytes(url, text.encode("utf-8"), resp.headers, ext=".html")
+        return text
     
     def _download_document(self, doc_info: Dict, target_dir: Path) -> Optional[str]:
-        """Скачивает документ."""
-        name = doc_info.get("name", "document")
+        """
+        Скачивает документ потоково, кусками прямо на диск.
+        
+        Тип файла определяется по первым байтам, SHA-256 считается на лету
+        и дописывается в doc_info["sha256"] (размер — в doc_info["size"]).
+        Слишком большие файлы и файлы из EIS_SKIP_EXTENSIONS
+        прерываются на первых байтах.
+        
+        При включённом кэше файл сохраняется в кэш, и повторная загрузка
+        того же URL отдаёт его без запроса: по uid ЕИС отдаёт всегда
+        один и тот же файл. Чтобы файл не вытеснили, пока его читают,
+        вызывать внутри HttpCache.pinned().
+        """
         url = doc_info.get("url")
         if not url:
             return None
         
-        for attempt in range(3):
+        if self.cache is not None:
+            entry = self.cache.lookup(url)
+            path = self.cache.hit(entry) if entry else None
+            if path:
+                doc_info["sha256"] = entry.sha256
+                doc_info["size"] = entry.size
+                return str(path)
+        
+        return self._with_retries(self._stream_document, doc_info, target_dir)
+    
+    def _download_to_memory(self, doc_info: Dict) -> Optional[BinaryIO]:
+        """
+        Скачивает документ в память, без записи на диск. Файлы больше
+        EIS_SPOOL_MAX_MB SpooledTemporaryFile сбрасывает во временный файл.
+        
+        Returns:
+            Поток с содержимым (в начале) или None; закрывает вызывающий
+        """
+        if not doc_info.get("url"):
+            return None
+        return self._with_retries(self._stream_to_memory, doc_info)
+    
+    def _with_retries(self, attempt_fn: Callable, *args):
+        """
+        Повторяет попытку загрузки с экспоненциальной задержкой.
+        
+        Это единственный уровень повторов для вложений: HttpClient.stream
+        вызывается с attempts=1. Повторяются сетевые ошибки (в том числе
+        обрывы посреди передачи файла) и ответы 429/5xx; остальные 4xx
+        (404, 403) сразу считаются неудачей. Retry-After выдерживает
+        ограничитель частоты перед следующей попыткой.
+        """
+        attempts = settings.http_max_retries
+        for attempt in range(attempts):
             try:
-                resp = requests.get(url, headers=self.DEFAULT_HEADERS, timeout=60)
-                resp.raise_for_status()
-                break
+                return attempt_fn(*args)
             except Exception as e:
-                self.logger.warning(f"Попытка {attempt+1}/3 скачивания: {e}")
-                time.sleep(5)
-        else:
-            return None
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                if status is not None and status not in RETRY_STATUSES:
+                    self.logger.warning(f"Скачивание не удалось: HTTP {status}")
+                    return None
+                self.logger.warning(f"Попытка {attempt+1}/{attempts} скачивания: {e}")
+                if attempt < attempts - 1:
+                    time.sleep(backoff_delay(attempt, settings.http_backoff_base_s, settings.http_backoff_max_s))
+        
+        return None
+    
+    def _stream_document(self, doc_info: Dict, target_dir: Path) -> Optional[str]:
+        """
+        Одна попытка потоковой загрузки документа в файл (в кэш или
+        в target_dir).
         
-        # Определяем расширение
-        ext = self._detect_extension(resp.content, resp.headers)
-        safe_name = re.sub(r'[^\w\s-]', '', name)[:50]
-        hash_suffix = hashlib.md5(name.encode()).hexdigest()[:8]
-        filename = f"{safe_name}_{hash_suffix}{ext}"
-        filepath = target_dir / filename
+        Returns:
+            Путь к файлу или None, если файл отклонён (размер/тип)
+        """
+        name = doc_info.get("name", "document")
+        url = doc_info["url"]
         
-        with open(filepath, "wb") as f:
-            f.write(resp.content)
+        # Пишем во временный файл: расширение известно только после первых байт
+        if self.cache is not None:
+            part_path = self.cache.temp_path(url)
+        else:
+            part_path = target_dir / f".{hashlib.md5(url.encode()).hexdigest()}.part"
+        try:
+            with open(part_path, "wb") as f:
+                result = self._stream_to(doc_info, f)
+            if result is None:
+                return None
+            
+            ext, digest, size, headers = result
+            if self.cache is not None:
+                self.cache.miss()
+                self.cache.put_file(url, part_path, digest, size, headers, ext)
+                filepath = self.cache.object_path(digest, ext)
+            else:
+                safe_name = re.sub(r'[^\w\s-]', '', name)[:50]
+                filepath = target_dir / f"{safe_name}_{digest[:8]}{ext}"
+                os.replace(part_path, filepath)
+        finally:
+            if part_path.exists():
+                part_path.unlink()
         
         return str(filepath)
     
+    def _stream_to_memory(self, doc_info: Dict) -> Optional[BinaryIO]:
+        """Одна попытка потоковой загрузки документа в память."""
+        buffer = tempfile.SpooledTemporaryFile(max_size=settings.eis_spool_max_mb * 1024 * 1024)
+        try:
+            if self._stream_to(doc_info, buffer) is None:
+                buffer.close()
+                return None
+        except BaseException:
+            buffer.close()
+            raise
+        buffer.seek(0)
+        return buffer
+    
+    def _stream_to(self, doc_info: Dict, out: BinaryIO) -> Optional[Tuple[str, str, int, dict]]:
+        """
+        Скачивает документ кусками в поток out.
+        
+        Тип файла определяется по первым байтам, SHA-256 считается на лету
+        и дописывается в doc_info["sha256"] (размер — в doc_info["size"]).
+        Слишком большие файлы и файлы из EIS_SKIP_EXTENSIONS
+        прерываются на первых байтах.
+        
+        Returns:
+            (расширение, SHA-256, размер, заголовки ответа) или None,
+            если файл отклонён (размер/тип)
+        """
+        name = doc_info.get("name", "document")
+        max_bytes = settings.eis_max_download_mb * 1024 * 1024
+        
+        # Повторы — в _with_retries, поэтому HttpClient делает одну попытку
+        with self.http.stream(doc_info["url"], headers=self.DEFAULT_HEADERS, timeout=60, attempts=1) as resp:
+            resp.raise_for_status()
+            
+            content_length = int(resp.headers.get("Content-Length") or 0)
+            if max_bytes and content_length > max_bytes:
+                self.logger.info(f"Пропуск '{name}': {content_length} байт больше лимита")
+                return None
+            
+            hasher = hashlib.sha256()
+            head = b""
+            ext = None
+            size = 0
+            for chunk in resp.iter_bytes(self.DOWNLOAD_CHUNK_SIZE):
+                if not chunk:
+                    continue
+                if ext is None:
+                    head += chunk
+                    if len(head) >= self.SNIFF_BYTES:
+                        ext = self._detect_extension(head, resp.headers)
+                        if ext in settings.eis_skip_extensions:
+                            self.logger.info(f"Пропуск '{name}': тип {ext}")
+                            return None
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    self.logger.info(f"Пропуск '{name}': больше {max_bytes} байт")
+                    return None
+                hasher.update(chunk)
+                out.write(chunk)
+            
+            if ext is None:
+                ext = self._detect_extension(head, resp.headers)
+                if ext in settings.eis_skip_extensions:
+                    self.logger.info(f"Пропуск '{name}': тип {ext}")
+                    return None
+            headers = resp.headers
+        
+        digest = hasher.hexdigest()
+        doc_info["sha256"] = digest
+        doc_info["size"] = size
+        return ext, digest, size, headers
+    
+    def _download_and_extract(self, doc_info: Dict, target_dir: Optional[Path] = None) -> Optional[str]:
+        """
+        Скачивает документ и сразу извлекает из него текст.
+        Текст уже встречавшегося файла (по SHA-256) берётся из кэша текста.
+        
+        Без HTTP-кэша и без target_dir документ не касается диска: он
+        скачивается в память, и текст извлекается из буфера.
+        """
+        if self.cache is None and target_dir is None:
+            buffer = self._download_to_memory(doc_info)
+            if buffer is None:
+                return None
+            with buffer:
+                return self._extract_text(buffer, doc_info.get("name"), doc_info.get("sha256"))
+        
+        # Файл из кэша не вытесняется, пока из него извлекается текст
+        with self.cache.pinned() if self.cache is not None else nullcontext():
+            file_path = self._download_document(doc_info, target_dir)
+            if not file_path:
+                return None
+            return self._extract_text(file_path, doc_info.get("name"), doc_info.get("sha256"))
+    
+    def _scheduled_download(
+        self,
+        scheduler: AttachmentScheduler,
+        doc_info: Dict,
+        target_dir: Optional[Path]
+    ) -> Optional[str]:
+        """Скачивает вложение и учитывает его в бюджете закупки."""
+        text = self._download_and_extract(doc_info, target_dir)
+        scheduler.record(doc_info, doc_info.get("size", 0), len(text or ""))
+        return text
+
+    def _record_skipped(self, reg_number: str, scheduler: AttachmentScheduler):
+        """Записывает пропущенные вложения, чтобы их можно было догрузить."""
+        reasons = ", ".join(sorted({reason for _, reason in scheduler.skipped}))
+        self.logger.info(
+            f"{reg_number}: пропущено вложений — {len(scheduler.skipped)} (бюджет: {reasons})"
+        )
+        if self.skipped_repo is None:
+            return
+        self.skipped_repo.save_many([
+            SkippedAttachment(
+                reg_number=reg_number,
+                url=doc["url"],
+                name=doc.get("name", ""),
+                priority=attachment_priority(doc),
+                reason=reason
+            )
+            for doc, reason in scheduler.skipped
+            if doc.get("url")
+        ])
+
     def _detect_extension(self, content: bytes, headers: dict) -> str:
-        """Определяет расширение файла по содержимому."""
+        """Определяет расширение файла по первым байтам содержимого."""
         header = content[:20]
         
         if header.startswith(b"%PDF"):
@@ -500,8 +815,26 @@ class EISDownloaderService:
         
         return ".bin"
     
-    def _extract_text(self, file_path: str) -> Optional[str]:
-        """Извлекает текст из документа."""
+    def _extract_text(
+        self,
+        file_path,
+        name: Optional[str] = None,
+        sha256: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Извлекает текст из документа (путь или бинарный поток).
+        С пулом процессов ждёт результата с таймаутом EXTRACT_TIMEOUT_S.
+        
+        sha256 — хэш содержимого, посчитанный при загрузке: по нему
+        текст ищется в кэше до извлечения, без повторного чтения файла.
+        """
+        if self.text_cache is not None and sha256:
+            text = self.text_cache.get(sha256)
+            if text is not None:
+                return text
+        # Кэш уже проверен по sha256 — извлечение его не перечитывает
+        use_cache = not sha256
+        
         try:
             # Импортируем из корня src/
             import sys
@@ -510,9 +843,27 @@ class EISDownloaderService:
             if str(src_dir) not in sys.path:
                 sys.path.insert(0, str(src_dir))
             
-            from text_extraction import extract_text_from_any_file
-            text = extract_text_from_any_file(file_path)
+            from text_extraction import extract_text_from_any_file, extract_text_from_zip, open_zip_archive
+            # Тип определяется здесь один раз: остальные файлы целиком
+            # уходят в пул, где определение типа и извлечение — один проход
+            archive = open_zip_archive(file_path, name) if self.extractor is not None else None
+            if archive is not None:
+                # Архив читается здесь, файлы из него разбираются в пуле параллельно
+                with archive:
+                    text = extract_text_from_zip(
+                        archive, submit=self.extractor.submit, window=self.extractor.workers
+                    )
+            elif self.extractor is not None:
+                # В процесс пула передаются путь или байты, поток не сериализуется
+                if not isinstance(file_path, (str, os.PathLike)):
+                    file_path.seek(0)
+                    file_path = file_path.read()
+                text = self.extractor.extract(file_path, name, use_cache)
+            else:
+                text = extract_text_from_any_file(file_path, name, use_cache)
             if text and not text.startswith("Ошибка") and not text.startswith("Неизвестный"):
+                if self.text_cache is not None and sha256:
+                    self.text_cache.put(sha256, text)
                 return text
         except ImportError as e:
             self.logger.warning(f"text_extraction не найден: {e}")
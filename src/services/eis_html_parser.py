@@ -0,0 +1,363 @@
+"""
+Парсеры HTML-страниц ЕИС: поиск, список документов, печатная форма.
+
+Два бэкенда с одинаковым результатом:
+    - bs4  — BeautifulSoup с html.parser (чистый Python, эталон);
+    - lxml — lxml.html и XPath (C-парсер, в разы быстрее).
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from utils.logger import get_logger
+
+
+def parse_eis_date(date_str: str) -> datetime:
+    """Парсит дату из строки ЕИС."""
+    if not date_str:
+        return datetime.min
+    date_str = date_str.strip()
+    for fmt in ("%d.%m.%Y %H:%M", "%d.%m.%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return datetime.min
+
+
+class BaseEISParser:
+    """
+    Общая часть парсеров: разбор значений из уже найденных текстов.
+    Наследники находят элементы страницы каждый своим способом.
+    """
+
+    name = ""
+
+    # Классы блоков с парами "заголовок — значение" в карточке закупки
+    DATA_BLOCK_CLASSES = ("data-block", "registry-entry__body-block", "price-block")
+    DATA_TITLE_CLASSES = ("data-block__title", "registry-entry__body-title", "price-block__title")
+    DATA_VALUE_CLASSES = ("data-block__value", "registry-entry__body-value", "price-block__value")
+
+    DOWNLOAD_URL = "https://zakupki.gov.ru/44fz/filestore/public/1.0/download/priz/file.html?uid={uid}"
+
+    def __init__(self):
+        self.logger = get_logger("EISHtmlParser")
+
+    def parse_search_results(self, html: str) -> List[Dict]:
+        """Парсит HTML страницы поиска в список словарей закупок."""
+        raise NotImplementedError
+
+    def parse_documents_list(self, html: str) -> List[Dict]:
+        """Парсит страницу документов закупки: [{"name", "url"}]."""
+        raise NotImplementedError
+
+    def parse_print_form(self, html: str) -> str:
+        """Возвращает текст печатной формы: непустые строки без скриптов и стилей."""
+        raise NotImplementedError
+
+    def _build_purchase(
+        self,
+        href: str,
+        link_text: str,
+        description: str,
+        date_text: str,
+        data_pairs: List[tuple]
+    ) -> Dict:
+        """Собирает словарь закупки из текстов карточки."""
+        if "regNumber=" in href:
+            reg_number = href.split("regNumber=")[1].split("&")[0]
+        else:
+            reg_number = link_text
+
+        purchase_link = "https://zakupki.gov.ru" + href if href.startswith("/") else href
+
+        bid_end_date = ""
+        initial_price = None
+        for title_text, value_text in data_pairs:
+            title_text = title_text.lower()
+            if "окончани" in title_text:
+                bid_end_date = value_text
+            elif "начальная цена" in title_text:
+                initial_price = self._parse_price(value_text, reg_number)
+
+        return {
+            "reg_number": reg_number,
+            "description": description,
+            "update_date": parse_eis_date(date_text),
+            "bid_end_date": bid_end_date,
+            "initial_price": initial_price,
+            "link": purchase_link,
+        }
+
+    def _parse_price(self, price_text: str, reg_number: str) -> Optional[float]:
+        """Парсит цену: "1 234 567,89 ₽" -> 1234567.89"""
+        # Убираем пробелы, '₽', 'р', 'руб'
+        price_clean = (
+            price_text.replace(" ", "")
+            .replace("\xa0", "")
+            .replace("₽", "")
+            .replace("руб", "")
+            .replace("р", "")
+            .replace(",", ".")
+            .strip()
+        )
+        try:
+            return float(price_clean)
+        except ValueError:
+            self.logger.warning(f"Ошибка парсинга цены '{price_clean}' (исходная: '{price_text}') для {reg_number}")
+            return None
+
+    @staticmethod
+    def _clean_lines(text_parts) -> str:
+        """Склеивает куски текста в непустые строки."""
+        lines = []
+        for part in text_parts:
+            for line in part.split("\n"):
+                line = line.strip()
+                if line:
+                    lines.append(line)
+        return "\n".join(lines)
+
+
+class BeautifulSoupParser(BaseEISParser):
+    """Парсер на BeautifulSoup + html.parser."""
+
+    name = "bs4"
+
+    def _soup(self, html: str):
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, "html.parser")
+
+    def parse_search_results(self, html: str) -> List[Dict]:
+        soup = self._soup(html)
+        blocks = soup.find_all("div", class_="search-registry-entry-block")
+        if not blocks:
+            blocks = soup.find_all("div", class_="registry-entry__form")
+
+        block_selector = ", ".join(f".{c}" for c in self.DATA_BLOCK_CLASSES)
+        title_selector = ", ".join(f".{c}" for c in self.DATA_TITLE_CLASSES)
+        value_selector = ", ".join(f".{c}" for c in self.DATA_VALUE_CLASSES)
+
+        results = []
+        for block in blocks:
+            try:
+                # Номер и ссылка
+                num_block = block.find("div", class_="registry-entry__header-mid__number")
+                if not num_block:
+                    continue
+                link_el = num_block.find("a", href=True)
+                if not link_el:
+                    continue
+
+                desc_el = block.find("div", class_="registry-entry__body-value")
+                date_el = block.find("div", class_="data-block__value")
+
+                data_pairs = []
+                for db in block.select(block_selector):
+                    title_el = db.select_one(title_selector)
+                    if not title_el:
+                        continue
+                    value_el = db.select_one(value_selector)
+                    if not value_el:
+                        continue
+                    data_pairs.append((title_el.get_text(strip=True), value_el.get_text(strip=True)))
+
+                results.append(self._build_purchase(
+                    href=link_el["href"],
+                    link_text=link_el.get_text(strip=True),
+                    description=desc_el.get_text(strip=True) if desc_el else "",
+                    date_text=date_el.get_text(strip=True) if date_el else "",
+                    data_pairs=data_pairs,
+                ))
+            except Exception as e:
+                self.logger.debug(f"Ошибка парсинга блока: {e}")
+                continue
+
+        return results
+
+    def parse_documents_list(self, html: str) -> List[Dict]:
+        soup = self._soup(html)
+        docs = []
+        for block in soup.find_all("div", class_="attachment"):
+            try:
+                name_el = block.find("span", class_="section__value")
+                if not name_el:
+                    continue
+                link_el = block.find("a", href=lambda href: href and "uid=" in href)
+                if not link_el:
+                    continue
+
+                uid = link_el["href"].split("uid=")[1].split("&")[0]
+                docs.append({
+                    "name": name_el.get_text(strip=True),
+                    "url": self.DOWNLOAD_URL.format(uid=uid)
+                })
+            except Exception:
+                continue
+        return docs
+
+    def parse_print_form(self, html: str) -> str:
+        soup = self._soup(html)
+        # Удаляем скрипты и стили
+        for script in soup(["script", "style"]):
+            script.decompose()
+        return self._clean_lines([soup.get_text(separator="\n", strip=True)])
+
+
+class LxmlParser(BaseEISParser):
+    """Парсер на lxml.html: C-парсер и XPath вместо обхода дерева в Python."""
+
+    name = "lxml"
+
+    @staticmethod
+    def _has_class(cls: str) -> str:
+        """XPath-условие: у элемента есть CSS-класс cls."""
+        return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+    def _any_class(self, classes) -> str:
+        return " or ".join(self._has_class(c) for c in classes)
+
+    def _document(self, html: str):
+        """Разбирает HTML; None для пустого документа."""
+        import lxml.html
+        from lxml.etree import ParserError
+
+        if not html or not html.strip():
+            return None
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # Строка с XML-декларацией кодировки — lxml принимает её только байтами
+            return lxml.html.document_fromstring(html.encode("utf-8"))
+        except ParserError:
+            return None
+
+    @staticmethod
+    def _text(el) -> str:
+        """Аналог BeautifulSoup get_text(strip=True)."""
+        return "".join(t.strip() for t in el.itertext())
+
+    def parse_search_results(self, html: str) -> List[Dict]:
+        doc = self._document(html)
+        if doc is None:
+            return []
+
+        blocks = doc.xpath(f"//div[{self._has_class('search-registry-entry-block')}]")
+        if not blocks:
+            blocks = doc.xpath(f"//div[{self._has_class('registry-entry__form')}]")
+
+        num_xpath = f".//div[{self._has_class('registry-entry__header-mid__number')}]"
+        desc_xpath = f".//div[{self._has_class('registry-entry__body-value')}]"
+        date_xpath = f".//div[{self._has_class('data-block__value')}]"
+        block_xpath = f".//*[{self._any_class(self.DATA_BLOCK_CLASSES)}]"
+        title_xpath = f"(.//*[{self._any_class(self.DATA_TITLE_CLASSES)}])[1]"
+        value_xpath = f"(.//*[{self._any_class(self.DATA_VALUE_CLASSES)}])[1]"
+
+        results = []
+        for block in blocks:
+            try:
+                num_blocks = block.xpath(num_xpath)
+                if not num_blocks:
+                    continue
+                links = num_blocks[0].xpath(".//a[@href]")
+                if not links:
+                    continue
+                link_el = links[0]
+
+                desc_els = block.xpath(desc_xpath)
+                date_els = block.xpath(date_xpath)
+
+                data_pairs = []
+                for db in block.xpath(block_xpath):
+                    title_els = db.xpath(title_xpath)
+                    if not title_els:
+                        continue
+                    value_els = db.xpath(value_xpath)
+                    if not value_els:
+                        continue
+                    data_pairs.append((self._text(title_els[0]), self._text(value_els[0])))
+
+                results.append(self._build_purchase(
+                    href=link_el.get("href"),
+                    link_text=self._text(link_el),
+                    description=self._text(desc_els[0]) if desc_els else "",
+                    date_text=self._text(date_els[0]) if date_els else "",
+                    data_pairs=data_pairs,
+                ))
+            except Exception as e:
+                self.logger.debug(f"Ошибка парсинга блока: {e}")
+                continue
+
+        return results
+
+    def parse_documents_list(self, html: str) -> List[Dict]:
+        doc = self._document(html)
+        if doc is None:
+            return []
+
+        docs = []
+        for block in doc.xpath(f"//div[{self._has_class('attachment')}]"):
+            try:
+                name_els = block.xpath(f".//span[{self._has_class('section__value')}]")
+                if not name_els:
+                    continue
+                link_els = block.xpath(".//a[contains(@href, 'uid=')]")
+                if not link_els:
+                    continue
+
+                uid = link_els[0].get("href").split("uid=")[1].split("&")[0]
+                docs.append({
+                    "name": self._text(name_els[0]),
+                    "url": self.DOWNLOAD_URL.format(uid=uid)
+                })
+            except Exception:
+                continue
+        return docs
+
+    def parse_print_form(self, html: str) -> str:
+        doc = self._document(html)
+        if doc is None:
+            return ""
+        return self._clean_lines(self._iter_text_nodes(doc))
+
+    @staticmethod
+    def _iter_text_nodes(root, skip_tags=("script", "style")):
+        """
+        Текстовые узлы документа без скриптов, стилей и комментариев.
+        Текст и хвост элемента отдаются отдельными кусками, как в
+        BeautifulSoup get_text(separator=...).
+        """
+        from lxml import etree
+
+        for event, el in etree.iterwalk(root, events=("start", "end")):
+            if event == "start":
+                if isinstance(el.tag, str) and el.tag not in skip_tags and el.text:
+                    yield el.text
+            elif el is not root and el.tail:
+                yield el.tail
+
+
+PARSERS = {
+    BeautifulSoupParser.name: BeautifulSoupParser,
+    LxmlParser.name: LxmlParser,
+}
+
+
+def get_html_parser(name: str = None) -> BaseEISParser:
+    """
+    Создаёт парсер по имени.
+
+    Args:
+        name: "bs4", "lxml" или "auto" (lxml, если установлен).
+            По умолчанию — EIS_HTML_PARSER из settings.
+    """
+    name = (name or settings.eis_html_parser).lower()
+    if name == "auto":
+        try:
+            import lxml.html  # noqa: F401
+            name = LxmlParser.name
+        except ImportError:
+            name = BeautifulSoupParser.name
+    if name not in PARSERS:
+        raise ValueError(f"Неизвестный HTML-парсер: {name}. Доступны: {', '.join(PARSERS)}")
+    return PARSERS[name]()
@@ -1,7 +1,7 @@
 """
 Сервис для загрузки закупок с ЕИС.
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
 from models.zakupka import Zakupka
 from repositories.zakupka_repo import ZakupkaRepository
 from utils.logger import get_logger
@@ -58,6 +58,10 @@ class EISService:
     def get_by_reg_numbers(self, reg_numbers: List[str]) -> List[Zakupka]:
         """Получает список закупок по списку номеров."""
         return self.repo.get_by_reg_numbers(reg_numbers)
+    
+    def get_text_presence(self, reg_numbers: List[str]) -> Dict[str, bool]:
+        """Возвращает reg_number -> есть ли текст для закупок, которые уже в БД."""
+        return self.repo.get_text_presence(reg_numbers)
 
     def count(self) -> int:
         """Возвращает количество закупок."""
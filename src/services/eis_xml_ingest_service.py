@@ -0,0 +1,357 @@
+"""
+Загрузка закупок из XML-выгрузок ЕИС (открытые данные, zip-архивы).
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from config.search_profiles import load_search_profiles
+from models.zakupka import Zakupka
+from repositories.zakupka_repo import ZakupkaRepository
+from services.eis_downloader_service import EISDownloaderService
+from utils.logger import get_logger
+
+
+@dataclass
+class XmlNotice:
+    """Извещение о закупке, разобранное из XML."""
+    zakupka: Zakupka
+    okpd2_codes: List[str] = field(default_factory=list)
+    attachments: List[Dict] = field(default_factory=list)  # [{"name", "url"}]
+    text: str = ""  # текст извещения вместо печатной формы
+
+
+def _local(tag) -> str:
+    """Имя тега без пространства имён: {http://zakupki.gov.ru/...}purchaseNumber -> purchaseNumber."""
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_xml_datetime(value: str) -> Optional[datetime]:
+    """Разбирает дату ЕИС (2024-01-15T10:00:00.123+03:00 или 2024-01-15+03:00) в локальное время."""
+    if not value:
+        return None
+    value = value.strip()
+    for candidate in (value, value[:19], value[:10]):
+        try:
+            return datetime.fromisoformat(candidate).replace(tzinfo=None)
+        except ValueError:
+            continue
+    return None
+
+
+class EISXmlIngestService:
+    """
+    Потоковый разбор XML-выгрузок ЕИС в закупки.
+
+    Выгрузки (zip с XML извещений 44-ФЗ) читаются из локального каталога
+    через iterparse: каждое извещение обрабатывается и сразу удаляется из
+    дерева, поэтому память не растёт с размером архива. Разбор не зависит
+    от пространств имён и версии схемы (fcsNotification*, epNotification*):
+    поля ищутся по локальным именам тегов.
+
+    Найденные закупки фильтруются по ОКПД2 и сохраняются тем же путём,
+    что и при загрузке со страниц поиска: вложения из XML скачиваются
+    EISDownloaderService, текст собирается в combined_text.
+    """
+
+    # Поля извещения по локальным именам тегов (первое непустое значение)
+    REG_NUMBER_TAGS = ("purchaseNumber",)
+    DESCRIPTION_TAGS = ("purchaseObjectInfo",)
+    PUBLISH_DATE_TAGS = ("docPublishDTInEIS", "publishDTInEIS", "docPublishDate")
+    END_DATE_TAGS = ("endDT", "endDate")
+    PRICE_TAGS = ("maxPrice",)
+    HREF_TAGS = ("href",)
+
+    # Коды ОКПД2: OKPDCode или code внутри OKPD2/KTRU
+    OKPD2_CODE_TAGS = ("OKPDCode", "OKPD2Code")
+    OKPD2_PARENT_TAGS = ("OKPD2", "OKPD", "KTRU", "KTRUInfo", "OKPDInfo")
+
+    ATTACHMENT_TAGS = ("attachment", "attachmentInfo")
+    # Служебные блоки, не попадающие в текст извещения
+    TEXT_SKIP_TAGS = ("attachmentsInfo", "attachments", "printFormInfo", "printForm", "extPrintForm", "signature", "cryptoSigns")
+
+    # Сколько извещений сохранять одной пачкой
+    BATCH_SIZE = 100
+
+    def __init__(
+        self,
+        zakupka_repo: ZakupkaRepository = None,
+        downloader: EISDownloaderService = None,
+        okpd2_prefixes: List[str] = None
+    ):
+        """
+        Args:
+            zakupka_repo: Репозиторий для сохранения закупок
+            downloader: Сервис загрузки вложений (нужен, если скачивать документы)
+            okpd2_prefixes: Префиксы кодов ОКПД2 (по умолчанию — коды профилей поиска)
+        """
+        self.repo = zakupka_repo
+        self.downloader = downloader
+        if okpd2_prefixes is None:
+            okpd2_prefixes = self._profile_okpd2_prefixes()
+        self.okpd2_prefixes = tuple(okpd2_prefixes)
+        self.logger = get_logger("EISXmlIngestService")
+
+    @staticmethod
+    def _profile_okpd2_prefixes() -> List[str]:
+        """Коды ОКПД2 профилей поиска без нулевого хвоста: 68.10.11.000 -> 68.10.11."""
+        prefixes = []
+        for profile in load_search_profiles():
+            for code in profile.okpd2_codes:
+                while code.endswith(".000"):
+                    code = code[:-4]
+                prefixes.append(code)
+        return prefixes
+
+    # ---- Разбор ----
+
+    def iter_sources(self, path: str) -> Iterator[Tuple[str, IO[bytes]]]:
+        """
+        Открывает XML-файлы выгрузки: zip-архивы и отдельные .xml
+        в каталоге (или один файл).
+
+        Yields:
+            (имя источника, поток байт XML)
+        """
+        path = Path(path)
+        files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for file_path in files:
+            suffix = file_path.suffix.lower()
+            if suffix == ".zip":
+                try:
+                    with zipfile.ZipFile(file_path) as archive:
+                        for member in archive.infolist():
+                            if member.is_dir() or not member.filename.lower().endswith(".xml"):
+                                continue
+                            with archive.open(member) as stream:
+                                yield f"{file_path.name}:{member.filename}", stream
+                except zipfile.BadZipFile as e:
+                    self.logger.warning(f"Повреждённый архив {file_path}: {e}")
+            elif suffix == ".xml":
+                with open(file_path, "rb") as stream:
+                    yield file_path.name, stream
+
+    def iter_notices(self, path: str) -> Iterator[XmlNotice]:
+        """Выдаёт извещения из всех XML выгрузки, подходящие по ОКПД2."""
+        for source_name, stream in self.iter_sources(path):
+            try:
+                yield from self.parse_stream(stream)
+            except ET.ParseError as e:
+                self.logger.warning(f"Ошибка разбора {source_name}: {e}")
+
+    def parse_stream(self, stream: IO[bytes]) -> Iterator[XmlNotice]:
+        """
+        Потоково разбирает один XML. Извещения — дочерние элементы
+        корневого <export>; любой другой корень сам считается извещением.
+        """
+        depth = 0
+        root = None
+        notice_depth = 1
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                    notice_depth = 1 if _local(elem.tag) == "export" else 0
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth != notice_depth:
+                continue
+            notice = self.parse_notice(elem)
+            # Освобождаем память: разобранное извещение больше не нужно
+            root.clear()
+            if notice is not None and self._matches_okpd2(notice):
+                yield notice
+
+    def parse_notice(self, elem) -> Optional[XmlNotice]:
+        """Разбирает элемент извещения; None, если в нём нет номера закупки."""
+        first: Dict[str, str] = {}
+        codes: List[str] = []
+        attachments: List[Dict] = []
+        lines: List[str] = []
+
+        def walk(node, parent_name: str, in_text: bool):
+            name = _local(node.tag)
+            text = (node.text or "").strip()
+
+            if name in self.ATTACHMENT_TAGS:
+                attachment = self._parse_attachment(node)
+                if attachment:
+                    attachments.append(attachment)
+                return
+
+            if text:
+                first.setdefault(name, text)
+                if name in self.OKPD2_CODE_TAGS or (name == "code" and parent_name in self.OKPD2_PARENT_TAGS):
+                    codes.append(text)
+
+            in_text = in_text and name not in self.TEXT_SKIP_TAGS
+            if in_text and text and len(node) == 0:
+                lines.append(f"{name}: {text}")
+
+            for child in node:
+                walk(child, name, in_text)
+
+        walk(elem, "", True)
+
+        reg_number = self._first(first, self.REG_NUMBER_TAGS)
+        if not reg_number:
+            return None
+
+        publish_date = _parse_xml_datetime(self._first(first, self.PUBLISH_DATE_TAGS))
+        end_date = _parse_xml_datetime(self._first(first, self.END_DATE_TAGS))
+
+        initial_price = None
+        price_text = self._first(first, self.PRICE_TAGS)
+        if price_text:
+            try:
+                initial_price = float(price_text.replace(",", "."))
+            except ValueError:
+                self.logger.warning(f"Ошибка парсинга цены '{price_text}' для {reg_number}")
+
+        link = self._first(first, self.HREF_TAGS) or (
+            f"https://zakupki.gov.ru/epz/order/notice/zk20/view/common-info.html?regNumber={reg_number}"
+        )
+
+        zakupka = Zakupka(
+            reg_number=reg_number,
+            description=self._first(first, self.DESCRIPTION_TAGS),
+            update_date=str(publish_date or datetime.min),
+            bid_end_date=end_date.strftime("%d.%m.%Y %H:%M") if end_date else "",
+            initial_price=initial_price,
+            link=link,
+        )
+        return XmlNotice(
+            zakupka=zakupka,
+            okpd2_codes=codes,
+            attachments=attachments,
+            text="\n".join(lines),
+        )
+
+    def _parse_attachment(self, node) -> Optional[Dict]:
+        """Вложение: {"name", "url"} из attachment/attachmentInfo."""
+        fields = {}
+        for child in node.iter():
+            text = (child.text or "").strip()
+            if text:
+                fields.setdefault(_local(child.tag), text)
+        url = fields.get("url")
+        if not url:
+            return None
+        return {
+            "name": fields.get("fileName") or fields.get("docDescription") or "document",
+            "url": url,
+        }
+
+    @staticmethod
+    def _first(fields: Dict[str, str], names: Tuple[str, ...]) -> str:
+        for name in names:
+            if fields.get(name):
+                return fields[name]
+        return ""
+
+    def _matches_okpd2(self, notice: XmlNotice) -> bool:
+        if not self.okpd2_prefixes:
+            return True
+        return any(code.startswith(self.okpd2_prefixes) for code in notice.okpd2_codes)
+
+    # ---- Сохранение ----
+
+    def ingest(
+        self,
+        path: str,
+        limit: Optional[int] = None,
+        download_attachments: bool = True
+    ) -> Tuple[int, int, List[str]]:
+        """
+        Загружает закупки из выгрузки в БД.
+
+        Args:
+            path: Каталог с zip/xml или один файл
+            limit: Максимум новых закупок
+            download_attachments: Скачивать вложения и извлекать из них текст;
+                иначе combined_text — только текст извещения из XML
+
+        Returns:
+            Кортеж (сохранено, пропущено существующих, список ошибок)
+        """
+        saved = 0
+        skipped = 0
+        errors: List[str] = []
+        batch: List[XmlNotice] = []
+        seen = set()
+
+        for notice in self.iter_notices(path):
+            reg_number = notice.zakupka.reg_number
+            # Одно извещение встречается в выгрузке несколько раз (изменения)
+            if reg_number in seen:
+                continue
+            seen.add(reg_number)
+
+            batch.append(notice)
+            if len(batch) >= self.BATCH_SIZE or (limit and saved + len(batch) >= limit):
+                batch_saved, batch_skipped = self._save_batch(batch, errors, download_attachments, limit and limit - saved)
+                saved += batch_saved
+                skipped += batch_skipped
+                batch = []
+                if limit and saved >= limit:
+                    break
+
+        if batch:
+            batch_saved, batch_skipped = self._save_batch(batch, errors, download_attachments, limit and limit - saved)
+            saved += batch_saved
+            skipped += batch_skipped
+
+        self.logger.info(f"XML: сохранено {saved} закупок, пропущено {skipped} существующих")
+        return saved, skipped, errors
+
+    def _save_batch(
+        self,
+        batch: List[XmlNotice],
+        errors: List[str],
+        download_attachments: bool,
+        remaining: Optional[int]
+    ) -> Tuple[int, int]:
+        """Сохраняет новые закупки пачки; возвращает (сохранено, пропущено)."""
+        has_text = self.repo.get_text_presence([n.zakupka.reg_number for n in batch])
+        new = [n for n in batch if not has_text.get(n.zakupka.reg_number)]
+        skipped = len(batch) - len(new)
+        if remaining:
+            new = new[:remaining]
+
+        if not download_attachments:
+            for notice in new:
+                notice.zakupka.combined_text = f"=== ПЕЧАТНАЯ ФОРМА ===\n{notice.text}\n"
+            return self.repo.save_many([n.zakupka for n in new]), skipped
+
+        # Вложения скачиваются тем же движком, что и при обходе страниц поиска
+        futures = {
+            n.zakupka.reg_number: self.downloader.engine.submit_purchase(
+                self.downloader.fetch_combined_text,
+                n.zakupka.reg_number,
+                n.attachments,
+                n.text
+            )
+            for n in new
+        }
+
+        ready = []
+        for notice in new:
+            reg_number = notice.zakupka.reg_number
+            try:
+                notice.zakupka.combined_text = futures[reg_number].result() or ""
+                if not notice.zakupka.combined_text.strip():
+                    self.logger.warning(f"Нет текста для {reg_number}")
+                    continue
+                ready.append(notice.zakupka)
+            except Exception as e:
+                errors.append(f"{reg_number}: {e}")
+                self.logger.error(f"Ошибка обработки {reg_number}: {e}")
+
+        return self.repo.save_many(ready), skipped
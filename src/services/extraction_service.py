@@ -0,0 +1,410 @@
+"""
+Извлечение текста из документов в пуле процессов.
+
+pdfplumber, python-docx и openpyxl работают на чистом Python и держат
+GIL, поэтому в потоках загрузчика извлечение идёт фактически на одном
+ядре, а один «тяжёлый» PDF может остановить пачку закупок. Здесь
+каждый файл разбирается в отдельном процессе пула с ограничением
+памяти (RLIMIT_AS) и времени.
+
+Процессы запускаются через forkserver (на Windows — spawn), а не fork:
+пул создаётся из потоков загрузчика, и fork скопировал бы блокировки
+(logging, кэш текста, sqlite), которые в этот момент держат другие
+потоки, — процесс с такой блокировкой зависает навсегда.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from config.settings import settings
+from services.text_cache import TextCache, get_text_cache
+from utils.logger import get_logger
+
+try:
+    import resource
+except ImportError:  # Windows: ограничение памяти недоступно
+    resource = None
+
+
+class ExtractionTimeout(TimeoutError):
+    """Извлечение текста из файла не уложилось в EXTRACT_TIMEOUT_S."""
+
+
+# Очередь, в которую процесс пула сообщает о начале задачи (см. _run_in_worker)
+_started_queue = None
+
+
+def _init_worker(memory_mb: int, started=None):
+    """Ограничивает адресное пространство процесса-исполнителя."""
+    global _started_queue
+    _started_queue = started
+    if resource is None or not memory_mb:
+        return
+    limit = memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+def _run_in_worker(worker, task_key, *args):
+    """
+    Выполняется в процессе пула: сообщает сторожу, что задача началась,
+    и вызывает worker. Future пула считается running() уже в очереди
+    к процессам, поэтому таймаут отсчитывается от этого сообщения.
+    """
+    if _started_queue is not None:
+        _started_queue.put(task_key)
+    return worker(*args)
+
+
+def _extract_in_worker(source: Union[str, bytes], name: Optional[str], use_cache: bool = True) -> str:
+    """Выполняется в процессе пула."""
+    from text_extraction import extract_text_from_any_file
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    try:
+        return extract_text_from_any_file(source, name, use_cache)
+    except MemoryError:
+        return f"Ошибка извлечения текста: превышен лимит памяти ({name or 'документ'})"
+
+
+def _source_sha256(source: Union[str, bytes]) -> str:
+    """SHA-256 файла по пути или содержимого, читая файл кусками."""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    hasher = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+@dataclass
+class _Task:
+    """Задача извлечения, отслеживаемая сторожем."""
+    source: Union[str, bytes]
+    name: Optional[str]
+    use_cache: bool
+    result: Future
+    inner: Optional[Future] = None
+    started_at: Optional[float] = None
+    retries: int = 0
+    pool_generation: int = 0
+    # Кэш, куда сохранить извлечённый текст, и SHA-256 файла
+    cache: Optional[TextCache] = None
+    sha256: Optional[str] = None
+
+
+class TextExtractionService:
+    """
+    Пул процессов для извлечения текста с таймаутом на файл.
+
+    submit() сразу возвращает Future. Сторож следит за задачами: если
+    файл разбирается дольше timeout_s, его Future завершается
+    ExtractionTimeout, а процессы пула завершаются и пул создаётся
+    заново — зависший процесс нельзя остановить иначе. Остальные
+    задачи, прерванные пересозданием или падением процесса (segfault,
+    OOM killer), отправляются повторно; задача, чей процесс упал дважды,
+    завершается BrokenProcessPool. Процессы также перезапускаются
+    каждые max_tasks_per_child файлов, чтобы не копить память.
+
+    Пример:
+        extractor = TextExtractionService()
+        future = extractor.submit("contract.pdf")
+        text = future.result()
+    """
+
+    # Сколько раз повторять задачу после падения процесса
+    MAX_RETRIES = 1
+    WATCHDOG_INTERVAL_S = 0.2
+    # Способ запуска процессов; fork небезопасен в многопоточном процессе
+    START_METHODS = ("forkserver", "spawn")
+    
+    # Функция, выполняемая в процессе пула: (source, name, use_cache) -> текст
+    worker = staticmethod(_extract_in_worker)
+
+    def __init__(
+        self,
+        workers: int = None,
+        timeout_s: float = None,
+        memory_mb: int = None,
+        max_tasks_per_child: int = None
+    ):
+        """
+        Args:
+            workers: Процессов в пуле (по умолчанию — EXTRACT_WORKERS или число ядер)
+            timeout_s: Время на один файл, секунд (0 — без ограничения)
+            memory_mb: Лимит адресного пространства процесса, МБ (0 — без ограничения)
+            max_tasks_per_child: Файлов на процесс до перезапуска (0 — без перезапуска)
+        """
+        self.workers = workers or settings.extract_workers or os.cpu_count() or 1
+        self.timeout_s = settings.extract_timeout_s if timeout_s is None else timeout_s
+        self.memory_mb = settings.extract_memory_mb if memory_mb is None else memory_mb
+        self.max_tasks_per_child = (
+            settings.extract_max_tasks_per_child if max_tasks_per_child is None else max_tasks_per_child
+        )
+        self.logger = get_logger("TextExtractionService")
+
+        # RLock: done-callback может сработать прямо внутри _dispatch
+        self._lock = threading.RLock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._mp_context = self._get_mp_context()
+        # Сообщения о начале задач; своя очередь у каждого пула, чтобы
+        # процесс, завершённый при пересоздании, не оставил её заблокированной
+        self._started = None
+        self._generation = 0
+        self._tasks: Dict[int, _Task] = {}
+        self._next_id = 0
+        self._watchdog: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats: Dict[str, int] = {"submitted": 0, "timeouts": 0, "recycled": 0, "crashed": 0}
+
+    def submit(
+        self,
+        source: Union[str, os.PathLike, bytes],
+        name: str = None,
+        use_cache: bool = True
+    ) -> Future:
+        """
+        Ставит файл в очередь на извлечение.
+
+        Args:
+            source: Путь к файлу или его содержимое
+            name: Имя документа (для типа по расширению и сообщений)
+            use_cache: Проверять кэш текста
+
+        Returns:
+            Future с текстом (как у extract_text_from_any_file)
+        """
+        if not isinstance(source, bytes):
+            source = os.fspath(source)
+        # Кэш текста проверяется здесь, а не в процессе пула: счётчики
+        # кэша (TextCache.stats) есть только у этого процесса
+        cache = get_text_cache() if use_cache else None
+        sha256 = None
+        if cache is not None:
+            try:
+                sha256 = _source_sha256(source)
+            except OSError:
+                # Ошибку чтения файла вернёт извлечение в пуле
+                cache = None
+        if cache is not None:
+            text = cache.get(sha256)
+            if text is not None:
+                result = Future()
+                result.set_result(text)
+                return result
+        task = _Task(source=source, name=name, use_cache=False, result=Future(), cache=cache, sha256=sha256)
+        task.result.set_running_or_notify_cancel()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("TextExtractionService остановлен")
+            task_id = self._next_id
+            self._next_id += 1
+            self._tasks[task_id] = task
+            self.stats["submitted"] += 1
+            self._dispatch(task_id, task)
+            self._ensure_watchdog()
+        return task.result
+
+    def extract(
+        self,
+        source: Union[str, os.PathLike, bytes],
+        name: str = None,
+        use_cache: bool = True
+    ) -> str:
+        """Извлекает текст и ждёт результата."""
+        return self.submit(source, name, use_cache).result()
+
+    def shutdown(self, wait: bool = True):
+        """Останавливает пул; незавершённые задачи отменяются."""
+        with self._lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+            tasks, self._tasks = self._tasks, {}
+        for task in tasks.values():
+            if not task.result.done():
+                task.result.set_exception(RuntimeError("TextExtractionService остановлен"))
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+        watchdog = self._watchdog
+        if wait and watchdog is not None:
+            watchdog.join()
+
+    # ---- Внутреннее (вызывается под self._lock) ----
+
+    @classmethod
+    def _get_mp_context(cls):
+        available = multiprocessing.get_all_start_methods()
+        for method in cls.START_METHODS:
+            if method in available:
+                return multiprocessing.get_context(method)
+        return multiprocessing.get_context()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            kwargs = {}
+            if self.max_tasks_per_child:
+                kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+            self._started = self._mp_context.SimpleQueue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._mp_context,
+                initializer=_init_worker,
+                initargs=(self.memory_mb, self._started),
+                **kwargs
+            )
+            self._generation += 1
+        return self._pool
+
+    def _submit_to_pool(self, task_id: int, task: _Task) -> Future:
+        pool = self._get_pool()
+        return pool.submit(
+            _run_in_worker, self.worker, (task_id, self._generation),
+            task.source, task.name, task.use_cache
+        )
+
+    def _dispatch(self, task_id: int, task: _Task):
+        try:
+            inner = self._submit_to_pool(task_id, task)
+        except BrokenProcessPool:
+            self._pool = None
+            inner = self._submit_to_pool(task_id, task)
+        task.inner = inner
+        task.started_at = None
+        task.pool_generation = self._generation
+        task.inner.add_done_callback(lambda inner, task_id=task_id: self._on_done(task_id, inner))
+
+    def _ensure_watchdog(self):
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._watchdog = threading.Thread(
+                target=self._watch,
+                name="extract-watchdog",
+                daemon=True
+            )
+            self._watchdog.start()
+
+    # ---- Завершение задач ----
+
+    def _on_done(self, task_id: int, inner: Future):
+        """Результат процесса; падение пула обрабатывает сторож."""
+        from text_extraction import is_extracted_text
+
+        if inner.cancelled():
+            return
+        error = inner.exception()
+        if isinstance(error, BrokenProcessPool):
+            return
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.inner is not inner:
+                return
+            del self._tasks[task_id]
+        if error is not None:
+            task.result.set_exception(error)
+            return
+        text = inner.result()
+        # В кэш — до set_result, чтобы повторный submit того же файла уже попал в него
+        if task.cache is not None and is_extracted_text(text):
+            task.cache.put(task.sha256, text)
+        task.result.set_result(text)
+
+    def _watch(self):
+        """Следит за таймаутами и падениями процессов."""
+        while True:
+            time.sleep(self.WATCHDOG_INTERVAL_S)
+            with self._lock:
+                if self._closed or not self._tasks:
+                    self._watchdog = None
+                    return
+                self._check_tasks()
+
+    def _drain_started(self, now: float):
+        """Отмечает время начала задач, о которых сообщили процессы пула."""
+        started = self._started
+        while started is not None and not started.empty():
+            try:
+                task_id, generation = started.get()
+            except (EOFError, OSError, queue.Empty):
+                return
+            task = self._tasks.get(task_id)
+            if task is not None and task.pool_generation == generation and task.started_at is None:
+                task.started_at = now
+
+    def _check_tasks(self):
+        now = time.monotonic()
+        self._drain_started(now)
+        expired = []
+        broken = []
+        for task_id, task in self._tasks.items():
+            inner = task.inner
+            if inner.done():
+                if not inner.cancelled() and isinstance(inner.exception(), BrokenProcessPool):
+                    broken.append(task_id)
+                continue
+            if self.timeout_s and task.started_at is not None and now - task.started_at > self.timeout_s:
+                expired.append(task_id)
+
+        if not expired and not broken:
+            return
+
+        for task_id in expired:
+            task = self._tasks.pop(task_id)
+            self.stats["timeouts"] += 1
+            self.logger.warning(
+                f"Извлечение текста '{task.name or 'документ'}' дольше {self.timeout_s} с — прервано"
+            )
+            task.result.set_exception(
+                ExtractionTimeout(f"Извлечение текста дольше {self.timeout_s} с: {task.name or 'документ'}")
+            )
+
+        if expired:
+            # Зависший процесс можно только завершить — вместе со всем пулом
+            self._recycle_pool()
+        else:
+            self.stats["crashed"] += 1
+            self.logger.warning("Процесс извлечения текста упал, пул пересоздаётся")
+            pool, self._pool = self._pool, None
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        # Задачи, прерванные пересозданием пула, отправляются заново;
+        # готовые результаты старого пула доставит _on_done
+        old_generation = self._generation
+        for task_id, task in list(self._tasks.items()):
+            if task.pool_generation != old_generation:
+                continue
+            if task.inner.done() and task_id not in broken:
+                continue
+            if task_id in broken and not expired:
+                # Какой файл уронил процесс, неизвестно — повтор получают все
+                task.retries += 1
+                if task.retries > self.MAX_RETRIES:
+                    del self._tasks[task_id]
+                    task.result.set_exception(
+                        BrokenProcessPool(f"Процесс упал при извлечении '{task.name or 'документ'}'")
+                    )
+                    continue
+            self._dispatch(task_id, task)
+
+    def _recycle_pool(self):
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        self.stats["recycled"] += 1
+        # Приватный атрибут, но другого способа остановить процессы нет
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
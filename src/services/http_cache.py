@@ -0,0 +1,348 @@
+"""
+Дисковый кэш HTTP-ответов ЕИС с адресацией по содержимому.
+
+Структура каталога:
+    index.db              — URL -> SHA-256 содержимого, ETag, Last-Modified
+    objects/ab/<sha><ext> — тело ответа (одна копия на содержимое)
+    tmp/                  — недокачанные файлы
+
+Извлечённый из вложений текст хранит отдельный кэш (services.text_cache).
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from config.settings import settings
+from utils.logger import get_logger
+
+
+@dataclass
+class CacheEntry:
+    """Запись кэша для одного URL."""
+    url: str
+    sha256: str
+    ext: str = ""
+    size: int = 0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+    def is_fresh(self, ttl_s: float) -> bool:
+        """Можно ли отдать запись без обращения к серверу."""
+        return ttl_s < 0 or time.time() - self.fetched_at < ttl_s
+
+
+class HttpCache:
+    """
+    Кэш ответов по URL с содержимым, хранящимся по SHA-256.
+
+    Свежие записи (моложе ttl_s) отдаются без запроса. Устаревшие
+    перепроверяются условным GET (If-None-Match / If-Modified-Since):
+    ответ 304 продлевает запись, не скачивая тело заново. Одинаковые
+    файлы по разным URL хранятся одной копией. При превышении max_mb
+    удаляются давно не использованные объекты (LRU), кроме закреплённых
+    (см. pinned): их файлы ещё читают другие потоки.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_mb: int = None,
+        ttl_s: float = None
+    ):
+        """
+        Args:
+            cache_dir: Каталог кэша (по умолчанию — HTTP_CACHE_DIR)
+            max_mb: Предельный размер объектов в МБ (0 — без ограничения)
+            ttl_s: Сколько секунд страница считается свежей
+        """
+        self.cache_dir = Path(cache_dir or settings.http_cache_dir)
+        self.max_bytes = (settings.http_cache_max_mb if max_mb is None else max_mb) * 1024 * 1024
+        self.ttl_s = settings.http_cache_ttl_s if ttl_s is None else ttl_s
+        self.logger = get_logger("HttpCache")
+
+        self.objects_dir = self.cache_dir / "objects"
+        self.tmp_dir = self.cache_dir / "tmp"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = str(self.cache_dir / "index.db")
+
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "revalidated": 0, "evicted": 0}
+        # sha256 -> сколько блоков pinned() сейчас читают объект
+        self._pins: Dict[str, int] = {}
+        self._local = threading.local()
+        self._create_tables()
+
+    @contextmanager
+    def get_connection(self):
+        """Подключение к индексу кэша."""
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout = 30000")
+        conn.execute("PRAGMA journal_mode = WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _create_tables(self):
+        with self.get_connection() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_urls (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL
+            )
+            """)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_objects (
+                sha256 TEXT PRIMARY KEY,
+                ext TEXT,
+                size INTEGER,
+                accessed_at REAL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_urls_sha ON cache_urls(sha256)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_objects_accessed ON cache_objects(accessed_at)")
+            conn.commit()
+
+    # ---- Пути ----
+
+    def object_path(self, sha256: str, ext: str = "") -> Path:
+        """Путь к телу ответа по его SHA-256."""
+        return self.objects_dir / sha256[:2] / f"{sha256}{ext}"
+
+    def temp_path(self, url: str) -> Path:
+        """Временный файл для потоковой загрузки URL (в том же разделе, что objects)."""
+        return self.tmp_dir / f"{hashlib.md5(url.encode()).hexdigest()}.{threading.get_ident()}.part"
+
+    # ---- Чтение ----
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Находит запись для URL; None, если её нет или файл пропал."""
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT u.url, u.sha256, u.etag, u.last_modified, u.fetched_at, o.ext, o.size
+                FROM cache_urls u JOIN cache_objects o ON o.sha256 = u.sha256
+                WHERE u.url = ?
+            """, (url,)).fetchone()
+        if not row:
+            return None
+        entry = CacheEntry(
+            url=row["url"],
+            sha256=row["sha256"],
+            ext=row["ext"] or "",
+            size=row["size"] or 0,
+            etag=row["etag"],
+            last_modified=row["last_modified"],
+            fetched_at=row["fetched_at"] or 0.0,
+        )
+        if not self.object_path(entry.sha256, entry.ext).exists():
+            return None
+        return entry
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Заголовки условного GET для перепроверки записи."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def hit(self, entry: CacheEntry, revalidated: bool = False, headers: dict = None) -> Optional[Path]:
+        """
+        Отмечает попадание в кэш и возвращает путь к телу.
+
+        Args:
+            entry: Запись кэша
+            revalidated: Запись подтверждена ответом 304 — продлеваем её
+            headers: Заголовки ответа 304 (могут обновить ETag/Last-Modified)
+
+        Returns:
+            Путь к телу или None, если объект вытеснен после lookup()
+        """
+        now = time.time()
+        path = self.object_path(entry.sha256, entry.ext)
+        with self._lock:
+            if not path.exists():
+                return None
+            self._pin(entry.sha256)
+            self.stats["revalidated" if revalidated else "hits"] += 1
+        with self.get_connection() as conn:
+            conn.execute("UPDATE cache_objects SET accessed_at = ? WHERE sha256 = ?", (now, entry.sha256))
+            if revalidated:
+                headers = headers or {}
+                conn.execute(
+                    "UPDATE cache_urls SET fetched_at = ?, etag = ?, last_modified = ? WHERE url = ?",
+                    (
+                        now,
+                        headers.get("ETag") or entry.etag,
+                        headers.get("Last-Modified") or entry.last_modified,
+                        entry.url,
+                    )
+                )
+            conn.commit()
+        return path
+
+    def miss(self):
+        """Отмечает промах кэша."""
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def read_text(self, entry: CacheEntry) -> str:
+        """Читает закэшированную страницу как текст."""
+        return self.object_path(entry.sha256, entry.ext).read_text(encoding="utf-8")
+
+    # ---- Запись ----
+
+    def put_bytes(self, url: str, content: bytes, headers: dict = None, ext: str = "") -> CacheEntry:
+        """Сохраняет тело ответа целиком (страницы ЕИС)."""
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self.object_path(sha256, ext)
+        tmp = self.temp_path(url)
+        tmp.write_bytes(content)
+        path.parent.mkdir(exist_ok=True)
+        with self._lock:
+            if path.exists():
+                tmp.unlink()
+            else:
+                os.replace(tmp, path)
+            self._pin(sha256)
+        return self._index(url, sha256, ext, len(content), headers)
+
+    def put_file(
+        self,
+        url: str,
+        file_path: Path,
+        sha256: str,
+        size: int,
+        headers: dict = None,
+        ext: str = ""
+    ) -> CacheEntry:
+        """
+        Переносит скачанный файл в кэш.
+
+        file_path должен лежать в tmp/ кэша (см. temp_path), чтобы перенос
+        был атомарным переименованием в пределах одного раздела.
+        """
+        path = self.object_path(sha256, ext)
+        path.parent.mkdir(exist_ok=True)
+        with self._lock:
+            if path.exists():
+                Path(file_path).unlink()
+            else:
+                os.replace(file_path, path)
+            self._pin(sha256)
+        return self._index(url, sha256, ext, size, headers)
+
+    def _index(self, url: str, sha256: str, ext: str, size: int, headers: dict = None) -> CacheEntry:
+        headers = headers or {}
+        now = time.time()
+        entry = CacheEntry(
+            url=url,
+            sha256=sha256,
+            ext=ext,
+            size=size,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            fetched_at=now,
+        )
+        with self.get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_objects (sha256, ext, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (sha256, ext, size, now)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_urls (url, sha256, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, sha256, entry.etag, entry.last_modified, now)
+            )
+            conn.commit()
+        self.evict()
+        return entry
+
+    # ---- Вытеснение ----
+
+    @contextmanager
+    def pinned(self):
+        """
+        Объекты, выданные hit(), put_bytes() и put_file() в этом потоке
+        внутри блока with, не вытесняются до выхода из него: их файлы
+        можно спокойно читать, пока другие потоки пополняют кэш.
+        """
+        held = []
+        outer = getattr(self._local, "held", None)
+        self._local.held = held
+        try:
+            yield
+        finally:
+            self._local.held = outer
+            with self._lock:
+                for sha256 in held:
+                    self._pins[sha256] -= 1
+                    if not self._pins[sha256]:
+                        del self._pins[sha256]
+
+    def _pin(self, sha256: str):
+        """Закрепляет объект за текущим блоком pinned() (вызывается под self._lock)."""
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            self._pins[sha256] = self._pins.get(sha256, 0) + 1
+            held.append(sha256)
+
+    def total_size(self) -> int:
+        """Суммарный размер объектов в байтах."""
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_objects").fetchone()
+        return row[0]
+
+    def evict(self) -> int:
+        """
+        Удаляет давно не использованные объекты, пока размер кэша
+        больше max_bytes. Закреплённые объекты пропускаются.
+
+        Returns:
+            Количество удалённых объектов
+        """
+        if not self.max_bytes:
+            return 0
+
+        removed = 0
+        with self._lock:
+            total = self.total_size()
+            if total <= self.max_bytes:
+                return 0
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    "SELECT sha256, ext, size FROM cache_objects ORDER BY accessed_at"
+                ).fetchall()
+                for row in rows:
+                    if total <= self.max_bytes:
+                        break
+                    if row["sha256"] in self._pins:
+                        continue
+                    conn.execute("DELETE FROM cache_urls WHERE sha256 = ?", (row["sha256"],))
+                    conn.execute("DELETE FROM cache_objects WHERE sha256 = ?", (row["sha256"],))
+                    path = self.object_path(row["sha256"], row["ext"] or "")
+                    if path.exists():
+                        path.unlink()
+                    total -= row["size"] or 0
+                    removed += 1
+                conn.commit()
+            self.stats["evicted"] += removed
+
+        if removed:
+            self.logger.info(f"Вытеснено из кэша: {removed} объектов")
+        return removed
@@ -0,0 +1,279 @@
+"""
+Общий HTTP-клиент с пулом keep-alive соединений.
+"""
+import socket
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import settings
+from utils.logger import get_logger
+from utils.rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+
+
+class _DnsCache:
+    """
+    Кэш DNS-ответов с TTL поверх socket.getaddrinfo.
+
+    socket.getaddrinfo подменяется один раз на процесс (requests/urllib3
+    и httpx разрешают имена через него), но кэш работает только внутри
+    scope() — на время запросов HttpClient к ЕИС. Остальные клиенты
+    (OpenRouter, 2ГИС, сторонние библиотеки) разрешают имена как обычно.
+    Размер кэша ограничен: при переполнении вытесняются самые старые записи.
+    """
+
+    MAX_ENTRIES = 256
+
+    _instance: Optional["_DnsCache"] = None
+    _install_lock = threading.Lock()
+
+    def __init__(self, ttl_s: float, max_entries: int = MAX_ENTRIES, resolver: Callable = None):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, list]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._getaddrinfo = resolver or socket.getaddrinfo
+
+    @contextmanager
+    def scope(self):
+        """Включает кэш для текущего потока на время блока with."""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        if not getattr(self._local, "depth", 0):
+            return self._getaddrinfo(host, port, family, type, proto, flags)
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        result = self._getaddrinfo(host, port, family, type, proto, flags)
+        with self._lock:
+            self._entries[key] = (now + self.ttl_s, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    @classmethod
+    def install(cls, ttl_s: float) -> Optional["_DnsCache"]:
+        """
+        Подменяет socket.getaddrinfo кэширующей версией (идемпотентно).
+
+        Returns:
+            Общий кэш процесса или None, если кэш выключен (ttl_s <= 0)
+        """
+        if ttl_s <= 0:
+            return None
+        with cls._install_lock:
+            if cls._instance is None:
+                cls._instance = cls(ttl_s)
+                socket.getaddrinfo = cls._instance.getaddrinfo
+            return cls._instance
+
+
+class StreamResponse:
+    """Потоковый ответ с общим интерфейсом для requests и httpx."""
+
+    def __init__(self, response, release: Callable[[], None] = None):
+        """
+        Args:
+            response: Ответ requests или httpx
+            release: Освобождает слот соединения хоста при close()
+        """
+        self._response = response
+        self._release = release
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    def close(self):
+        """Возвращает соединение в пул и освобождает слот хоста."""
+        try:
+            self._response.close()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+    def raise_for_status(self):
+        self._response.raise_for_status()
+
+    def iter_bytes(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Итерирует тело ответа кусками, не загружая его целиком в память."""
+        if hasattr(self._response, "iter_content"):
+            return self._response.iter_content(chunk_size=chunk_size)
+        return self._response.iter_bytes(chunk_size=chunk_size)
+
+
+class HttpClient:
+    """
+    HTTP-клиент для всех запросов к zakupki.gov.ru.
+
+    Держит соединения открытыми между запросами (keep-alive), ограничивает
+    число одновременных соединений с одним хостом и кэширует DNS.
+    Частота запросов и повторы (backoff, Retry-After) — через общий
+    AdaptiveRateLimiter.
+    Если установлен httpx с поддержкой HTTP/2 — использует его,
+    иначе requests.Session с пулом urllib3.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = None,
+        per_host_connections: int = None,
+        http2: bool = None,
+        dns_ttl_s: float = None,
+        rate_limiter: AdaptiveRateLimiter = None
+    ):
+        """
+        Args:
+            pool_size: Количество хостов, для которых держится пул соединений
+            per_host_connections: Макс. одновременных соединений с одним хостом
+            http2: Использовать HTTP/2, если доступен httpx[http2]
+            dns_ttl_s: Время жизни записей DNS-кэша (0 — без кэша)
+            rate_limiter: Ограничитель частоты (по умолчанию общий для ЕИС)
+        """
+        self.pool_size = pool_size or settings.http_pool_size
+        self.per_host_connections = per_host_connections or settings.eis_per_host_connections
+        http2 = settings.http_http2 if http2 is None else http2
+        dns_ttl_s = settings.http_dns_cache_ttl_s if dns_ttl_s is None else dns_ttl_s
+        self.limiter = rate_limiter or get_rate_limiter("eis")
+        self.logger = get_logger("HttpClient")
+
+        self._lock = threading.Lock()
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+        self._dns = _DnsCache.install(dns_ttl_s)
+
+        self._httpx = self._create_httpx_client() if http2 else None
+        self._session = None if self._httpx else self._create_session()
+        self.http2 = self._httpx is not None
+
+        self.logger.debug(
+            f"HttpClient: pool={self.pool_size}, per_host={self.per_host_connections}, "
+            f"http2={self.http2}"
+        )
+
+    def _create_session(self) -> requests.Session:
+        """Создаёт requests.Session с пулом соединений."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.per_host_connections,
+            pool_block=True,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _create_httpx_client(self):
+        """Создаёт httpx.Client с HTTP/2 или None, если httpx/h2 не установлены."""
+        try:
+            import httpx
+            import h2  # noqa: F401  — нужен httpx для HTTP/2
+        except ImportError:
+            self.logger.debug("httpx[http2] не установлен, используем requests")
+            return None
+
+        limits = httpx.Limits(
+            max_connections=self.pool_size * self.per_host_connections,
+            max_keepalive_connections=self.pool_size * self.per_host_connections,
+        )
+        return httpx.Client(http2=True, limits=limits, follow_redirects=True)
+
+    @contextmanager
+    def _host_slot(self, url: str):
+        """
+        Занимает слот соединения для хоста из URL на время запроса
+        и включает DNS-кэш для соединений, открытых внутри.
+        """
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_connections)
+                self._host_semaphores[host] = semaphore
+        with semaphore, (self._dns.scope() if self._dns else nullcontext()):
+            yield
+
+    def get(
+        self,
+        url: str,
+        headers: Optional[dict] = None,
+        timeout: float = 30
+    ):
+        """
+        Выполняет GET-запрос через общий пул соединений
+        с ограничением частоты и повторами.
+
+        Returns:
+            Ответ requests.Response или httpx.Response (общий интерфейс:
+            status_code, headers, text, content, raise_for_status)
+        """
+        def _get():
+            with self._host_slot(url):
+                if self._httpx is not None:
+                    return self._httpx.get(url, headers=headers, timeout=timeout)
+                return self._session.get(url, headers=headers, timeout=timeout)
+        
+        return self.limiter.call(urlparse(url).netloc.lower(), _get)
+
+    @contextmanager
+    def stream(
+        self,
+        url: str,
+        headers: Optional[dict] = None,
+        timeout: float = 60,
+        attempts: int = None
+    ) -> Iterator[StreamResponse]:
+        """
+        Выполняет потоковый GET-запрос. Повторяется только установка
+        соединения; соединение возвращается в пул при выходе из блока with.
+        
+        Слот хоста занимается на каждую попытку и держится, пока читается
+        тело ответа. Ожидание между попытками (backoff, Retry-After)
+        проходит без слота и не задерживает другие загрузки с хоста.
+        
+        Args:
+            attempts: Сколько раз пытаться (по умолчанию HTTP_MAX_RETRIES);
+                1 — если повторы делает вызывающий
+        """
+        def _open():
+            slot = self._host_slot(url)
+            slot.__enter__()
+            try:
+                if self._httpx is not None:
+                    request = self._httpx.build_request("GET", url, headers=headers, timeout=timeout)
+                    resp = self._httpx.send(request, stream=True)
+                else:
+                    resp = self._session.get(url, headers=headers, timeout=timeout, stream=True)
+            except BaseException:
+                slot.__exit__(None, None, None)
+                raise
+            return StreamResponse(resp, release=lambda: slot.__exit__(None, None, None))
+        
+        resp = self.limiter.call(urlparse(url).netloc.lower(), _open, attempts=attempts)
+        try:
+            yield resp
+        finally:
+            resp.close()
+
+    def close(self):
+        """Закрывает все соединения пула."""
+        if self._httpx is not None:
+            self._httpx.close()
+        if self._session is not None:
+            self._session.close()
@@ -2,9 +2,11 @@
 Сервис для сбора объявлений с 2ГИС.
 """
 from typing import List, Optional
+from urllib.parse import urlparse
 from models.listing import Listing, ListingResult
 from repositories.listing_repo import ListingRepository
 from utils.logger import get_logger
+from utils.rate_limiter import get_rate_limiter
 from config.settings import settings
 
 
@@ -16,6 +18,7 @@ class ScraperService:
     
     def __init__(self, listing_repo: ListingRepository):
         self.repo = listing_repo
+        self.limiter = get_rate_limiter("2gis")
         self.logger = get_logger("ScraperService")
     
     def collect_listings(
@@ -48,6 +51,11 @@ class ScraperService:
         self.logger.info(f"Сбор {top_n} объявлений...")
         self.logger.debug(f"URL: {url[:80]}...")
         
+        # Сессии браузера к 2ГИС не чаще STAGE4_RATE_LIMIT_S;
+        # после ошибок интервал увеличивается
+        host = urlparse(url).netloc.lower()
+        self.limiter.acquire(host)
+        
         try:
             # Импортируем scraper из существующего модуля
             from realty_scraper.two_gis_playwright import collect_top_listings
@@ -60,10 +68,16 @@ class ScraperService:
                 get_details=get_details
             )
             
+            if result.error:
+                self.limiter.on_failure(host)
+            else:
+                self.limiter.on_success(host)
+            
             self.logger.info(f"Собрано {result.actual_n} объявлений")
             return result
             
         except Exception as e:
+            self.limiter.on_failure(host)
             self.logger.error(f"Ошибка сбора: {e}")
             return ListingResult(
                 query_url=url,
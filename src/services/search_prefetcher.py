@@ -0,0 +1,184 @@
+"""
+Упреждающая загрузка страниц поиска ЕИС.
+"""
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+from utils.logger import get_logger
+
+
+# Признак конца потока страниц в очереди
+_DONE = object()
+
+
+class SearchPagePrefetcher:
+    """
+    Загружает и парсит страницы поиска заранее, пока потребитель
+    обрабатывает закупки с предыдущих страниц.
+
+    Фоновый поток держит до workers страниц в загрузке одновременно и
+    складывает разобранные страницы в ограниченную очередь (prefetch
+    страниц) строго по порядку номеров. Когда очередь заполнена,
+    загрузка новых страниц приостанавливается. close() (или выход из
+    with) прекращает листание: ещё не начатые загрузки отменяются.
+
+    Пример:
+        with SearchPagePrefetcher(fetch, parse, max_pages=50) as pages:
+            for page, purchases in pages:
+                if enough:
+                    break
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int], Optional[str]],
+        parse_page: Callable[[str], List[Dict]],
+        max_pages: int,
+        prefetch: int = None,
+        workers: int = None,
+        start_page: int = 1
+    ):
+        """
+        Args:
+            fetch_page: Загрузка HTML страницы по номеру (None — не загрузилась)
+            parse_page: Разбор HTML в список закупок
+            max_pages: Последняя страница, которую можно загрузить
+            prefetch: Сколько готовых страниц держать в очереди
+            workers: Сколько страниц загружать одновременно
+            start_page: Номер первой страницы
+        """
+        self.fetch_page = fetch_page
+        self.parse_page = parse_page
+        self.max_pages = max_pages
+        self.prefetch = max(1, prefetch or settings.eis_search_prefetch_pages)
+        self.workers = max(1, workers or settings.eis_search_workers)
+        self.start_page = start_page
+        self.logger = get_logger("SearchPagePrefetcher")
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.prefetch)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "SearchPagePrefetcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        """Запускает фоновую загрузку страниц."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._produce,
+                name="eis-search-prefetch",
+                daemon=True
+            )
+            self._thread.start()
+
+    def close(self):
+        """
+        Прекращает листание и дожидается фонового потока.
+        Итерация после close() сразу заканчивается.
+        """
+        self._stop.set()
+        # Освобождаем место в очереди, если поток ждёт на put()
+        self._drain()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._drain()
+        self._queue.put_nowait(_DONE)
+
+    def _drain(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def __iter__(self) -> Iterator[Tuple[int, Optional[List[Dict]]]]:
+        """
+        Выдаёт (номер страницы, закупки) по порядку страниц.
+        Закупки равны None, если страница не загрузилась.
+        """
+        self.start()
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                # Оставляем признак конца для повторной итерации
+                self._queue.put(_DONE)
+                return
+            yield item
+
+    def _load(self, page: int) -> Optional[List[Dict]]:
+        html = self.fetch_page(page)
+        if not html:
+            return None
+        return self.parse_page(html)
+
+    def _put(self, item) -> bool:
+        """Кладёт элемент в очередь; False, если листание остановлено."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        in_flight: Deque[Tuple[int, Future]] = deque()
+        next_page = self.start_page
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="eis-search")
+        try:
+            while not self._stop.is_set():
+                # Держим в загрузке до workers страниц вперёд
+                while len(in_flight) < self.workers and next_page <= self.max_pages:
+                    in_flight.append((next_page, executor.submit(self._load, next_page)))
+                    next_page += 1
+                if not in_flight:
+                    break
+
+                page, future = in_flight[0]
+                try:
+                    purchases = future.result(timeout=0.1)
+                except TimeoutError:
+                    continue
+                except Exception as e:
+                    self.logger.warning(f"Ошибка загрузки страницы {page}: {e}")
+                    purchases = None
+                in_flight.popleft()
+                if not self._put((page, purchases)):
+                    break
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
+            self._put(_DONE)
+
+
+def interleave_pages(
+    sources: Dict[str, SearchPagePrefetcher]
+) -> Iterator[Tuple[str, int, Optional[List[Dict]]]]:
+    """
+    Поочерёдно выдаёт страницы нескольких профилей поиска:
+    (имя профиля, номер страницы, закупки).
+
+    Все профили листаются одновременно, каждый своим SearchPagePrefetcher.
+    Чтобы прекратить листание одного профиля, потребитель вызывает
+    close() у его источника — профиль выпадает из очереди.
+    """
+    iterators = {name: iter(source) for name, source in sources.items()}
+    while iterators:
+        for name in list(iterators):
+            item = next(iterators[name], None)
+            if item is None:
+                del iterators[name]
+                continue
+            page, purchases = item
+            yield name, page, purchases
@@ -0,0 +1,89 @@
+"""
+Кэш извлечённого текста документов.
+
+Одни и те же файлы (типовой проект контракта, регламенты заказчика)
+прикладываются к десяткам закупок. Текст извлекается один раз и
+хранится по SHA-256 содержимого файла и версии извлечения:
+
+    <text_cache_dir>/ab/<sha256>.<версия>.txt
+
+Версия меняется вместе с кодом и настройками извлечения (см.
+text_extraction.extractor_version), старые записи просто перестают
+находиться. Файлы пишутся атомарно, поэтому кэшем могут пользоваться
+несколько процессов сразу (пул извлечения).
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from config.settings import settings
+from utils.logger import get_logger
+
+
+class TextCache:
+    """Кэш текста по SHA-256 файла и версии извлечения."""
+
+    def __init__(self, cache_dir: str = None, version: str = None):
+        """
+        Args:
+            cache_dir: Каталог кэша (по умолчанию — TEXT_CACHE_DIR)
+            version: Версия извлечения (по умолчанию — text_extraction.extractor_version())
+        """
+        if version is None:
+            from text_extraction import extractor_version
+            version = extractor_version()
+        self.cache_dir = Path(cache_dir or settings.text_cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.version = hashlib.sha256(version.encode()).hexdigest()[:12]
+        self.logger = get_logger("TextCache")
+
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0}
+
+    def path(self, sha256: str) -> Path:
+        """Путь к тексту файла с данным SHA-256."""
+        return self.cache_dir / sha256[:2] / f"{sha256}.{self.version}.txt"
+
+    def get(self, sha256: str) -> Optional[str]:
+        """Текст файла или None (промах)."""
+        try:
+            text = self.path(sha256).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            text = None
+        with self._lock:
+            self.stats["misses" if text is None else "hits"] += 1
+        return text
+
+    def put(self, sha256: str, text: str):
+        """Сохраняет текст файла."""
+        path = self.path(sha256)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+        try:
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            self.logger.warning(f"Не удалось сохранить текст в кэш: {e}")
+            if tmp.exists():
+                tmp.unlink()
+            return
+        with self._lock:
+            self.stats["stores"] += 1
+
+
+# Экземпляр на процесс (в том числе в каждом процессе пула извлечения)
+_text_cache: Optional[TextCache] = None
+_text_cache_lock = threading.Lock()
+
+
+def get_text_cache() -> Optional[TextCache]:
+    """Общий кэш текста или None, если TEXT_CACHE_ENABLED=false."""
+    global _text_cache
+    if not settings.text_cache_enabled:
+        return None
+    with _text_cache_lock:
+        if _text_cache is None:
+            _text_cache = TextCache()
+        return _text_cache
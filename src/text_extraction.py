@@ -1,62 +1,450 @@
-"""Утилиты для извлечения текстов из документов различных форматов."""
+"""Утилиты для извлечения текстов из документов различных форматов.
+
+Все функции принимают путь к файлу или открытый бинарный поток
+(BytesIO, SpooledTemporaryFile) — документ, скачанный в память,
+не нужно записывать на диск.
+"""
 
 from __future__ import annotations
 
+import contextlib
+import hashlib
+import io
 import os
+import re
 import shutil
+import struct
+import subprocess
 import tempfile
+import threading
 import zipfile
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterable, Iterator, Union
 
-import openpyxl
-import pdfplumber
-from docx import Document
-import olefile
-import xlrd
+if TYPE_CHECKING:
+    import olefile
 
+# Путь к файлу или бинарный поток с содержимым
+Source = Union[str, os.PathLike, BinaryIO]
+
+# Версия извлечения: увеличивать при изменениях, меняющих извлекаемый
+# текст, — записи кэша текста (services.text_cache) с другой версией
+# перестают находиться
+EXTRACTOR_VERSION = "4"
+
+
+def extractor_version() -> str:
+    """Версия извлечения вместе с настройками, от которых зависит текст."""
+    from config.settings import settings
+    return (
+        f"{EXTRACTOR_VERSION};pdf={settings.pdf_backends};pages={settings.pdf_max_pages};"
+        f"sheet={settings.sheet_max_rows}x{settings.sheet_max_cols}/{settings.sheet_max_chars}"
+    )
+
+
+def _is_path(source: Source) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def _rewind(source: Source) -> Source:
+    """Возвращает поток в начало перед очередным чтением."""
+    if not _is_path(source):
+        source.seek(0)
+    return source
+
+
+def _read_bytes(source: Source) -> bytes:
+    if _is_path(source):
+        with open(source, "rb") as f:
+            return f.read()
+    return _rewind(source).read()
+
+
+def _sha256(source: Source) -> str:
+    """SHA-256 содержимого, читая файл кусками."""
+    hasher = hashlib.sha256()
+    if _is_path(source):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+    else:
+        _rewind(source)
+        for chunk in iter(lambda: source.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
 
-def extract_text_from_pdf(path: str) -> str:
-    """Читаем PDF постранично."""
-    chunks: list[str] = []
-    try:
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                chunks.append(page.extract_text() or "")
-    except Exception as exc:
-        return f"Ошибка извлечения текста для PDF: {exc}"
-    return "\n".join(chunks)
 
+def _source_name(source: Source, name: str | None = None) -> str:
+    """Имя документа для сообщений и определения типа по расширению."""
+    if name:
+        return name
+    if _is_path(source):
+        return os.fspath(source)
+    stream_name = getattr(source, "name", None)
+    return stream_name if isinstance(stream_name, str) else ""
 
-def extract_text_from_doc(path: str) -> str:
-    """Работаем с устаревшими DOC: пытаемся через Word, иначе наивно декодируем."""
 
-    converted = _extract_doc_via_word(path)
-    if converted:
-        return converted
-    print(f"[extract_text_from_doc] Word conversion failed for {path}, fallback to naive decode.")
+def _pdf_pages_pdfplumber(path: Source, max_pages: int) -> list[str]:
+    """pdfplumber: точная раскладка, но самый медленный."""
+    import pdfplumber
 
+    with pdfplumber.open(_rewind(path)) as pdf:
+        pages = pdf.pages[:max_pages] if max_pages else pdf.pages
+        return [page.extract_text() or "" for page in pages]
+
+
+# PDFium не потокобезопасен: без пула процессов извлечение идёт в потоках загрузки
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _pdf_pages_pypdfium2(path: Source, max_pages: int) -> list[str]:
+    """pypdfium2 (PDFium, C++): в разы быстрее pdfplumber."""
+    import pypdfium2 as pdfium
+
+    # PDFium читает открытый файл сам, без копии в памяти
+    source = os.fspath(path) if _is_path(path) else _rewind(path)
+    with _PDFIUM_LOCK:
+        return _read_pdfium_pages(pdfium.PdfDocument(source), max_pages)
+
+
+def _read_pdfium_pages(pdf, max_pages: int) -> list[str]:
     try:
+        count = min(len(pdf), max_pages) if max_pages else len(pdf)
+        chunks: list[str] = []
+        for index in range(count):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                chunks.append(textpage.get_text_bounded().replace("\r\n", "\n"))
+            finally:
+                textpage.close()
+                page.close()
+        return chunks
+    finally:
+        pdf.close()
+
+
+def _pdf_pages_pdfminer(path: Source, max_pages: int) -> list[str]:
+    """
+    pdfminer без анализа раскладки (LAParams не используется): символы
+    собираются в строки по смене базовой линии.
+    """
+    from pdfminer.converter import PDFLayoutAnalyzer
+    from pdfminer.layout import LTChar, LTContainer
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    def collect_chars(item, chars: list) -> None:
+        for child in item:
+            if isinstance(child, LTChar):
+                chars.append(child)
+            elif isinstance(child, LTContainer):
+                collect_chars(child, chars)
+
+    chunks: list[str] = []
+
+    class LineCollector(PDFLayoutAnalyzer):
+        def receive_layout(self, ltpage) -> None:
+            chars: list = []
+            collect_chars(ltpage, chars)
+            parts: list[str] = []
+            prev = None
+            for char in chars:
+                if prev is not None:
+                    if abs(char.y0 - prev.y0) > max(prev.height, 1) / 2:
+                        parts.append("\n")
+                    elif char.x0 - prev.x1 > max(prev.width, 1) * 0.3:
+                        parts.append(" ")
+                parts.append(char.get_text())
+                prev = char
+            chunks.append("".join(parts))
+
+    manager = PDFResourceManager(caching=True)
+    interpreter = PDFPageInterpreter(manager, LineCollector(manager, laparams=None))
+    if _is_path(path):
         with open(path, "rb") as f:
-            data = f.read()
+            for page in PDFPage.get_pages(f, maxpages=max_pages):
+                interpreter.process_page(page)
+    else:
+        for page in PDFPage.get_pages(_rewind(path), maxpages=max_pages):
+            interpreter.process_page(page)
+    return chunks
+
+
+# Бэкенды извлечения текста из PDF: имя -> функция (источник, макс. страниц) -> тексты страниц
+PDF_BACKENDS = {
+    "pypdfium2": _pdf_pages_pypdfium2,
+    "pdfminer": _pdf_pages_pdfminer,
+    "pdfplumber": _pdf_pages_pdfplumber,
+}
+
+
+# Разделитель страниц PDF в извлечённом тексте (по нему text_normalization
+# находит повторяющиеся колонтитулы)
+PAGE_BREAK = "\f"
+
+
+def _pdf_backend_names(backends: str | list[str] | None) -> list[str]:
+    if backends is None:
+        from config.settings import settings
+        backends = settings.pdf_backends
+    if isinstance(backends, str):
+        backends = [name.strip() for name in backends.split(",") if name.strip()]
+    unknown = [name for name in backends if name not in PDF_BACKENDS]
+    if unknown:
+        raise ValueError(f"Неизвестные бэкенды PDF: {', '.join(unknown)}; доступны: {', '.join(PDF_BACKENDS)}")
+    return backends
+
+
+def extract_text_from_pdf(
+    path: Source,
+    backends: str | list[str] | None = None,
+    max_pages: int | None = None,
+) -> str:
+    """
+    Читаем PDF постранично первым сработавшим бэкендом; страницы
+    разделяются PAGE_BREAK.
+
+    backends — порядок бэкендов (по умолчанию PDF_BACKENDS из настроек):
+    если бэкенд не установлен или падает на файле, пробуем следующий.
+    max_pages — сколько первых страниц читать (0 — все; по умолчанию PDF_MAX_PAGES).
+    """
+    if max_pages is None:
+        from config.settings import settings
+        max_pages = settings.pdf_max_pages
+    errors: list[str] = []
+    for name in _pdf_backend_names(backends):
         try:
-            text = data.decode("utf-8", errors="ignore")
-        except Exception:
-            text = data.decode("cp1251", errors="ignore")
-
-        cleaned = []
-        for ch in text:
-            if ch in ("\n", "\r", "\t") or ch.isprintable():
-                cleaned.append(ch)
-        result = "".join(cleaned)
-        return result if result.strip() else "Не удалось извлечь содержимое из DOC"
+            return PAGE_BREAK.join(PDF_BACKENDS[name](path, max_pages))
+        except ImportError as exc:
+            errors.append(f"{name}: не установлен ({exc})")
+        except Exception as exc:
+            errors.append(f"{name}: {exc}")
+    return f"Ошибка извлечения текста для PDF: {'; '.join(errors)}"
+
+
+# Word 97–2003: подпись FIB и смещения полей в потоке WordDocument
+WORD_FIB_IDENT = 0xA5EC
+WORD_NFIB_97 = 0x00C1
+FIB_FLAGS = 0x000A
+FIB_CCP_TEXT = 0x004C
+FIB_FC_CLX = 0x01A2
+FIB_LCB_CLX = 0x01A6
+FLAG_ENCRYPTED = 0x0100
+FLAG_WHICH_TABLE = 0x0200
+PIECE_COMPRESSED = 0x40000000
+
+# Поля Word: \x13 код поля \x14 результат \x15 — код убирается, результат остаётся
+_WORD_FIELD_CODE = re.compile(r"\x13[^\x13\x14\x15]*[\x14\x15]")
+# Служебные символы: абзац/разрыв строки/страницы -> перевод строки,
+# конец ячейки -> табуляция, неразрывный дефис -> дефис, прочие удаляются
+_WORD_CONTROL = {code: None for code in range(0x20) if code not in (0x09, 0x0A)}
+_WORD_CONTROL.update({0x0D: "\n", 0x0B: "\n", 0x0C: "\n", 0x07: "\t", 0x1E: "-"})
+_TRAILING_SPACE = re.compile(r"[ \t]+\n")
+
+# Внешние конвертеры DOC -> текст, если установлены (по порядку)
+DOC_CONVERTERS = (
+    ("antiword", ["antiword", "-m", "UTF-8.txt", "-w", "0"]),
+    ("catdoc", ["catdoc", "-d", "utf-8", "-w"]),
+)
+
+_NON_PRINTABLE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]")
+
+
+def decode_word_text(word: bytes, read_stream: Callable[[str], bytes]) -> str:
+    """
+    Текст основного документа Word 97–2003 по таблице фрагментов (piece table).
+
+    word — содержимое потока WordDocument, read_stream(имя) — чтение
+    потока таблиц (0Table или 1Table — по флагу FIB). Фрагменты лежат
+    в WordDocument либо в cp1252 (сжатые), либо в UTF-16LE.
+    """
+    if len(word) < FIB_LCB_CLX + 4:
+        raise ValueError("поток WordDocument слишком короткий")
+    ident, nfib = struct.unpack_from("<HH", word, 0)
+    if ident != WORD_FIB_IDENT:
+        raise ValueError("нет подписи Word в FIB")
+    if nfib < WORD_NFIB_97:
+        raise ValueError(f"формат Word 6/95 не поддерживается (nFib={nfib:#x})")
+    flags = struct.unpack_from("<H", word, FIB_FLAGS)[0]
+    if flags & FLAG_ENCRYPTED:
+        raise ValueError("документ зашифрован")
+
+    table = read_stream("1Table" if flags & FLAG_WHICH_TABLE else "0Table")
+    ccp_text = struct.unpack_from("<i", word, FIB_CCP_TEXT)[0]
+    fc_clx = struct.unpack_from("<I", word, FIB_FC_CLX)[0]
+    lcb_clx = struct.unpack_from("<I", word, FIB_LCB_CLX)[0]
+    clx = table[fc_clx:fc_clx + lcb_clx]
+
+    # Clx: сначала Prc (0x01, свойства — пропускаем), затем Pcdt (0x02)
+    pos = 0
+    while pos < len(clx) and clx[pos] == 0x01:
+        pos += 3 + struct.unpack_from("<H", clx, pos + 1)[0]
+    if pos + 5 > len(clx) or clx[pos] != 0x02:
+        raise ValueError("не найдена таблица фрагментов")
+    lcb = struct.unpack_from("<I", clx, pos + 1)[0]
+    plc = clx[pos + 5:pos + 5 + lcb]
+
+    # PlcPcd: n+1 позиций символов (CP), затем n описателей фрагментов по 8 байт
+    count = (len(plc) - 4) // 12
+    cps = struct.unpack_from(f"<{count + 1}I", plc, 0)
+    chunks: list[str] = []
+    for index in range(count):
+        cp_start, cp_end = cps[index], min(cps[index + 1], ccp_text)
+        if cp_start >= cp_end:
+            break
+        fc = struct.unpack_from("<I", plc, 4 * (count + 1) + 8 * index + 2)[0]
+        length = cp_end - cp_start
+        if fc & PIECE_COMPRESSED:
+            offset = (fc & ~PIECE_COMPRESSED) // 2
+            chunks.append(word[offset:offset + length].decode("cp1252", errors="replace"))
+        else:
+            chunks.append(word[fc:fc + 2 * length].decode("utf-16-le", errors="replace"))
+    return _clean_word_text("".join(chunks))
+
+
+def _clean_word_text(text: str) -> str:
+    """Убирает коды полей и служебные символы Word."""
+    while True:
+        stripped = _WORD_FIELD_CODE.sub("", text)
+        if stripped == text:
+            break
+        text = stripped
+    text = text.translate(_WORD_CONTROL)
+    return _TRAILING_SPACE.sub("\n", text).strip()
+
+
+def _is_ole_file(source: object) -> bool:
+    """source — уже открытый olefile.OleFileIO (см. _sniff)."""
+    return hasattr(source, "openstream")
+
+
+def _extract_doc_native(path: Source | olefile.OleFileIO) -> str:
+    """Текст DOC из OLE-файла через olefile, без внешних программ."""
+    if not _is_ole_file(path):
+        import olefile
+
+        with olefile.OleFileIO(_rewind(path)) as ole:
+            return _extract_doc_native(ole)
+
+    def read_stream(name: str) -> bytes:
+        with path.openstream(name) as stream:
+            return stream.read()
+
+    return decode_word_text(read_stream("WordDocument"), read_stream)
+
+
+def _extract_doc_via_converter(path: Source) -> str | None:
+    """Пробуем antiword или catdoc, если они установлены."""
+    available = [(exe, args) for exe, args in DOC_CONVERTERS if shutil.which(exe)]
+    if not available:
+        return None
+    with contextlib.ExitStack() as stack:
+        if _is_path(path):
+            file_path = os.fspath(path)
+        else:
+            tmp = stack.enter_context(tempfile.NamedTemporaryFile(suffix=".doc"))
+            tmp.write(_read_bytes(path))
+            tmp.flush()
+            file_path = tmp.name
+        for exe, args in available:
+            try:
+                result = subprocess.run(args + [file_path], capture_output=True, timeout=60)
+            except (OSError, subprocess.TimeoutExpired):
+                continue
+            text = result.stdout.decode("utf-8", errors="replace").strip()
+            if result.returncode == 0 and text:
+                return text
+    return None
+
+
+def _decode_plain_doc(path: Source) -> str:
+    """Файл .doc, который не является OLE (RTF, HTML, текст), декодируем как текст."""
+    data = _read_bytes(path)
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("cp1251", errors="ignore")
+    return _NON_PRINTABLE.sub("", text)
+
+
+def extract_text_from_doc(path: Source | olefile.OleFileIO) -> str:
+    """
+    Работаем с устаревшими DOC (Word 97–2003).
+
+    Текст читается из таблицы фрагментов OLE-файла (olefile); если не
+    вышло — antiword/catdoc, затем конвертация через MS Word (Windows).
+    Файлы с расширением .doc, не являющиеся OLE, декодируются как текст.
+    path — файл, поток или OLE-файл, уже открытый при определении типа.
+    """
+    try:
+        if _is_ole_file(path):
+            # Внешним программам нужен сам файл — поток, из которого открыт OLE
+            ole, path = path, path.fp
+        else:
+            ole = None
+            with _open_source(path) as stream:
+                header = _rewind(stream).read(len(OLE_SIGNATURE))
+            if header != OLE_SIGNATURE:
+                result = _decode_plain_doc(path)
+                return result if result.strip() else "Не удалось извлечь содержимое из DOC"
+
+        errors: list[str] = []
+        try:
+            text = _extract_doc_native(ole or path)
+            if text:
+                return text
+            errors.append("пустой текст")
+        except Exception as exc:
+            errors.append(str(exc))
+
+        converted = _extract_doc_via_converter(path) or _extract_doc_via_word(path)
+        if converted and converted.strip():
+            return converted
+        return f"Ошибка извлечения текста для DOC: {'; '.join(errors)}"
     except Exception as exc:
         return f"Ошибка извлечения текста для DOC: {exc}"
 
 
-def extract_text_from_docx(path: str) -> str:
-    """Считываем параграфы и таблицы DOCX."""
+def _ooxml_main_part(archive: zipfile.ZipFile, default: str) -> str:
+    """Имя основной части документа Office по _rels/.rels."""
+    from xml.etree import ElementTree
+
+    try:
+        rels = ElementTree.fromstring(archive.read("_rels/.rels"))
+    except (KeyError, ElementTree.ParseError):
+        return default
+    for rel in rels:
+        if rel.get("Type", "").endswith("/officeDocument") and rel.get("Target"):
+            return rel.get("Target").lstrip("/")
+    return default
+
+
+def _docx_from_archive(archive: zipfile.ZipFile):
+    """
+    Документ DOCX из уже открытого архива. Для текста нужна только
+    основная часть (word/document.xml): остальные части (картинки,
+    стили) не читаются.
+    """
+    from docx.document import Document as DocumentObject
+    from docx.oxml import parse_xml
+
+    part = _ooxml_main_part(archive, "word/document.xml")
+    return DocumentObject(parse_xml(archive.read(part)), None)
+
+
+def extract_text_from_docx(path: Source | zipfile.ZipFile) -> str:
+    """Считываем параграфы и таблицы DOCX (файл, поток или открытый ZipFile)."""
     try:
-        doc = Document(path)
+        if isinstance(path, zipfile.ZipFile):
+            doc = _docx_from_archive(path)
+        else:
+            from docx import Document
+
+            doc = Document(_rewind(path))
         parts: list[str] = []
         for paragraph in doc.paragraphs:
             parts.append(paragraph.text)
@@ -71,24 +459,93 @@ def extract_text_from_docx(path: str) -> str:
         return f"Ошибка извлечения текста для DOCX: {exc}"
 
 
-def extract_text_from_excel(path: str) -> str:
-    """Собираем значения со всех листов Excel."""
+# Метка обрезанного листа (SHEET_MAX_ROWS / SHEET_MAX_CHARS)
+SHEET_TRUNCATED = "[... лист обрезан ...]"
+
+
+def _append_sheet_rows(parts: list[str], rows: Iterable[list[str]], sep: str) -> None:
+    """
+    Добавляет непустые строки листа, пока не исчерпаны SHEET_MAX_ROWS
+    (строк листа, включая пустые) и SHEET_MAX_CHARS (символов текста).
+    """
+    from config.settings import settings
+    max_rows, max_chars = settings.sheet_max_rows, settings.sheet_max_chars
+    chars = 0
+    for index, values in enumerate(rows):
+        if max_rows and index >= max_rows:
+            parts.append(SHEET_TRUNCATED)
+            return
+        if not values:
+            continue
+        line = sep.join(values)
+        if max_chars and chars + len(line) > max_chars:
+            parts.append(SHEET_TRUNCATED)
+            return
+        parts.append(line)
+        chars += len(line) + 1
+
+
+def _open_workbook(path: Source | zipfile.ZipFile):
+    """Книга openpyxl для потокового чтения (read_only, только значения)."""
+    import openpyxl
+
+    if not isinstance(path, zipfile.ZipFile):
+        return openpyxl.load_workbook(_rewind(path), read_only=True, data_only=True)
+
+    from openpyxl.reader.excel import ExcelReader
+
+    class _OpenedArchiveReader(ExcelReader):
+        """ExcelReader для уже открытого архива: сам он открывает ZipFile заново."""
+
+        def __init__(self, archive: zipfile.ZipFile):
+            # Те же поля, что заполняет ExcelReader.__init__ (openpyxl 3.1)
+            self.archive = archive
+            self.valid_files = archive.namelist()
+            self.read_only = True
+            self.keep_vba = False
+            self.data_only = True
+            self.keep_links = True
+            self.rich_text = False
+            self.shared_strings = []
+
+    reader = _OpenedArchiveReader(path)
+    reader.read()
+    return reader.wb
+
+
+def extract_text_from_excel(path: Source | zipfile.ZipFile) -> str:
+    """
+    Собираем значения со всех листов Excel (файл, поток или открытый ZipFile).
+
+    Книга читается потоково (read_only): строки разбираются по одной,
+    объектная модель книги в памяти не строится.
+    """
+    from config.settings import settings
+    max_rows, max_cols = settings.sheet_max_rows, settings.sheet_max_cols
     try:
-        wb = openpyxl.load_workbook(path, data_only=True)
-        parts: list[str] = []
-        for sheet in wb.worksheets:
-            parts.append(f"=== Лист {sheet.title} ===")
-            for row in sheet.iter_rows(values_only=True):
-                values = [str(v) for v in row if v is not None]
-                if values:
-                    parts.append(" ".join(values))
+        wb = _open_workbook(path)
+        try:
+            parts: list[str] = []
+            for sheet in wb.worksheets:
+                parts.append(f"=== Лист {sheet.title} ===")
+                # Размер из заголовка листа часто неверен; без него строки
+                # не дополняются пустыми ячейками до ширины листа
+                sheet.reset_dimensions()
+                rows = sheet.iter_rows(
+                    values_only=True,
+                    max_row=max_rows + 1 if max_rows else None,
+                    max_col=max_cols or None,
+                )
+                _append_sheet_rows(parts, ([str(v) for v in row if v is not None] for row in rows), " ")
+        finally:
+            wb.close()
         result = "\n".join(parts)
         return result if result.strip() else "Не удалось извлечь содержимое из Excel"
     except Exception as exc:
         return f"Ошибка извлечения текста для Excel: {exc}"
 
 
-def _extract_doc_via_word(path: str) -> str | None:
+def _extract_doc_via_word(path: Source) -> str | None:
     """Пробуем конвертировать DOC -> DOCX с помощью установленного MS Word."""
     try:
         import win32com.client as win32  # type: ignore
@@ -100,6 +557,11 @@ def _extract_doc_via_word(path: str) -> str | None:
     word = None
     doc = None
     try:
+        # Word открывает только файлы: документ из памяти кладём во временный
+        if not _is_path(path):
+            tmp_doc = Path(tmp_dir) / "source.doc"
+            tmp_doc.write_bytes(_read_bytes(path))
+            path = str(tmp_doc)
         tmp_docx = Path(tmp_dir) / "converted.docx"
         word = win32.DispatchEx("Word.Application")
         word.Visible = False
@@ -126,64 +588,262 @@ def _extract_doc_via_word(path: str) -> str | None:
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
-def extract_text_from_xls(path: str) -> str:
-    """Читаем старый бинарный Excel (.xls)."""
+def _xls_row_values(sheet, rx: int, max_cols: int) -> list[str]:
+    """Значения строки XLS без пустых ячеек (строки неравной длины — ragged_rows)."""
+    end = sheet.row_len(rx)
+    if max_cols:
+        end = min(end, max_cols)
+    values = []
+    for value in sheet.row_values(rx, 0, end):
+        if value in ("", None):
+            continue
+        if isinstance(value, float) and value.is_integer():
+            values.append(str(int(value)))
+        else:
+            values.append(str(value))
+    return values
+
+
+def extract_text_from_xls(path: Source | olefile.OleFileIO) -> str:
+    """
+    Читаем старый бинарный Excel (.xls) построчно, лист за листом.
+
+    path — файл, поток или OLE-файл, уже открытый при определении типа:
+    из него xlrd получает сразу поток книги, без повторного разбора OLE.
+    """
+    from config.settings import settings
+    max_rows, max_cols = settings.sheet_max_rows, settings.sheet_max_cols
     try:
-        wb = xlrd.open_workbook(path, on_demand=True)
-        parts: list[str] = []
-        for sheet in wb.sheets():
-            parts.append(f"=== Лист {sheet.name} ===")
-            for rx in range(sheet.nrows):
-                values = []
-                for cx in range(sheet.ncols):
-                    value = sheet.cell_value(rx, cx)
-                    if value in ("", None):
-                        continue
-                    if isinstance(value, float) and value.is_integer():
-                        values.append(str(int(value)))
-                    else:
-                        values.append(str(value))
-                if values:
-                    parts.append("\t".join(values))
+        import xlrd
+
+        if _is_ole_file(path):
+            stream_name = "Workbook" if path.exists("Workbook") else "Book"
+            with path.openstream(stream_name) as stream:
+                workbook_stream = stream.read()
+            wb = xlrd.open_workbook(file_contents=workbook_stream, on_demand=True, ragged_rows=True)
+        elif _is_path(path):
+            wb = xlrd.open_workbook(path, on_demand=True, ragged_rows=True)
+        else:
+            wb = xlrd.open_workbook(file_contents=_read_bytes(path), on_demand=True, ragged_rows=True)
+        try:
+            parts: list[str] = []
+            for index in range(wb.nsheets):
+                sheet = wb.sheet_by_index(index)
+                parts.append(f"=== Лист {sheet.name} ===")
+                nrows = min(sheet.nrows, max_rows + 1) if max_rows else sheet.nrows
+                rows = (_xls_row_values(sheet, rx, max_cols) for rx in range(nrows))
+                _append_sheet_rows(parts, rows, "\t")
+                wb.unload_sheet(index)
+        finally:
+            wb.release_resources()
         result = "\n".join(parts)
         return result if result.strip() else "Не удалось извлечь содержимое из XLS"
     except Exception as exc:
         return f"Ошибка извлечения текста для XLS: {exc}"
 
 
-def _is_ole_excel(path: str) -> bool:
+def _open_ole(stream: BinaryIO) -> olefile.OleFileIO | None:
+    """Открывает OLE-файл; None — olefile не установлен или файл повреждён."""
+    try:
+        import olefile
+
+        return olefile.OleFileIO(_rewind(stream))
+    except Exception:
+        return None
+
+
+def _is_ole_excel(ole: olefile.OleFileIO) -> bool:
     """Проверяем, похож ли OLE-файл на Excel-таблицу."""
     try:
-        if not olefile.isOleFile(path):
-            return False
-        with olefile.OleFileIO(path) as ole:
-            entries = {" / ".join(entry) for entry in ole.listdir()}
-        return any("Workbook" in entry or "Book" in entry for entry in entries)
+        entries = {" / ".join(entry) for entry in ole.listdir()}
     except Exception:
         return False
+    return any("Workbook" in entry or "Book" in entry for entry in entries)
+
 
+# Файлы внутри архива, из которых извлекается текст; остальные (сканы,
+# чертежи, сметные программы) не распаковываются
+ZIP_MEMBER_EXTENSIONS = (".pdf", ".docx", ".doc", ".xlsx", ".xlsm", ".xls", ".zip")
 
-def extract_text_from_zip(path: str) -> str:
-    """Распаковываем архив и извлекаем текст из каждого файла рекурсивно."""
-    temp_dir = None
+
+def _zip_member_name(info: zipfile.ZipInfo) -> str:
+    """Имя файла в архиве: архиваторы Windows пишут его в cp866 без флага UTF-8."""
+    name = info.filename
+    if not info.flag_bits & 0x800:
+        try:
+            name = name.encode("cp437").decode("cp866")
+        except UnicodeError:
+            pass
+    return name
+
+
+def iter_zip_members(
+    path: Source | zipfile.ZipFile,
+    max_depth: int | None = None,
+    max_total_bytes: int | None = None,
+    max_member_bytes: int | None = None,
+    max_ratio: int | None = None,
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Файлы архива в памяти: (путь в архиве, содержимое).
+
+    path — файл, поток или уже открытый ZipFile. Архив не распаковывается на диск: каждый файл читается через
+    ZipFile.open. Файлы отбираются по имени и размеру из заголовка до
+    распаковки — с неподдерживаемым расширением, больше max_member_bytes
+    или сжатые сильнее max_ratio раз (zip-бомба) пропускаются. Вложенные
+    архивы раскрываются до глубины max_depth; после max_total_bytes
+    распакованных байт (вместе с вложенными архивами) чтение прекращается.
+    Ограничения по умолчанию — из ZIP_MAX_*; 0 — без ограничения
+    (для max_depth — вложенные архивы не раскрываются).
+    """
+    from config.settings import settings
+
+    mb = 1024 * 1024
+    max_depth = settings.zip_max_depth if max_depth is None else max_depth
+    if max_total_bytes is None:
+        max_total_bytes = settings.zip_max_total_mb * mb
+    if max_member_bytes is None:
+        max_member_bytes = settings.zip_max_member_mb * mb
+    max_ratio = settings.zip_max_ratio if max_ratio is None else max_ratio
+    used = 0
+
+    def walk(source: Source | zipfile.ZipFile, prefix: str, depth: int) -> Iterator[tuple[str, bytes]]:
+        nonlocal used
+        if isinstance(source, zipfile.ZipFile):
+            opened = contextlib.nullcontext(source)
+        else:
+            opened = zipfile.ZipFile(_rewind(source), "r")
+        with opened as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                name = _zip_member_name(info)
+                ext = os.path.splitext(name)[1].lower()
+                if ext not in ZIP_MEMBER_EXTENSIONS:
+                    continue
+                if ext == ".zip" and depth >= max_depth:
+                    continue
+                size = info.file_size
+                if max_member_bytes and size > max_member_bytes:
+                    continue
+                if max_ratio and size > max_ratio * max(info.compress_size, 1):
+                    continue
+                if max_total_bytes and used + size > max_total_bytes:
+                    return
+                try:
+                    with zf.open(info) as member:
+                        # Размер в заголовке может не совпадать с фактическим
+                        data = member.read(size + 1)
+                except (RuntimeError, NotImplementedError, zipfile.BadZipFile, OSError):
+                    # Зашифрованный файл, неизвестный метод сжатия, битые данные
+                    continue
+                if len(data) > size:
+                    continue
+                used += len(data)
+
+                member_path = prefix + name
+                if ext == ".zip":
+                    nested = io.BytesIO(data)
+                    if zipfile.is_zipfile(nested):
+                        yield from walk(nested, member_path + "/", depth + 1)
+                        continue
+                yield member_path, data
+
+    yield from walk(path, "", 0)
+
+
+def extract_text_from_zip(
+    path: Source | zipfile.ZipFile,
+    submit: Callable[[bytes, str], Future] | None = None,
+    window: int | None = None,
+) -> str:
+    """
+    Извлекаем текст из каждого файла архива, не распаковывая его на диск.
+
+    submit — отправка файла на извлечение в пул процессов
+    (TextExtractionService.submit): файлы архива разбираются параллельно.
+    Без него — последовательно в текущем процессе.
+    window — сколько файлов одновременно отдано в submit (по умолчанию —
+    число ядер): следующий файл распаковывается, когда готов самый
+    старый, и в памяти не лежит весь архив.
+    """
     try:
+        members = iter_zip_members(path)
+        if submit is None:
+            results = (
+                (member_path, extract_text_from_any_file(io.BytesIO(data), member_path))
+                for member_path, data in members
+            )
+        else:
+            results = _submit_windowed(members, submit, window or os.cpu_count() or 1)
+
         text_chunks: list[str] = []
-        temp_dir = tempfile.mkdtemp(prefix="zip-extract-")
-        with zipfile.ZipFile(path, "r") as zf:
-            zf.extractall(temp_dir)
-
-        for root, _dirs, files in os.walk(temp_dir):
-            for fname in files:
-                inner_path = os.path.join(root, fname)
-                text = extract_text_from_any_file(inner_path)
-                if text and not text.startswith("Ошибка"):
-                    text_chunks.append(f"=== Файл внутри архива: {fname} ===\n{text}")
+        for member_path, text in results:
+            if text and not text.startswith("Ошибка"):
+                fname = os.path.basename(member_path)
+                text_chunks.append(f"=== Файл внутри архива: {fname} ===\n{text}")
         return "\n\n".join(text_chunks)
     except Exception as exc:
         return f"Ошибка извлечения текста для ZIP: {exc}"
-    finally:
-        if temp_dir and os.path.isdir(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _submit_windowed(
+    members: Iterator[tuple[str, bytes]],
+    submit: Callable[[bytes, str], Future],
+    window: int,
+) -> Iterator[tuple[str, str | None]]:
+    """Отдаёт файлы в submit не больше window за раз; результаты — в порядке архива."""
+    pending: deque[tuple[str, Future]] = deque()
+    for member_path, data in members:
+        pending.append((member_path, submit(data, member_path)))
+        # Содержимое нужно только пулу: не держим его, пока ждём результат
+        del data
+        if len(pending) >= window:
+            done_path, future = pending.popleft()
+            yield done_path, _future_text(future)
+    while pending:
+        done_path, future = pending.popleft()
+        yield done_path, _future_text(future)
+
+
+def _future_text(future: Future) -> str | None:
+    """Текст из Future пула; таймаут или падение процесса — пропуск файла."""
+    try:
+        return future.result()
+    except Exception:
+        return None
+
+
+def is_zip_archive(path: Source) -> bool:
+    """Файл — ZIP-архив, а не документ Office в ZIP-контейнере."""
+    return detect_type_by_signature(path) == "zip"
+
+
+def open_zip_archive(path: Source, name: str | None = None) -> zipfile.ZipFile | None:
+    """
+    Открытый ZipFile, если файл — ZIP-архив (не документ Office), иначе None.
+
+    Для файлов без сигнатуры ZIP читается только заголовок, а документы
+    Office с расширением .docx/.xlsx не открываются вовсе — их
+    разбирает извлечение. Архив закрывает вызывающий.
+    """
+    try:
+        with _open_source(path) as stream:
+            header = _rewind(stream).read(len(ZIP_SIGNATURES[0]))
+    except OSError:
+        return None
+    if not header.startswith(ZIP_SIGNATURES):
+        return None
+    if detect_type_by_extension(_source_name(path, name)) in ("docx", "xlsx"):
+        return None
+    try:
+        archive = zipfile.ZipFile(_rewind(path), "r")
+    except Exception:
+        return None
+    if _zip_container_type(archive) != "zip":
+        archive.close()
+        return None
+    return archive
 
 
 def detect_type_by_extension(path: str) -> str:
@@ -204,53 +864,158 @@ def detect_type_by_extension(path: str) -> str:
     return "unknown"
 
 
-def detect_type_by_signature(path: str) -> str:
-    """Уточняем тип по сигнатурам."""
-    try:
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+ZIP_SIGNATURES = (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08")
+
+
+@contextlib.contextmanager
+def _open_source(path: Source) -> Iterator[BinaryIO]:
+    """Открывает файл один раз на всё извлечение; поток отдаётся как есть."""
+    if _is_path(path):
         with open(path, "rb") as f:
-            header = f.read(2048)
+            yield f
+    else:
+        yield path
+
+
+@dataclass
+class _Sniffed:
+    """Тип файла и то, что уже открыто при его определении."""
+    ftype: str
+    # Открытый контейнер: ZipFile (zip, docx, xlsx) или OleFileIO (doc, xls)
+    opened: zipfile.ZipFile | olefile.OleFileIO | None = None
+
+    def close(self):
+        if self.opened is not None:
+            self.opened.close()
+            self.opened = None
+
+
+def _zip_container_type(archive: zipfile.ZipFile) -> str:
+    """docx, xlsx или zip — по именам файлов в ZIP-контейнере."""
+    names = archive.namelist()
+    if any(name.startswith("word/") for name in names):
+        return "docx"
+    if any(name.startswith("xl/") for name in names):
+        return "xlsx"
+    return "zip"
+
+
+def _sniff(stream: BinaryIO) -> _Sniffed:
+    """
+    Определяет тип по сигнатуре за один проход по открытому потоку:
+    заголовок читается один раз, ZIP- или OLE-контейнер открывается
+    один раз, и открытый контейнер передаётся дальше в извлечение.
+    """
+    try:
+        header = _rewind(stream).read(2048)
     except Exception:
-        return "unknown"
+        return _Sniffed("unknown")
 
     if header.startswith(b"%PDF"):
-        return "pdf"
-    if header.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
-        if _is_ole_excel(path):
-            return "xls"
-        return "doc"
-    if header.startswith((b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08")):
+        return _Sniffed("pdf")
+    if header.startswith(OLE_SIGNATURE):
+        ole = _open_ole(stream)
+        if ole is None:
+            return _Sniffed("doc")
+        return _Sniffed("xls" if _is_ole_excel(ole) else "doc", ole)
+    if header.startswith(ZIP_SIGNATURES):
         try:
-            with zipfile.ZipFile(path, "r") as zf:
-                names = zf.namelist()
+            archive = zipfile.ZipFile(_rewind(stream), "r")
         except Exception:
-            return "zip"
-        if any(name.startswith("word/") or name.endswith(".docx") for name in names):
-            return "docx"
-        if any(name.startswith("xl/") or name.endswith(".xlsx") for name in names):
-            return "xlsx"
-        if any(name.endswith(".pdf") for name in names):
-            return "pdf"
-        return "zip"
-    return "unknown"
+            return _Sniffed("zip")
+        return _Sniffed(_zip_container_type(archive), archive)
+    return _Sniffed("unknown")
+
+
+def detect_type_by_signature(path: Source) -> str:
+    """Уточняем тип по сигнатурам."""
+    try:
+        with _open_source(path) as stream:
+            sniffed = _sniff(stream)
+            sniffed.close()
+    except OSError:
+        return "unknown"
+    return sniffed.ftype
+
+
+def extract_text_from_any_file(
+    path: Source,
+    name: str | None = None,
+    use_cache: bool = True,
+) -> str:
+    """
+    Пытаемся извлечь текст, исходя из определения типа.
+
+    name — имя документа, если path — поток (для расширения и сообщений).
+    Текст уже встречавшегося файла (по SHA-256) берётся из кэша текста,
+    если он включён (TEXT_CACHE_ENABLED); use_cache=False — не проверять
+    кэш (вызывающий проверил его сам).
+    """
+    cache = None
+    if use_cache:
+        from services.text_cache import get_text_cache
+        cache = get_text_cache()
+    name = _source_name(path, name)
+
+    # Файл открывается один раз: для хэша, определения типа и извлечения
+    with _open_source(path) as stream:
+        if cache is None:
+            return _extract_uncached(stream, name)
+
+        sha256 = _sha256(stream)
+        text = cache.get(sha256)
+        if text is None:
+            text = _extract_uncached(stream, name)
+            if is_extracted_text(text):
+                cache.put(sha256, text)
+        return text
 
 
-def extract_text_from_any_file(path: str) -> str:
-    """Пытаемся извлечь текст, исходя из определения типа."""
-    ftype = detect_type_by_extension(path)
-    signature_type = detect_type_by_signature(path)
-    if signature_type != "unknown":
-        ftype = signature_type
-
-    if ftype == "pdf":
-        return extract_text_from_pdf(path)
-    if ftype == "docx":
-        return extract_text_from_docx(path)
-    if ftype == "xlsx":
-        return extract_text_from_excel(path)
-    if ftype == "xls":
-        return extract_text_from_xls(path)
-    if ftype == "doc":
-        return extract_text_from_doc(path)
-    if ftype == "zip":
-        return extract_text_from_zip(path)
-    return f"Неизвестный тип файла: {os.path.basename(path)}"
+def is_extracted_text(text: str | None) -> bool:
+    """Текст извлечён, а не сообщение об ошибке или неизвестном типе."""
+    return bool(text) and not text.startswith(("Ошибка", "Неизвестный"))
+
+
+# Извлечение по типу файла. Библиотеки форматов (pdfplumber, python-docx,
+# openpyxl, xlrd, olefile) импортируются внутри функций при первом
+# вызове: импорт text_extraction не тянет их за собой
+EXTRACTORS: dict[str, Callable[[Source], str]] = {
+    "pdf": extract_text_from_pdf,
+    "docx": extract_text_from_docx,
+    "xlsx": extract_text_from_excel,
+    "xls": extract_text_from_xls,
+    "doc": extract_text_from_doc,
+    "zip": extract_text_from_zip,
+}
+
+
+def register_extractor(ftype: str, extractor: Callable[[Source], str]) -> None:
+    """
+    Регистрирует (или заменяет) извлечение для типа файла.
+
+    Извлечение получает то, что открыто при определении типа: для zip,
+    docx и xlsx — zipfile.ZipFile, для doc и xls — olefile.OleFileIO
+    (если olefile установлен), для остальных типов — файл или поток.
+    """
+    EXTRACTORS[ftype] = extractor
+
+
+def _extract_uncached(path: Source, name: str | None = None) -> str:
+    name = _source_name(path, name)
+    with _open_source(path) as stream:
+        sniffed = _sniff(stream)
+        ftype = sniffed.ftype
+        if ftype == "unknown":
+            ftype = detect_type_by_extension(name)
+
+        if sniffed.opened is not None:
+            # Контейнер уже открыт при определении типа — передаём его дальше
+            try:
+                return EXTRACTORS[ftype](sniffed.opened)
+            finally:
+                sniffed.close()
+        extractor = EXTRACTORS.get(ftype)
+        if extractor is not None:
+            return extractor(stream)
+    return f"Неизвестный тип файла: {os.path.basename(name)}"
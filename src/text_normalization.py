@@ -0,0 +1,260 @@
+"""Нормализация извлечённого текста перед сохранением в combined_text.
+
+PDF закупок повторяют на каждой странице колонтитулы, номера страниц и
+штамп электронной подписи. Всё это попадает в БД и в промпт Stage 2.
+Здесь текст документа (страницы PDF разделены символом \\f, см.
+text_extraction.PAGE_BREAK) очищается:
+
+- строки в начале и конце страниц, повторяющиеся на многих страницах,
+  остаются только при первом появлении;
+- удаляются номера страниц и типовые строки ЕИС (штамп электронной подписи);
+- пробелы схлопываются, подряд идущие пустые строки — до одной.
+
+Строки-заголовки «=== ... ===» не трогаются.
+
+Печатная форма и вложения закупки часто содержат одни и те же абзацы
+дословно. ParagraphDeduplicator убирает из очередного документа абзацы
+(строки), уже встречавшиеся в предыдущих документах той же закупки.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from text_extraction import PAGE_BREAK
+
+# Сколько строк сверху и снизу страницы проверяются как колонтитулы
+EDGE_LINES = 3
+# Повторы ищутся, если страниц не меньше
+MIN_PAGES = 3
+# Колонтитул — строка, которая есть хотя бы на такой доле страниц
+REPEAT_SHARE = 0.5
+# Длиннее — уже не колонтитул
+MAX_EDGE_LINE = 200
+
+# Номер страницы — только у края страницы многостраничного документа,
+# иначе под шаблон попадут строки таблиц из одного числа
+PAGE_NUMBER_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"(стр\.?|страница)\s*\d+(\s*(из|/)\s*\d+)?",
+        r"[-–—]?\s*\d{1,4}\s*[-–—]?",
+        r"\d+\s*(из|/)\s*\d+",
+    )
+]
+
+# Типовые строки ЕИС без содержания (штамп электронной подписи)
+BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"документ подписан (усиленной )?(квалифицированной )?электронной подписью",
+        r"сведения о сертификате эп",
+        r"сертификат:?\s*[0-9a-f ]{16,}",
+        r"действителен:?\s*с\s+\d{2}\.\d{2}\.\d{4}\s+по\s+\d{2}\.\d{2}\.\d{4}",
+    )
+]
+
+# Поля штампа, которые сами по себе — обычный текст («Владелец: ...» есть
+# и в описании квартиры): удаляются, только если соседняя строка — строка штампа
+STAMP_FIELD_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"владелец:\s.*",
+    )
+]
+
+_SPACES = re.compile(r"[ \u00a0\u2009\u202f]+")
+_TAB_SPACES = re.compile(r" *\t *")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+@dataclass
+class NormalizationStats:
+    """Сколько текста убрала нормализация."""
+    bytes_before: int = 0
+    bytes_after: int = 0
+    repeated_lines: int = 0
+    boilerplate_lines: int = 0
+    duplicate_lines: int = 0
+    documents: int = 0
+
+    def add(self, other: "NormalizationStats"):
+        self.bytes_before += other.bytes_before
+        self.bytes_after += other.bytes_after
+        self.repeated_lines += other.repeated_lines
+        self.boilerplate_lines += other.boilerplate_lines
+        self.duplicate_lines += other.duplicate_lines
+        self.documents += other.documents
+
+    def to_dict(self) -> dict:
+        return {
+            "documents": self.documents,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "repeated_lines": self.repeated_lines,
+            "boilerplate_lines": self.boilerplate_lines,
+            "duplicate_lines": self.duplicate_lines,
+        }
+
+
+def _line_key(line: str) -> str:
+    """
+    Ключ для сравнения колонтитулов. Цифры не маскируются: иначе строки
+    таблиц вида «Квартира 1», «Квартира 2» у края страниц считались бы
+    повтором; номера страниц убираются шаблонами PAGE_NUMBER_PATTERNS.
+    """
+    return line.lower()
+
+
+def _is_marker(line: str) -> bool:
+    return line.startswith("===")
+
+
+def _matches(patterns: list[re.Pattern], line: str) -> bool:
+    return any(pattern.fullmatch(line) for pattern in patterns)
+
+
+def _edge_indexes(lines: list[str]) -> list[int]:
+    """Номера первых и последних EDGE_LINES непустых строк страницы."""
+    filled = [index for index, line in enumerate(lines) if line]
+    if len(filled) <= 2 * EDGE_LINES:
+        return filled
+    return filled[:EDGE_LINES] + filled[-EDGE_LINES:]
+
+
+def _stamp_indexes(lines: list[str]) -> set[int]:
+    """Номера строк штампа ЭП: типовые строки и поля штампа рядом с ними."""
+    filled = [index for index, line in enumerate(lines) if line and not _is_marker(line)]
+    stamp = {index for index in filled if _matches(BOILERPLATE_PATTERNS, lines[index])}
+    fields = set()
+    for position, index in enumerate(filled):
+        if index in stamp or not _matches(STAMP_FIELD_PATTERNS, lines[index]):
+            continue
+        neighbours = filled[max(position - 1, 0):position] + filled[position + 1:position + 2]
+        if any(neighbour in stamp for neighbour in neighbours):
+            fields.add(index)
+    return stamp | fields
+
+
+def join_pages(text: str) -> str:
+    """
+    Заменяет разделители страниц PDF переводом строки — когда
+    нормализация выключена, \f не должен попасть в combined_text и промпт.
+    """
+    return text.replace(PAGE_BREAK, "\n") if text else text
+
+
+def _repeated_keys(pages: list[list[str]]) -> set[str]:
+    """Ключи строк, встречающихся у края страницы на многих страницах."""
+    if len(pages) < MIN_PAGES:
+        return set()
+    counts: Counter = Counter()
+    for lines in pages:
+        counts.update({
+            _line_key(lines[index])
+            for index in _edge_indexes(lines)
+            if len(lines[index]) <= MAX_EDGE_LINE and not _is_marker(lines[index])
+        })
+    threshold = max(2, math.ceil(len(pages) * REPEAT_SHARE))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def normalize_text(text: str, stats: NormalizationStats | None = None) -> str:
+    """
+    Очищает текст документа (см. описание модуля).
+
+    stats — куда добавить объём до и после и число удалённых строк.
+    """
+    if not text:
+        return text
+    pages = [
+        [_TAB_SPACES.sub("\t", _SPACES.sub(" ", line)).strip() for line in page.split("\n")]
+        for page in text.split(PAGE_BREAK)
+    ]
+    repeated = _repeated_keys(pages)
+    seen: set[str] = set()
+    removed_repeated = removed_boilerplate = 0
+
+    kept: list[str] = []
+    for lines in pages:
+        edges = set(_edge_indexes(lines)) if len(pages) > 1 else set()
+        stamp = _stamp_indexes(lines)
+        for index, line in enumerate(lines):
+            if line and not _is_marker(line):
+                if index in stamp or (
+                    index in edges and _matches(PAGE_NUMBER_PATTERNS, line)
+                ):
+                    removed_boilerplate += 1
+                    continue
+                if index in edges:
+                    key = _line_key(line)
+                    if key in repeated:
+                        if key in seen:
+                            removed_repeated += 1
+                            continue
+                        seen.add(key)
+            kept.append(line)
+
+    result = _BLANK_LINES.sub("\n\n", "\n".join(kept)).strip()
+    if stats is not None:
+        stats.add(NormalizationStats(
+            bytes_before=len(text.encode("utf-8")),
+            bytes_after=len(result.encode("utf-8")),
+            repeated_lines=removed_repeated,
+            boilerplate_lines=removed_boilerplate,
+            documents=1,
+        ))
+    return result
+
+
+class ParagraphDeduplicator:
+    """
+    Убирает абзацы, уже встречавшиеся в предыдущих документах закупки.
+
+    Абзац — строка текста (в печатной форме и DOCX это абзац, в PDF —
+    строка страницы). Сравниваются хэши строк без учёта регистра и
+    пробелов; строки короче min_chars (номера, «Итого», ячейки таблиц)
+    не сравниваются. Повторы внутри одного документа остаются: в
+    таблицах они могут означать количество.
+
+    Пример:
+        dedup = ParagraphDeduplicator()
+        texts = [dedup.dedupe(text) for text in documents]  # печатная форма — первой
+    """
+
+    def __init__(self, min_chars: int = 40):
+        self.min_chars = min_chars
+        self._seen: set[bytes] = set()
+
+    def _key(self, line: str) -> bytes:
+        normalized = " ".join(line.lower().split())
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+
+    def dedupe(self, text: str, stats: NormalizationStats | None = None) -> str:
+        """Текст документа без абзацев из предыдущих документов."""
+        if not text:
+            return text
+        kept: list[str] = []
+        added: set[bytes] = set()
+        removed = 0
+        for line in text.split("\n"):
+            if len(line) >= self.min_chars and not _is_marker(line):
+                key = self._key(line)
+                if key in self._seen:
+                    removed += 1
+                    continue
+                added.add(key)
+            kept.append(line)
+        self._seen |= added
+
+        if not removed:
+            return text
+        result = _BLANK_LINES.sub("\n\n", "\n".join(kept)).strip()
+        if stats is not None:
+            stats.bytes_after -= len(text.encode("utf-8")) - len(result.encode("utf-8"))
+            stats.duplicate_lines += removed
+        return result
@@ -0,0 +1,263 @@
+"""
+Ограничение частоты исходящих запросов: token bucket на хост,
+экспоненциальный backoff с jitter и поддержка Retry-After.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from config.settings import settings
+from utils.logger import get_logger
+
+
+# Ответы, после которых запрос имеет смысл повторить
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Ответы, означающие, что удалённая сторона просит снизить частоту
+THROTTLE_STATUSES = (429, 503)
+
+
+def backoff_delay(attempt: int, base_s: float = 1.0, max_s: float = 60.0) -> float:
+    """
+    Задержка перед повтором: экспоненциальный рост с полным jitter.
+
+    Args:
+        attempt: Номер неудачной попытки (с 0)
+        base_s: Задержка для первой попытки
+        max_s: Верхняя граница задержки
+    """
+    return random.uniform(0, min(max_s, base_s * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разбирает заголовок Retry-After (секунды или HTTP-дата) в секунды."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Потокобезопасный token bucket с изменяемой скоростью."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            rate: Токенов в секунду
+            capacity: Размер всплеска
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def block_for(self, seconds: float):
+        """Запрещает выдачу токенов на указанное время (Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def acquire(self):
+        """Ждёт и забирает один токен."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class AdaptiveRateLimiter:
+    """
+    Ограничитель частоты запросов с отдельным token bucket на каждый хост.
+
+    Скорость подстраивается по схеме AIMD: каждый успешный ответ
+    добавляет increase_step к скорости (до max_rate), каждый отказ
+    (429/503, сетевая ошибка) уменьшает её в decrease_factor раз
+    (до min_rate). Так частота держится около предела, который
+    допускает удалённая сторона.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        max_rate: float,
+        min_rate: float = 0.1,
+        burst: float = 1.0,
+        increase_step: float = 0.05,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.name = name
+        self.initial_rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.logger = get_logger("RateLimiter")
+
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.initial_rate, self.burst, self._clock, self._sleep)
+                self._buckets[host] = bucket
+                self.stats[host] = {"ok": 0, "throttled": 0, "errors": 0}
+            return bucket
+
+    def rate(self, host: str) -> float:
+        """Текущая скорость для хоста (запросов в секунду)."""
+        return self._bucket(host).rate
+
+    def acquire(self, host: str):
+        """Ждёт разрешения на запрос к хосту."""
+        self._bucket(host).acquire()
+
+    def on_success(self, host: str):
+        """Успешный ответ: плавно повышаем скорость."""
+        bucket = self._bucket(host)
+        with self._lock:
+            self.stats[host]["ok"] += 1
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase_step)
+
+    def on_failure(self, host: str, throttled: bool = False, retry_after: float = None):
+        """
+        Отказ: снижаем скорость, при Retry-After блокируем хост на это время.
+
+        Args:
+            host: Хост
+            throttled: Ответ 429/503 (иначе — сетевая ошибка или 5xx)
+            retry_after: Значение Retry-After в секундах
+        """
+        bucket = self._bucket(host)
+        with self._lock:
+            self.stats[host]["throttled" if throttled else "errors"] += 1
+            old_rate = bucket.rate
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease_factor)
+        if retry_after:
+            bucket.block_for(retry_after)
+        if throttled:
+            self.logger.info(
+                f"[{self.name}] {host}: снижение частоты {old_rate:.2f} -> {bucket.rate:.2f} запр/с"
+                + (f", Retry-After {retry_after:.0f} с" if retry_after else "")
+            )
+
+    def call(
+        self,
+        host: str,
+        fn: Callable,
+        attempts: int = None,
+        base_delay_s: float = None,
+        max_delay_s: float = None
+    ):
+        """
+        Выполняет запрос fn() с ожиданием токена и повторами.
+
+        fn возвращает ответ с status_code и headers. Ответы из
+        RETRY_STATUSES и исключения повторяются с backoff (или по
+        Retry-After). Возвращается последний ответ; исключение последней
+        попытки пробрасывается.
+        """
+        attempts = attempts or settings.http_max_retries
+        base_delay_s = settings.http_backoff_base_s if base_delay_s is None else base_delay_s
+        max_delay_s = settings.http_backoff_max_s if max_delay_s is None else max_delay_s
+
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            self.acquire(host)
+            try:
+                resp = fn()
+            except Exception as e:
+                self.on_failure(host)
+                if last:
+                    raise
+                delay = backoff_delay(attempt, base_delay_s, max_delay_s)
+                self.logger.warning(f"Попытка {attempt+1}/{attempts} ({host}): {e}")
+                self._sleep(delay)
+                continue
+
+            if resp.status_code not in RETRY_STATUSES:
+                self.on_success(host)
+                return resp
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            self.on_failure(host, throttled=resp.status_code in THROTTLE_STATUSES, retry_after=retry_after)
+            if last:
+                return resp
+            close = getattr(resp, "close", None)
+            if close:
+                close()
+            self.logger.warning(f"Попытка {attempt+1}/{attempts} ({host}): HTTP {resp.status_code}")
+            # Retry-After выдерживается через блокировку bucket в acquire()
+            if not retry_after:
+                self._sleep(backoff_delay(attempt, base_delay_s, max_delay_s))
+
+
+# Общие ограничители по внешним сервисам
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter_config(name: str) -> dict:
+    """Начальная и максимальная скорость для сервиса из settings."""
+    if name == "openrouter":
+        return {"rate": settings.openrouter_rate_per_s, "max_rate": settings.openrouter_rate_max_per_s}
+    if name == "2gis":
+        rate = 1.0 / settings.stage4_rate_limit_s if settings.stage4_rate_limit_s > 0 else 1.0
+        return {"rate": rate, "max_rate": rate, "min_rate": rate / 10}
+    return {"rate": settings.eis_rate_per_s, "max_rate": settings.eis_rate_max_per_s}
+
+
+def get_rate_limiter(name: str = "eis") -> AdaptiveRateLimiter:
+    """
+    Получает или создаёт общий ограничитель для сервиса.
+
+    Args:
+        name: "eis", "openrouter" или "2gis"
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(name, **_limiter_config(name))
+            _limiters[name] = limiter
+        return limiter
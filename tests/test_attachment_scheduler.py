@@ -0,0 +1,247 @@
+"""Тесты очерёдности и бюджета загрузки вложений (services.attachment_scheduler)."""
+import sys
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from services.attachment_scheduler import AttachmentBudget, AttachmentScheduler, rank_attachments
+
+DOCS = [
+    {"name": "Смета локальная.xlsx", "url": "https://eis/smeta"},
+    {"name": "Обоснование НМЦК.docx", "url": "https://eis/nmck"},
+    {"name": "Проект контракта.pdf", "url": "https://eis/contract-pdf"},
+    {"name": "Проект контракта.docx", "url": "https://eis/contract"},
+    {"name": "ТЗ.docx", "url": "https://eis/tz"},
+    {"name": "Описание объекта закупки.pdf", "url": "https://eis/ooz"},
+    {"name": "Приложение 5.rar", "url": "https://eis/other"},
+]
+
+
+def test_rank_puts_specification_and_contract_first():
+    names = [d["name"] for d in rank_attachments(DOCS)]
+    assert names == [
+        "ТЗ.docx",
+        "Описание объекта закупки.pdf",
+        "Проект контракта.docx",
+        "Проект контракта.pdf",
+        "Приложение 5.rar",
+        "Обоснование НМЦК.docx",
+        "Смета локальная.xlsx",
+    ]
+
+
+def test_budget_skips_rest_once_spent():
+    scheduler = AttachmentScheduler(DOCS, AttachmentBudget(max_chars=1000))
+    started = []
+    for doc in scheduler.ordered:
+        if scheduler.try_start(doc):
+            started.append(doc["name"])
+            scheduler.record(doc, size=10, chars=600)
+
+    assert started == ["ТЗ.docx", "Описание объекта закупки.pdf"]
+    assert len(scheduler.skipped) == len(DOCS) - 2
+    assert {reason for _, reason in scheduler.skipped} == {"chars"}
+
+
+def test_unlimited_budget_starts_everything():
+    scheduler = AttachmentScheduler(DOCS, AttachmentBudget())
+    assert all(scheduler.try_start(doc) for doc in scheduler.ordered)
+    assert scheduler.skipped == []
+
+
+def test_submit_keeps_window_and_lets_budget_stop_the_rest():
+    scheduler = AttachmentScheduler(DOCS, AttachmentBudget(max_chars=1000), window=2)
+    started = []
+    in_flight = []
+    collected = []
+
+    def start(doc):
+        started.append(doc["name"])
+        in_flight.append(len(started) - len(collected))
+        future = Future()
+        future.set_result(doc)
+        return future
+
+    for doc, future in scheduler.submit(start):
+        collected.append(future.result())
+        scheduler.record(doc, size=10, chars=600)
+
+    assert max(in_flight) == 2
+    assert started == ["ТЗ.docx", "Описание объекта закупки.pdf", "Проект контракта.docx"]
+    assert [doc["name"] for doc in collected] == started
+    assert len(scheduler.skipped) == len(DOCS) - 3
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.content = body
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_bytes(self, chunk_size: int):
+        yield self.content
+
+
+class FakeHttp:
+    def __init__(self, failing=()):
+        self.urls = []
+        self.failing = set(failing)
+
+    @contextmanager
+    def stream(self, url, headers=None, timeout=60, attempts=None):
+        self.urls.append(url)
+        if url in self.failing:
+            raise ConnectionError(f"обрыв {url}")
+        yield FakeResponse(b"%PDF-1.4 " + url.encode())
+
+
+def test_downloader_records_skipped_and_fetches_on_demand(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    from config.settings import settings
+    from repositories.skipped_attachment_repo import SkippedAttachmentRepository
+    from services.download_engine import DownloadEngine
+    from services.eis_downloader_service import EISDownloaderService
+
+    monkeypatch.setattr(settings, "http_cache_enabled", False)
+    monkeypatch.setattr(settings, "text_cache_enabled", False)
+    monkeypatch.setattr(settings, "eis_attachment_budget_mb", 0)
+    monkeypatch.setattr(settings, "eis_attachment_budget_s", 0)
+    monkeypatch.setattr(settings, "eis_attachment_budget_chars", 10)
+    monkeypatch.setattr(settings, "eis_attachment_window", 1)
+
+    repo = SkippedAttachmentRepository(str(tmp_path / "eis.db"))
+    repo.create_table()
+    http = FakeHttp()
+    service = EISDownloaderService(
+        zakupki_dir=str(tmp_path / "zakupki"),
+        engine=DownloadEngine(max_workers=1),
+        http_client=http,
+        skipped_repo=repo
+    )
+    monkeypatch.setattr(service, "_extract_text", lambda buffer, name, sha256: f"текст {name}")
+
+    docs = [dict(d) for d in DOCS[:4]]
+    text = service.fetch_combined_text("0373100000124000001", docs=docs, print_form_text="Извещение")
+
+    assert http.urls == ["https://eis/contract"]
+    assert "=== Документ: Проект контракта.docx ===" in text
+    skipped = repo.get_for_zakupka("0373100000124000001")
+    assert [a.name for a in skipped] == ["Проект контракта.pdf", "Обоснование НМЦК.docx", "Смета локальная.xlsx"]
+    assert skipped[0].reason == "chars"
+
+    extra, fetched_urls = service.fetch_skipped_attachments("0373100000124000001")
+    assert "=== Документ: Смета локальная.xlsx ===" in extra
+    assert len(http.urls) == 4
+    assert sorted(fetched_urls) == sorted(a.url for a in skipped)
+    # Записи удаляет вызывающий после сохранения текста
+    assert len(repo.get_for_zakupka("0373100000124000001")) == 3
+
+
+def test_budget_stops_downloads_despite_free_download_workers(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    from config.settings import settings
+    from services.download_engine import DownloadEngine
+    from services.eis_downloader_service import EISDownloaderService
+
+    monkeypatch.setattr(settings, "http_cache_enabled", False)
+    monkeypatch.setattr(settings, "text_cache_enabled", False)
+    monkeypatch.setattr(settings, "eis_attachment_budget_mb", 0)
+    monkeypatch.setattr(settings, "eis_attachment_budget_s", 0)
+    monkeypatch.setattr(settings, "eis_attachment_budget_chars", 10)
+    monkeypatch.setattr(settings, "eis_attachment_window", 2)
+
+    http = FakeHttp()
+    service = EISDownloaderService(
+        zakupki_dir=str(tmp_path / "zakupki"),
+        engine=DownloadEngine(max_workers=8),
+        http_client=http
+    )
+    service.extractor = None
+    monkeypatch.setattr(service, "_extract_text", lambda buffer, name, sha256: f"текст {name}")
+
+    docs = [{"name": f"Приложение {i}.pdf", "url": f"https://eis/{i}"} for i in range(12)]
+    service.fetch_combined_text("0373100000124000001", docs=docs, print_form_text="Извещение")
+
+    # Первое вложение исчерпывает бюджет; до его окончания может начаться
+    # только второе из окна, а не все вложения на свободные потоки
+    assert 1 <= len(http.urls) <= 2
+
+
+@pytest.fixture
+def skipped_pipeline(tmp_path, monkeypatch):
+    """Pipeline с закупкой, у которой два вложения пропущены из-за бюджета."""
+    pytest.importorskip("requests")
+    from config.settings import settings
+    from models.skipped_attachment import SkippedAttachment
+    from models.zakupka import Zakupka
+    from pipeline import Pipeline
+    from services.download_engine import DownloadEngine
+    from services.eis_downloader_service import EISDownloaderService
+
+    monkeypatch.setattr(settings, "http_cache_enabled", False)
+    monkeypatch.setattr(settings, "text_cache_enabled", False)
+    monkeypatch.setattr(settings, "http_max_retries", 1)
+
+    pipeline = Pipeline(str(tmp_path / "eis.db"))
+    pipeline.init_database()
+    reg_number = "0373100000124000001"
+    pipeline.eis.save_zakupka(Zakupka(reg_number=reg_number, combined_text="Извещение"))
+    pipeline.db.skipped_attachments.save_many([
+        SkippedAttachment(reg_number=reg_number, url=url, name=name, priority=1, reason="chars")
+        for url, name in [("https://eis/estimate", "Смета.xlsx"), ("https://eis/broken", "Обоснование.docx")]
+    ])
+
+    http = FakeHttp(failing={"https://eis/broken"})
+    service = EISDownloaderService(
+        zakupki_dir=str(tmp_path / "zakupki"),
+        engine=DownloadEngine(max_workers=1),
+        http_client=http,
+        skipped_repo=pipeline.db.skipped_attachments
+    )
+    service.extractor = None
+    monkeypatch.setattr(service, "_extract_text", lambda buffer, name, sha256: f"текст {name}")
+    pipeline.__dict__["eis_downloader"] = service
+    return pipeline, reg_number
+
+
+def test_only_fetched_attachments_are_forgotten_after_save(skipped_pipeline):
+    pipeline, reg_number = skipped_pipeline
+
+    assert pipeline.fetch_skipped_attachments(reg_number)
+
+    assert "=== Документ: Смета.xlsx ===" in pipeline.eis.get_zakupka(reg_number).combined_text
+    assert [a.url for a in pipeline.db.skipped_attachments.get_for_zakupka(reg_number)] == ["https://eis/broken"]
+
+
+def test_skipped_records_kept_when_save_fails(skipped_pipeline, monkeypatch):
+    pipeline, reg_number = skipped_pipeline
+    monkeypatch.setattr(pipeline.eis, "save_zakupka", lambda zakupka: False)
+
+    assert not pipeline.fetch_skipped_attachments(reg_number)
+
+    assert len(pipeline.db.skipped_attachments.get_for_zakupka(reg_number)) == 2
+
+
+def test_shared_attachment_url_stays_skipped_for_other_purchase(skipped_pipeline):
+    from models.skipped_attachment import SkippedAttachment
+    from models.zakupka import Zakupka
+
+    pipeline, reg_number = skipped_pipeline
+    other = "0373100000124000002"
+    pipeline.eis.save_zakupka(Zakupka(reg_number=other, combined_text="Извещение"))
+    pipeline.db.skipped_attachments.save(
+        SkippedAttachment(reg_number=other, url="https://eis/estimate", name="Смета.xlsx", priority=1, reason="chars")
+    )
+
+    assert pipeline.fetch_skipped_attachments(reg_number)
+
+    assert [a.url for a in pipeline.db.skipped_attachments.get_for_zakupka(other)] == ["https://eis/estimate"]
+    assert pipeline.fetch_skipped_attachments(other)
+    assert "=== Документ: Смета.xlsx ===" in pipeline.eis.get_zakupka(other).combined_text
+    assert pipeline.db.skipped_attachments.get_for_zakupka(other) == []
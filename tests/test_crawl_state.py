@@ -0,0 +1,217 @@
+"""Тесты инкрементального обхода Stage 1: отметка и участки crawl_state."""
+import sys
+from concurrent.futures import Future
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config.search_profiles import default_search_profile
+from models.crawl_state import CrawlRange, CrawlState
+from pipeline import Pipeline
+from text_normalization import NormalizationStats
+
+BASE = datetime(2025, 1, 1, 12, 0)
+
+
+class FakePages:
+    def __init__(self, pages):
+        self.pages = pages
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.closed = True
+
+    def __iter__(self):
+        for number, purchases in enumerate(self.pages, 1):
+            if self.closed:
+                return
+            yield number, purchases
+
+
+class FakeDownloader:
+    """Выдача поиска от свежих закупок к старым, по page_size на страницу."""
+
+    def __init__(self, purchases, page_size=10, failing=(), broken_pages=()):
+        self.purchases = purchases
+        self.page_size = page_size
+        self.failing = set(failing)
+        self.broken_pages = set(broken_pages)
+        self.fetched = []
+        self.normalization_stats = NormalizationStats()
+        self.text_cache = None
+
+    def iter_search_pages(self, max_pages, profile=None):
+        pages = [
+            None if number in self.broken_pages else self.purchases[i:i + self.page_size]
+            for number, i in enumerate(range(0, len(self.purchases), self.page_size), 1)
+        ]
+        # Как ЕИС: за последней страницей выдачи идут пустые
+        return FakePages((pages + [[]])[:max_pages])
+
+    def fetch_combined_text_many(self, reg_numbers):
+        futures = {}
+        for reg_number in reg_numbers:
+            self.fetched.append(reg_number)
+            future = Future()
+            future.set_result("" if reg_number in self.failing else f"Текст {reg_number}")
+            futures[reg_number] = future
+        return futures
+
+
+def _purchases(count, newest=None):
+    newest = newest or BASE
+    return [
+        {"reg_number": f"R{i:02d}", "update_date": newest - timedelta(minutes=i), "description": "", "link": ""}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = Pipeline(str(tmp_path / "test.db"))
+    pipeline.init_database()
+    return pipeline
+
+
+def _run(pipeline, downloader, limit):
+    pipeline.__dict__["eis_downloader"] = downloader
+    downloader.fetched = []
+    profile = replace(default_search_profile(), records_per_page=downloader.page_size)
+    result = pipeline.run_stage1(limit=limit, profiles=[profile])
+    assert result.success
+    return downloader.fetched
+
+
+def test_limit_cut_off_keeps_older_purchases_reachable(pipeline):
+    downloader = FakeDownloader(_purchases(30))
+
+    assert _run(pipeline, downloader, limit=5) == [f"R{i:02d}" for i in range(5)]
+    state = pipeline.db.crawl_state.get_by_id("default")
+    assert state.watermark is None
+    assert len(state.ranges) == 1
+
+    # Каждый следующий обход пропускает пройденное и берёт следующие 5
+    assert _run(pipeline, downloader, limit=5) == [f"R{i:02d}" for i in range(5, 10)]
+    assert _run(pipeline, downloader, limit=5) == [f"R{i:02d}" for i in range(10, 15)]
+    state = pipeline.db.crawl_state.get_by_id("default")
+    assert [(r.low, r.high) for r in state.ranges] == [(BASE - timedelta(minutes=14), BASE)]
+
+    # Обход до конца выдачи превращает участок в отметку
+    assert _run(pipeline, downloader, limit=100) == [f"R{i:02d}" for i in range(15, 30)]
+    state = pipeline.db.crawl_state.get_by_id("default")
+    assert state.watermark == BASE
+    assert state.seen_reg_numbers == ["R00"]
+    assert state.ranges == []
+
+    assert _run(pipeline, downloader, limit=5) == []
+
+
+def test_new_purchases_above_range_are_fetched_before_older_ones(pipeline):
+    old = _purchases(20)
+    downloader = FakeDownloader(old)
+    _run(pipeline, downloader, limit=100)  # отметка = R00
+
+    # Появились 12 новых закупок; лимит останавливает обход до отметки
+    new = [
+        {"reg_number": f"N{i:02d}", "update_date": BASE + timedelta(minutes=12 - i), "description": "", "link": ""}
+        for i in range(12)
+    ]
+    downloader.purchases = new + old
+    assert _run(pipeline, downloader, limit=5) == [f"N{i:02d}" for i in range(5)]
+    state = pipeline.db.crawl_state.get_by_id("default")
+    assert state.watermark == BASE
+    assert len(state.ranges) == 1
+
+    # Следующий обход доходит до отметки: участок поглощается отметкой
+    assert _run(pipeline, downloader, limit=100) == [f"N{i:02d}" for i in range(5, 12)]
+    state = pipeline.db.crawl_state.get_by_id("default")
+    assert state.watermark == BASE + timedelta(minutes=12)
+    assert state.ranges == []
+
+
+def test_failed_purchase_clamps_watermark_and_is_retried(pipeline):
+    downloader = FakeDownloader(_purchases(10), failing={"R03"})
+
+    assert _run(pipeline, downloader, limit=100) == [f"R{i:02d}" for i in range(10)]
+    state = pipeline.db.crawl_state.get_by_id("default")
+    assert state.watermark == BASE - timedelta(minutes=3)
+    assert "R03" not in state.seen_reg_numbers
+
+    downloader.failing = set()
+    # Сохранённые закупки выше отметки уже в БД и не загружаются заново
+    assert _run(pipeline, downloader, limit=100) == ["R03"]
+    assert pipeline.db.crawl_state.get_by_id("default").watermark == BASE
+
+
+def test_failed_purchase_splits_range_after_limit_cut_off(pipeline):
+    downloader = FakeDownloader(_purchases(30), failing={"R04"})
+
+    assert _run(pipeline, downloader, limit=5) == [f"R{i:02d}" for i in range(6)]
+    state = pipeline.db.crawl_state.get_by_id("default")
+    assert state.watermark is None
+    assert not state.is_behind(BASE - timedelta(minutes=4), "R04")
+    assert all(state.is_behind(BASE - timedelta(minutes=i), f"R{i:02d}") for i in (0, 3, 5))
+
+    downloader.failing = set()
+    assert _run(pipeline, downloader, limit=1) == ["R04"]
+    assert _run(pipeline, downloader, limit=1) == ["R06"]
+
+
+def test_unloaded_page_stops_the_range(pipeline):
+    downloader = FakeDownloader(_purchases(30), broken_pages={2})
+
+    assert _run(pipeline, downloader, limit=100) == [f"R{i:02d}" for i in list(range(10)) + list(range(20, 30))]
+    state = pipeline.db.crawl_state.get_by_id("default")
+    assert state.watermark is None
+    assert [(r.low, r.high) for r in state.ranges] == [(BASE - timedelta(minutes=9), BASE)]
+
+    downloader.broken_pages = set()
+    assert _run(pipeline, downloader, limit=100) == [f"R{i:02d}" for i in range(10, 20)]
+    assert pipeline.db.crawl_state.get_by_id("default").watermark == BASE
+
+
+def test_page_cap_keeps_unvisited_purchases_reachable(pipeline, monkeypatch):
+    downloader = FakeDownloader(_purchases(30))
+    monkeypatch.setattr(Pipeline, "STAGE1_MAX_PAGES", 2)
+
+    assert _run(pipeline, downloader, limit=100) == [f"R{i:02d}" for i in range(20)]
+    state = pipeline.db.crawl_state.get_by_id("default")
+    assert state.watermark is None
+    assert [(r.low, r.high) for r in state.ranges] == [(BASE - timedelta(minutes=19), BASE)]
+
+    monkeypatch.setattr(Pipeline, "STAGE1_MAX_PAGES", 50)
+    assert _run(pipeline, downloader, limit=100) == [f"R{i:02d}" for i in range(20, 30)]
+    assert pipeline.db.crawl_state.get_by_id("default").watermark == BASE
+
+
+def test_short_page_ends_the_results(pipeline):
+    downloader = FakeDownloader(_purchases(25))
+
+    assert _run(pipeline, downloader, limit=100) == [f"R{i:02d}" for i in range(25)]
+    assert pipeline.db.crawl_state.get_by_id("default").watermark == BASE
+
+
+def test_range_edges_respect_seen_reg_numbers():
+    edge = BASE - timedelta(minutes=5)
+    crawl_range = CrawlRange(low=edge, high=BASE, low_seen=["A"], high_seen=["B"])
+    state = CrawlState(profile="p", ranges=[crawl_range])
+
+    assert state.is_behind(edge, "A")
+    assert not state.is_behind(edge, "C")
+    assert state.is_behind(BASE - timedelta(minutes=1), "X")
+    assert not state.is_behind(BASE, "C")
+    assert not state.reached(BASE)
+
+    merged = crawl_range.merge(CrawlRange(low=edge - timedelta(minutes=5), high=edge + timedelta(minutes=1)))
+    assert merged.low == edge - timedelta(minutes=5)
+    assert merged.high_seen == ["B"]
@@ -0,0 +1,73 @@
+"""Тесты извлечения текста из DOC (Word 97–2003) без Word и Windows."""
+import io
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from text_extraction import decode_word_text, extract_text_from_doc
+
+TEXT_OFFSET = 0x800
+UNICODE_OFFSET = 0x900
+CLX_OFFSET = 0x10
+
+
+def _word_streams(compressed: str, unicode: str, ccp_text: int, flags: int = 0x0200, nfib: int = 0x00C1):
+    """Поток WordDocument и поток таблиц с двумя фрагментами: cp1252 и UTF-16."""
+    word = bytearray(0x1000)
+    struct.pack_into("<HH", word, 0, 0xA5EC, nfib)
+    struct.pack_into("<H", word, 0x0A, flags)
+    struct.pack_into("<i", word, 0x4C, ccp_text)
+    word[TEXT_OFFSET:TEXT_OFFSET + len(compressed)] = compressed.encode("cp1252")
+    encoded = unicode.encode("utf-16-le")
+    word[UNICODE_OFFSET:UNICODE_OFFSET + len(encoded)] = encoded
+
+    cps = [0, len(compressed), len(compressed) + len(unicode)]
+    pieces = [(TEXT_OFFSET * 2) | 0x40000000, UNICODE_OFFSET]
+    plc = struct.pack("<3I", *cps) + b"".join(struct.pack("<HIH", 0, fc, 0) for fc in pieces)
+    # Prc (свойства, пропускается) и Pcdt с таблицей фрагментов
+    clx = b"\x01" + struct.pack("<H", 2) + b"\0\0" + b"\x02" + struct.pack("<I", len(plc)) + plc
+    table = bytes(CLX_OFFSET) + clx
+    struct.pack_into("<II", word, 0x01A2, CLX_OFFSET, len(clx))
+    return bytes(word), {"1Table": table}
+
+
+def test_piece_table_text_is_decoded():
+    compressed = 'Hello \x13 HYPERLINK "http://x" \x14link\x15\r'
+    unicode = "Привет\x07мир\x07\x07\rСноска"
+    word, tables = _word_streams(compressed, unicode, len(compressed) + len(unicode) - len("Сноска"))
+
+    text = decode_word_text(word, tables.__getitem__)
+
+    # Код поля убран, результат оставлен; текст после ccpText (сноски) не читается
+    assert text == "Hello link\nПривет\tмир"
+
+
+def test_table_stream_is_chosen_by_fib_flag():
+    word, tables = _word_streams("Text\r", "Текст", 10, flags=0)
+
+    with pytest.raises(KeyError):
+        decode_word_text(word, tables.__getitem__)
+    assert decode_word_text(word, {"0Table": tables["1Table"]}.__getitem__) == "Text\nТекст"
+
+
+@pytest.mark.parametrize("flags, nfib, message", [
+    (0x0300, 0x00C1, "зашифрован"),
+    (0x0200, 0x0065, "Word 6/95"),
+])
+def test_unsupported_documents_are_rejected(flags, nfib, message):
+    word, tables = _word_streams("Text", "", 4, flags=flags, nfib=nfib)
+
+    with pytest.raises(ValueError, match=message):
+        decode_word_text(word, tables.__getitem__)
+
+
+def test_non_ole_doc_is_decoded_as_text():
+    content = "{\\rtf1 Договор\x00\x01 поставки}".encode("cp1251")
+
+    text = extract_text_from_doc(io.BytesIO(content))
+
+    assert text == "{\\rtf1 Договор поставки}"
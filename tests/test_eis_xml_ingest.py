@@ -0,0 +1,148 @@
+"""Тесты загрузки закупок из XML-выгрузок ЕИС (services.eis_xml_ingest_service), полностью офлайн."""
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from repositories.zakupka_repo import ZakupkaRepository
+from services.eis_xml_ingest_service import EISXmlIngestService
+
+NS = 'xmlns="http://zakupki.gov.ru/oos/export/1" xmlns:ns2="http://zakupki.gov.ru/oos/types/1"'
+
+# Схема 2020+ (epNotification*): ОКПД2 в OKPDInfo/OKPDCode
+NOTICE_2020 = """<?xml version="1.0" encoding="UTF-8"?>
+<export {ns}>
+  <ns2:epNotificationEZK2020 schemeVersion="13.1">
+    <ns2:commonInfo>
+      <ns2:purchaseNumber>{reg}</ns2:purchaseNumber>
+      <ns2:docPublishDTInEIS>2024-01-15T10:30:00.123+03:00</ns2:docPublishDTInEIS>
+      <ns2:href>https://zakupki.gov.ru/epz/order/notice/ezk2020/view/common-info.html?regNumber={reg}</ns2:href>
+      <ns2:purchaseObjectInfo>Приобретение квартиры для детей-сирот</ns2:purchaseObjectInfo>
+    </ns2:commonInfo>
+    <ns2:notificationInfo>
+      <ns2:procedureInfo><ns2:collectingInfo><ns2:endDT>2024-01-25T09:00:00+03:00</ns2:endDT></ns2:collectingInfo></ns2:procedureInfo>
+      <ns2:contractConditionsInfo><ns2:maxPriceInfo><ns2:maxPrice>3450000.00</ns2:maxPrice></ns2:maxPriceInfo></ns2:contractConditionsInfo>
+      <ns2:purchaseObjectsInfo>
+        <ns2:purchaseObject><ns2:OKPDInfo><ns2:OKPDCode>{okpd}</ns2:OKPDCode><ns2:OKPDName>Квартиры</ns2:OKPDName></ns2:OKPDInfo></ns2:purchaseObject>
+      </ns2:purchaseObjectsInfo>
+    </ns2:notificationInfo>
+    <ns2:attachmentsInfo>
+      <ns2:attachmentInfo>
+        <ns2:publishedContentId>ABC</ns2:publishedContentId>
+        <ns2:fileName>Проект контракта.docx</ns2:fileName>
+        <ns2:url>https://zakupki.gov.ru/44fz/filestore/public/1.0/download/priz/file.html?uid=ABC</ns2:url>
+      </ns2:attachmentInfo>
+    </ns2:attachmentsInfo>
+  </ns2:epNotificationEZK2020>
+</export>
+"""
+
+# Схема до 2020 (fcsNotification*): ОКПД2 в OKPD2/code
+NOTICE_FCS = """<?xml version="1.0" encoding="UTF-8"?>
+<export {ns}>
+  <fcsNotificationEF schemeVersion="9.3">
+    <purchaseNumber>{reg}</purchaseNumber>
+    <docPublishDate>2023-05-02T12:00:00+03:00</docPublishDate>
+    <purchaseObjectInfo>Жилое помещение</purchaseObjectInfo>
+    <lot>
+      <maxPrice>2100000</maxPrice>
+      <purchaseObjects><purchaseObject><OKPD2><code>{okpd}</code></OKPD2></purchaseObject></purchaseObjects>
+    </lot>
+    <procedureInfo><collecting><endDate>2023-05-12T08:00:00+03:00</endDate></collecting></procedureInfo>
+    <attachments>
+      <attachment><fileName>Документация.pdf</fileName><url>https://zakupki.gov.ru/file?uid=DEF</url></attachment>
+    </attachments>
+  </fcsNotificationEF>
+</export>
+"""
+
+
+def _archive(path: Path, notices):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i, xml in enumerate(notices):
+            archive.writestr(f"notification_{i}.xml", xml)
+        archive.writestr("readme.txt", "не XML")
+
+
+def _service(tmp_path, downloader=None) -> EISXmlIngestService:
+    repo = ZakupkaRepository(str(tmp_path / "eis.db"))
+    repo.create_table()
+    return EISXmlIngestService(repo, downloader, okpd2_prefixes=["68.10.11"])
+
+
+def test_parse_both_schemas_and_filter_okpd2(tmp_path):
+    _archive(tmp_path / "notifications.zip", [
+        NOTICE_2020.format(ns=NS, reg="0373100000124000001", okpd="68.10.11.000"),
+        NOTICE_FCS.format(ns=NS, reg="0148300000523000017", okpd="68.10.11.000"),
+        NOTICE_2020.format(ns=NS, reg="0320200000124000005", okpd="41.20.10.000"),
+    ])
+    notices = list(_service(tmp_path).iter_notices(str(tmp_path)))
+
+    assert [n.zakupka.reg_number for n in notices] == ["0373100000124000001", "0148300000523000017"]
+
+    first = notices[0]
+    assert first.zakupka.description == "Приобретение квартиры для детей-сирот"
+    assert first.zakupka.initial_price == 3450000.0
+    assert first.zakupka.bid_end_date == "25.01.2024 09:00"
+    assert first.zakupka.update_date == "2024-01-15 10:30:00.123000"
+    assert first.zakupka.link.endswith("regNumber=0373100000124000001")
+    assert first.attachments == [{
+        "name": "Проект контракта.docx",
+        "url": "https://zakupki.gov.ru/44fz/filestore/public/1.0/download/priz/file.html?uid=ABC",
+    }]
+    assert "OKPDName: Квартиры" in first.text
+    assert "publishedContentId" not in first.text
+
+    second = notices[1]
+    assert second.okpd2_codes == ["68.10.11.000"]
+    assert second.zakupka.initial_price == 2100000.0
+    assert second.attachments[0]["name"] == "Документация.pdf"
+
+
+def test_ingest_without_download_saves_and_skips_existing(tmp_path):
+    _archive(tmp_path / "a.zip", [
+        NOTICE_2020.format(ns=NS, reg="0373100000124000001", okpd="68.10.11.000"),
+        NOTICE_2020.format(ns=NS, reg="0373100000124000001", okpd="68.10.11.000"),
+        NOTICE_FCS.format(ns=NS, reg="0148300000523000017", okpd="68.10.11.120"),
+    ])
+    service = _service(tmp_path)
+
+    assert service.ingest(str(tmp_path), download_attachments=False) == (2, 0, [])
+    saved = service.repo.get_by_id("0373100000124000001")
+    assert saved.combined_text.startswith("=== ПЕЧАТНАЯ ФОРМА ===")
+
+    assert service.ingest(str(tmp_path), download_attachments=False) == (0, 2, [])
+
+
+class FakeEngine:
+    def submit_purchase(self, fn, *args):
+        from concurrent.futures import Future
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class FakeDownloader:
+    """Вместо загрузки собирает текст из переданных вложений."""
+
+    def __init__(self):
+        self.engine = FakeEngine()
+        self.calls = []
+
+    def fetch_combined_text(self, reg_number, docs, print_form_text):
+        self.calls.append((reg_number, docs))
+        return print_form_text + "\n" + "\n".join(d["name"] for d in docs)
+
+
+def test_ingest_downloads_attachments_from_xml(tmp_path):
+    _archive(tmp_path / "a.zip", [
+        NOTICE_2020.format(ns=NS, reg="0373100000124000001", okpd="68.10.11.000"),
+        NOTICE_FCS.format(ns=NS, reg="0148300000523000017", okpd="68.10.11.000"),
+    ])
+    downloader = FakeDownloader()
+    service = _service(tmp_path, downloader)
+
+    assert service.ingest(str(tmp_path), limit=1) == (1, 0, [])
+    assert downloader.calls[0][1][0]["name"] == "Проект контракта.docx"
+    assert "Проект контракта.docx" in service.repo.get_by_id("0373100000124000001").combined_text
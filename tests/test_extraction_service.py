@@ -0,0 +1,137 @@
+"""Тесты пула процессов извлечения текста (services.extraction_service)."""
+import os
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config.settings import settings
+from pipeline import Pipeline
+from services import text_cache
+from services.extraction_service import ExtractionTimeout, TextExtractionService
+
+
+def fake_worker(source, name, use_cache=True):
+    """Поведение задаётся содержимым: hang, crash или текст."""
+    if source == b"hang":
+        time.sleep(60)
+    if source == b"slow":
+        time.sleep(1)
+    if source == b"crash":
+        os._exit(1)
+    if source == b"memory":
+        return "x" * (512 * 1024 * 1024)
+    return f"{name}: {source.decode()}"
+
+
+class FakeExtractionService(TextExtractionService):
+    worker = staticmethod(fake_worker)
+
+
+@pytest.fixture(autouse=True)
+def tmp_text_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "text_cache_enabled", True)
+    monkeypatch.setattr(settings, "text_cache_dir", str(tmp_path / "text_cache"))
+    monkeypatch.setattr(text_cache, "_text_cache", None)
+
+
+@pytest.fixture
+def make_service():
+    services = []
+
+    def _make(**kwargs):
+        kwargs.setdefault("workers", 2)
+        kwargs.setdefault("memory_mb", 0)
+        kwargs.setdefault("max_tasks_per_child", 0)
+        service = FakeExtractionService(**kwargs)
+        services.append(service)
+        return service
+
+    yield _make
+    for service in services:
+        service.shutdown(wait=False)
+
+
+def test_results_returned_as_futures(make_service):
+    service = make_service(timeout_s=30)
+    futures = [service.submit(f"doc {i}".encode(), f"{i}.pdf") for i in range(5)]
+    assert [f.result(timeout=30) for f in futures] == [f"{i}.pdf: doc {i}" for i in range(5)]
+
+
+def test_text_cache_checked_in_parent_counts_hits(make_service):
+    service = make_service()
+
+    first = service.extract(b"typical contract", "a.pdf")
+    second = service.extract(b"typical contract", "b.pdf")
+
+    assert first == second == "a.pdf: typical contract"
+    assert service.stats["submitted"] == 1
+    assert text_cache.get_text_cache().stats == {"hits": 1, "misses": 1, "stores": 1}
+
+
+def test_stuck_file_times_out_and_others_finish(make_service):
+    service = make_service(timeout_s=1)
+    stuck = service.submit(b"hang", "stuck.pdf")
+    normal = [service.submit(f"doc {i}".encode(), f"{i}.pdf") for i in range(3)]
+
+    with pytest.raises(ExtractionTimeout):
+        stuck.result(timeout=30)
+    assert [f.result(timeout=30) for f in normal] == [f"{i}.pdf: doc {i}" for i in range(3)]
+    assert service.stats["timeouts"] == 1
+    assert service.stats["recycled"] == 1
+
+    # Пул пересоздан и принимает новые файлы
+    assert service.extract(b"after", "after.pdf") == "after.pdf: after"
+
+
+def test_crashed_worker_is_recycled(make_service):
+    service = make_service(timeout_s=30)
+    crash = service.submit(b"crash", "bad.doc")
+    with pytest.raises(BrokenProcessPool):
+        crash.result(timeout=30)
+    assert service.stats["crashed"] >= 1
+    assert service.extract(b"ok", "good.doc") == "good.doc: ok"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="RLIMIT_AS недоступен")
+def test_memory_limit_applies_in_worker(make_service):
+    service = make_service(timeout_s=30, memory_mb=256)
+    with pytest.raises(MemoryError):
+        service.extract(b"memory", "huge.xlsx")
+
+
+def test_pool_does_not_fork_from_threads(make_service):
+    service = make_service(timeout_s=30)
+    assert service._mp_context.get_start_method() in ("forkserver", "spawn")
+
+
+def test_queued_file_timeout_starts_when_worker_takes_it(make_service):
+    # Один процесс: второй файл ждёт в очереди пула, пока идёт первый
+    service = make_service(workers=1, timeout_s=1.6)
+    service.extract(b"warm", "warm.pdf")
+    first = service.submit(b"slow", "first.pdf")
+    second = service.submit(b"slow", "second.pdf")
+
+    assert first.result(timeout=30) == "first.pdf: slow"
+    assert second.result(timeout=30) == "second.pdf: slow"
+    assert service.stats["timeouts"] == 0
+
+
+def test_pipeline_close_stops_built_services(tmp_path, make_service):
+    pipeline = Pipeline(str(tmp_path / "test.db"))
+    service = make_service(timeout_s=30)
+    pipeline.__dict__["extractor"] = service
+    assert service.extract(b"ok", "a.pdf") == "a.pdf: ok"
+
+    pipeline.close()
+
+    assert service._pool is None
+    with pytest.raises(RuntimeError):
+        service.submit(b"late", "late.pdf")
+    # Несозданные сервисы не создаются ради закрытия
+    assert "eis_downloader" not in pipeline.__dict__
+    assert "http" not in pipeline.__dict__
@@ -0,0 +1,70 @@
+"""Парсеры HTML ЕИС (bs4 и lxml) дают одинаковый результат на сохранённых страницах."""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+pytest.importorskip("bs4")
+pytest.importorskip("lxml")
+
+from services.eis_html_parser import get_html_parser
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "eis"
+
+
+def _load(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="module")
+def parsers():
+    return get_html_parser("bs4"), get_html_parser("lxml")
+
+
+def test_search_results_parity(parsers):
+    bs4_parser, lxml_parser = parsers
+    html = _load("search_page.html")
+
+    expected = bs4_parser.parse_search_results(html)
+    assert lxml_parser.parse_search_results(html) == expected
+
+    assert [p["reg_number"] for p in expected] == [
+        "0373100000124000001", "0148300000524000017", "0320200000124000005",
+    ]
+    first = expected[0]
+    assert first["initial_price"] == 3450000.0
+    assert first["bid_end_date"] == "25.01.2024 09:00"
+    assert first["update_date"] == datetime(2024, 1, 15)
+    assert first["link"].startswith("https://zakupki.gov.ru/epz/")
+    assert expected[1]["initial_price"] is None
+    assert expected[2]["update_date"] == datetime.min
+
+
+def test_documents_list_parity(parsers):
+    bs4_parser, lxml_parser = parsers
+    html = _load("documents.html")
+
+    expected = bs4_parser.parse_documents_list(html)
+    assert lxml_parser.parse_documents_list(html) == expected
+    assert [d["url"].rsplit("uid=", 1)[1] for d in expected] == ["A1B2C3D4E5F6", "0F0E0D0C0B0A"]
+
+
+def test_print_form_parity(parsers):
+    bs4_parser, lxml_parser = parsers
+    html = _load("print_form.html")
+
+    expected = bs4_parser.parse_print_form(html)
+    assert lxml_parser.parse_print_form(html) == expected
+    assert "window.print" not in expected
+    assert "padding" not in expected
+    assert "комментарий" not in expected
+
+
+def test_empty_page(parsers):
+    for parser in parsers:
+        assert parser.parse_search_results("") == []
+        assert parser.parse_documents_list("") == []
+        assert parser.parse_print_form("") == ""
@@ -0,0 +1,159 @@
+"""Тесты дискового HTTP-кэша (services.http_cache) и его использования в загрузчике ЕИС."""
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+pytest.importorskip("requests")
+
+import text_extraction
+from services.eis_downloader_service import EISDownloaderService
+from services.http_cache import HttpCache
+from services.text_cache import TextCache
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: bytes = b"", headers: dict = None):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode("utf-8")
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_bytes(self, chunk_size: int):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+
+class FakeHttp:
+    """HttpClient, отвечающий 304 на совпавший If-None-Match."""
+
+    def __init__(self, body: bytes, etag: str = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def _respond(self, url, headers):
+        self.requests.append((url, dict(headers or {})))
+        if headers and headers.get("If-None-Match") == self.etag:
+            return FakeResponse(304, headers={"ETag": self.etag})
+        return FakeResponse(200, self.body, {"ETag": self.etag})
+
+    def get(self, url, headers=None, timeout=30):
+        return self._respond(url, headers)
+
+    @contextmanager
+    def stream(self, url, headers=None, timeout=60, attempts=None):
+        yield self._respond(url, headers)
+
+
+def _service(tmp_path, http, ttl_s=3600, max_mb=10):
+    cache = HttpCache(cache_dir=str(tmp_path / "cache"), max_mb=max_mb, ttl_s=ttl_s)
+    service = EISDownloaderService(
+        zakupki_dir=str(tmp_path / "zakupki"),
+        http_client=http,
+        cache=cache,
+        text_cache=TextCache(str(tmp_path / "text_cache"), version="test")
+    )
+    service.extractor = None
+    return service
+
+
+def test_fresh_page_served_without_request(tmp_path):
+    http = FakeHttp("<p>Печатная форма</p>".encode("utf-8"))
+    service = _service(tmp_path, http)
+
+    assert service._fetch_page("https://eis/page") == "<p>Печатная форма</p>"
+    assert service._fetch_page("https://eis/page") == "<p>Печатная форма</p>"
+
+    assert len(http.requests) == 1
+    assert service.cache.stats["misses"] == 1
+    assert service.cache.stats["hits"] == 1
+
+
+def test_stale_page_revalidated_with_etag(tmp_path):
+    http = FakeHttp(b"<p>page</p>")
+    service = _service(tmp_path, http, ttl_s=0)
+
+    service._fetch_page("https://eis/page")
+    assert service._fetch_page("https://eis/page") == "<p>page</p>"
+
+    assert len(http.requests) == 2
+    assert http.requests[1][1]["If-None-Match"] == '"v1"'
+    assert service.cache.stats["revalidated"] == 1
+
+
+def test_attachment_downloaded_and_extracted_once(tmp_path, monkeypatch):
+    http = FakeHttp(b"%PDF-1.4 " + b"x" * 5000)
+    service = _service(tmp_path, http)
+    extracted = []
+
+    def fake_extract(file_path, name=None, use_cache=True):
+        extracted.append(file_path)
+        return "текст документа"
+
+    monkeypatch.setattr(text_extraction, "extract_text_from_any_file", fake_extract)
+
+    doc = {"name": "Проект контракта", "url": "https://eis/file.html?uid=ABC"}
+    target_dir = tmp_path / "zakupki" / "docs"
+    target_dir.mkdir(parents=True)
+
+    assert service._download_and_extract(dict(doc), target_dir) == "текст документа"
+    assert service._download_and_extract(dict(doc), target_dir) == "текст документа"
+
+    assert len(http.requests) == 1
+    assert len(extracted) == 1
+    assert extracted[0].endswith(".pdf")
+    assert service.text_cache.stats == {"hits": 1, "misses": 1, "stores": 1}
+    assert not any(target_dir.iterdir())
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = HttpCache(cache_dir=str(tmp_path / "cache"), max_mb=1)
+    half_mb = 512 * 1024
+
+    cache.put_bytes("https://eis/a", b"a" * half_mb)
+    cache.put_bytes("https://eis/b", b"b" * half_mb)
+    cache.hit(cache.lookup("https://eis/a"))
+    cache.put_bytes("https://eis/c", b"c" * half_mb)
+
+    assert cache.lookup("https://eis/a") is not None
+    assert cache.lookup("https://eis/b") is None
+    assert cache.lookup("https://eis/c") is not None
+    assert cache.total_size() <= 1024 * 1024
+
+
+def test_pinned_objects_survive_eviction(tmp_path):
+    cache = HttpCache(cache_dir=str(tmp_path / "cache"), max_mb=1)
+    half_mb = 512 * 1024
+    cache.put_bytes("https://eis/a", b"a" * half_mb)
+    cache.put_bytes("https://eis/b", b"b" * half_mb)
+
+    # Другой поток читает самый старый объект, пока кэш пополняется
+    with cache.pinned():
+        path = cache.hit(cache.lookup("https://eis/a"))
+        cache.hit(cache.lookup("https://eis/b"))
+        cache.put_bytes("https://eis/c", b"c" * half_mb)
+        assert path.read_bytes() == b"a" * half_mb
+        assert cache.lookup("https://eis/b") is not None
+
+    cache.put_bytes("https://eis/d", b"d" * half_mb)
+    assert cache.lookup("https://eis/a") is None
+    assert cache.total_size() <= 1024 * 1024
+
+
+def test_hit_after_eviction_is_a_miss(tmp_path):
+    cache = HttpCache(cache_dir=str(tmp_path / "cache"), max_mb=1)
+    cache.put_bytes("https://eis/a", b"a" * 1024)
+    entry = cache.lookup("https://eis/a")
+
+    cache.object_path(entry.sha256, entry.ext).unlink()
+
+    assert cache.hit(entry) is None
+    assert cache.stats["hits"] == 0
@@ -0,0 +1,250 @@
+"""Тесты HTTP-клиента ЕИС: пул соединений, лимит на хост, DNS-кэш, лимит размера загрузки."""
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+requests = pytest.importorskip("requests")
+
+from config.settings import settings
+from services.download_engine import DownloadEngine
+from services.eis_downloader_service import EISDownloaderService
+from services.http_client import HttpClient, _DnsCache
+from services.text_cache import TextCache
+from utils.rate_limiter import AdaptiveRateLimiter
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, body: bytes = b"", headers: dict = None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+        self.chunks_read = 0
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_bytes(self, chunk_size: int):
+        for i in range(0, len(self.content), chunk_size):
+            self.chunks_read += 1
+            yield self.content[i:i + chunk_size]
+
+
+class SlowSession:
+    """requests.Session, считающий одновременные запросы по хостам."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.active = {}
+        self.max_active = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        host = url.split("/")[2]
+        with self._lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+        time.sleep(self.delay)
+        with self._lock:
+            self.active[host] -= 1
+        return FakeResponse()
+
+    def close(self):
+        pass
+
+
+def _client(per_host: int = 2) -> HttpClient:
+    limiter = AdaptiveRateLimiter("test", rate=1000.0, max_rate=1000.0, burst=100.0)
+    return HttpClient(per_host_connections=per_host, http2=False, dns_ttl_s=0, rate_limiter=limiter)
+
+
+def test_session_keeps_one_bounded_pool_per_host():
+    client = _client(per_host=3)
+
+    adapter = client._session.get_adapter("https://zakupki.gov.ru/")
+    assert adapter is client._session.get_adapter("https://other.example/")
+    assert adapter._pool_maxsize == 3
+    assert adapter._pool_block is True
+    client.close()
+
+
+def test_per_host_connections_are_bounded_across_download_workers():
+    client = _client(per_host=2)
+    client._session = SlowSession()
+    engine = DownloadEngine(max_workers=8)
+
+    futures = [
+        engine.submit(client.get, f"https://{host}/doc/{i}")
+        for i in range(6)
+        for host in ("zakupki.gov.ru", "other.example")
+    ]
+    for future in futures:
+        assert future.result().status_code == 200
+    engine.shutdown()
+
+    assert client._session.max_active == {"zakupki.gov.ru": 2, "other.example": 2}
+
+
+def test_dns_cache_applies_only_inside_scope_and_is_bounded():
+    lookups = []
+
+    def resolver(host, port, *args):
+        lookups.append(host)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (f"10.0.0.{len(lookups)}", port))]
+
+    cache = _DnsCache(ttl_s=60, max_entries=2, resolver=resolver)
+
+    cache.getaddrinfo("openrouter.ai", 443)
+    cache.getaddrinfo("openrouter.ai", 443)
+    assert lookups == ["openrouter.ai", "openrouter.ai"]
+
+    with cache.scope():
+        first = cache.getaddrinfo("zakupki.gov.ru", 443)
+        assert cache.getaddrinfo("zakupki.gov.ru", 443) == first
+        cache.getaddrinfo("a.example", 443)
+        cache.getaddrinfo("b.example", 443)
+        # Самая старая запись вытеснена
+        cache.getaddrinfo("zakupki.gov.ru", 443)
+    assert lookups.count("zakupki.gov.ru") == 2
+    assert len(cache._entries) == 2
+
+
+class StreamHttp:
+    def __init__(self, response: FakeResponse):
+        self.response = response
+
+    @contextmanager
+    def stream(self, url, headers=None, timeout=60, attempts=None):
+        yield self.response
+
+
+def _downloader(tmp_path, monkeypatch, response: FakeResponse) -> EISDownloaderService:
+    monkeypatch.setattr(settings, "http_cache_enabled", False)
+    monkeypatch.setattr(settings, "eis_max_download_mb", 1)
+    service = EISDownloaderService(
+        zakupki_dir=str(tmp_path / "zakupki"),
+        http_client=StreamHttp(response),
+        text_cache=TextCache(str(tmp_path / "text_cache"), version="test")
+    )
+    service.extractor = None
+    return service
+
+
+def test_stream_stops_at_size_cap_without_reading_the_rest(tmp_path, monkeypatch):
+    response = FakeResponse(body=b"%PDF" + b"x" * (3 * 1024 * 1024))
+    service = _downloader(tmp_path, monkeypatch, response)
+
+    assert service._stream_to_memory({"url": "https://zakupki.gov.ru/f", "name": "big.pdf"}) is None
+    chunks_to_cap = 1024 * 1024 // service.DOWNLOAD_CHUNK_SIZE + 1
+    assert response.chunks_read == chunks_to_cap
+
+
+def test_content_length_over_cap_is_rejected_before_reading(tmp_path, monkeypatch):
+    response = FakeResponse(body=b"%PDF", headers={"Content-Length": str(5 * 1024 * 1024)})
+    service = _downloader(tmp_path, monkeypatch, response)
+
+    assert service._stream_to_memory({"url": "https://zakupki.gov.ru/f", "name": "big.pdf"}) is None
+    assert response.chunks_read == 0
+
+
+def test_stream_within_cap_records_size_and_hash(tmp_path, monkeypatch):
+    body = b"%PDF-1.4 " + b"y" * 5000
+    service = _downloader(tmp_path, monkeypatch, FakeResponse(body=body))
+    doc = {"url": "https://zakupki.gov.ru/f", "name": "small.pdf"}
+
+    with service._stream_to_memory(doc) as buffer:
+        assert buffer.read() == body
+    assert doc["size"] == len(body)
+    assert len(doc["sha256"]) == 64
+
+
+class HttpResponse(FakeResponse):
+    """Ответ requests: raise_for_status бросает HTTPError с ответом."""
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}", response=self)
+
+    def iter_content(self, chunk_size: int):
+        return self.iter_bytes(chunk_size)
+
+    def close(self):
+        pass
+
+
+class ScriptedSession:
+    """Отвечает статусами из списка и проверяет, свободен ли слот хоста во время пауз."""
+
+    def __init__(self, statuses, body=b"%PDF-1.4 file"):
+        self.statuses = list(statuses)
+        self.body = body
+        self.requests = 0
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.requests += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        headers = {"Retry-After": "0"} if status == 429 else {}
+        return HttpResponse(status, self.body if status == 200 else b"", headers)
+
+    def close(self):
+        pass
+
+
+def _retrying_downloader(tmp_path, monkeypatch, statuses):
+    monkeypatch.setattr(settings, "http_cache_enabled", False)
+    monkeypatch.setattr(settings, "http_max_retries", 3)
+    monkeypatch.setattr(settings, "http_backoff_base_s", 0.0)
+    client = _client(per_host=1)
+    client._session = ScriptedSession(statuses)
+    service = EISDownloaderService(
+        zakupki_dir=str(tmp_path / "zakupki"),
+        http_client=client,
+        text_cache=TextCache(str(tmp_path / "text_cache"), version="test")
+    )
+    service.extractor = None
+    return service, client._session
+
+
+@pytest.mark.parametrize("statuses, requests_made, downloaded", [
+    ([404], 1, False),
+    ([403], 1, False),
+    ([503, 200], 2, True),
+    ([429, 502, 200], 3, True),
+    ([503, 503, 503, 503], 3, False),
+])
+def test_attachment_download_has_one_retry_layer(tmp_path, monkeypatch, statuses, requests_made, downloaded):
+    service, session = _retrying_downloader(tmp_path, monkeypatch, statuses)
+
+    buffer = service._download_to_memory({"url": "https://zakupki.gov.ru/f", "name": "a.pdf"})
+
+    assert session.requests == requests_made
+    assert (buffer is not None) == downloaded
+    if buffer is not None:
+        buffer.close()
+
+
+def test_host_slot_is_free_while_waiting_between_attempts():
+    slot_free = []
+    client = _client(per_host=1)
+    client._session = ScriptedSession([503, 200])
+
+    def sleep(seconds):
+        semaphore = client._host_semaphores["zakupki.gov.ru"]
+        acquired = semaphore.acquire(blocking=False)
+        slot_free.append(acquired)
+        if acquired:
+            semaphore.release()
+
+    client.limiter._sleep = sleep
+    with client.stream("https://zakupki.gov.ru/f", attempts=2) as resp:
+        assert resp.status_code == 200
+    assert slot_free == [True]
+    # После выхода из with слот возвращён
+    assert client._host_semaphores["zakupki.gov.ru"].acquire(blocking=False)
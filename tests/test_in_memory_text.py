@@ -0,0 +1,97 @@
+"""Тесты сборки текста закупки в памяти, без записи вложений на диск."""
+import io
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+pytest.importorskip("requests")
+docx = pytest.importorskip("docx")
+
+from config.settings import settings
+from services.eis_downloader_service import EISDownloaderService
+from text_extraction import extract_text_from_any_file
+
+
+def _docx_bytes(*paragraphs: str) -> bytes:
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.content = body
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_bytes(self, chunk_size: int):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+
+class FakeHttp:
+    def __init__(self, files: dict):
+        self.files = files
+
+    @contextmanager
+    def stream(self, url, headers=None, timeout=60, attempts=None):
+        yield FakeResponse(self.files[url])
+
+
+def test_extract_from_stream_matches_file(tmp_path):
+    content = _docx_bytes("Квартира площадью 33 кв. м", "Этаж 5")
+    path = tmp_path / "contract.docx"
+    path.write_bytes(content)
+
+    from_file = extract_text_from_any_file(str(path), use_cache=False)
+    from_stream = extract_text_from_any_file(io.BytesIO(content), "contract.docx", use_cache=False)
+
+    assert from_stream == from_file
+    assert "Квартира площадью 33 кв. м" in from_stream
+
+
+def test_fetch_combined_text_keeps_attachments_in_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "http_cache_enabled", False)
+    monkeypatch.setattr(settings, "text_cache_enabled", False)
+    http = FakeHttp({
+        "https://eis/a": _docx_bytes("Техническое задание"),
+        "https://eis/b": _docx_bytes("Проект контракта"),
+    })
+    service = EISDownloaderService(zakupki_dir=str(tmp_path / "zakupki"), http_client=http)
+    assert service.cache is None
+
+    text = service.fetch_combined_text(
+        "0373100000124000001",
+        docs=[{"name": "ТЗ.docx", "url": "https://eis/a"}, {"name": "Контракт.docx", "url": "https://eis/b"}],
+        print_form_text="Извещение",
+    )
+
+    assert text.index("=== ПЕЧАТНАЯ ФОРМА ===") < text.index("=== Документ: ТЗ.docx ===")
+    assert text.index("Техническое задание") < text.index("=== Документ: Контракт.docx ===")
+    assert "Проект контракта" in text
+    assert not (tmp_path / "zakupki").exists()
+
+
+@pytest.mark.parametrize("normalize", [True, False])
+def test_pdf_page_breaks_do_not_reach_combined_text(tmp_path, monkeypatch, normalize):
+    monkeypatch.setattr(settings, "http_cache_enabled", False)
+    monkeypatch.setattr(settings, "text_cache_enabled", False)
+    monkeypatch.setattr(settings, "text_normalize_enabled", normalize)
+    service = EISDownloaderService(zakupki_dir=str(tmp_path / "zakupki"), http_client=FakeHttp({}))
+    monkeypatch.setattr(service, "_scheduled_download", lambda scheduler, doc, docs_dir: "Раздел 1\fРаздел 2")
+
+    text = service.fetch_combined_text(
+        "0373100000124000001", docs=[{"name": "ТЗ.pdf", "url": "https://eis/a"}], print_form_text="Извещение"
+    )
+
+    assert "\f" not in text
+    assert "Раздел 1\nРаздел 2" in text
@@ -0,0 +1,73 @@
+"""Тесты ленивого импорта: запуск CLI не тянет библиотеки форматов и HTTP."""
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def _imported_after(module: str, candidates: list) -> list:
+    """Какие из candidates оказались в sys.modules после `import module` в новом процессе."""
+    code = (
+        f"import sys; sys.path.insert(0, {str(SRC)!r}); import {module}; "
+        f"print(','.join(m for m in {candidates!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=str(SRC))
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+def test_text_extraction_does_not_import_format_libraries():
+    assert _imported_after("text_extraction", ["pdfplumber", "pypdfium2", "openpyxl", "docx", "xlrd", "olefile"]) == []
+
+
+@pytest.mark.parametrize("module", ["pipeline", "main"])
+def test_cli_startup_does_not_import_http_stack(module):
+    pytest.importorskip("requests")
+
+    assert _imported_after(module, ["requests", "bs4", "lxml", "text_extraction"]) == []
+
+
+def test_extraction_is_dispatched_through_registry(monkeypatch):
+    sys.path.insert(0, str(SRC))
+    import text_extraction
+
+    assert text_extraction.EXTRACTORS["pdf"] is text_extraction.extract_text_from_pdf
+    monkeypatch.setitem(text_extraction.EXTRACTORS, "pdf", lambda source: "stub")
+    pdf = Path(__file__).resolve().parent / "fixtures" / "pdf" / "text_3_pages.pdf"
+    assert text_extraction._extract_uncached(str(pdf)) == "stub"
+
+
+def test_lazy_services_are_built_once_across_threads(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    sys.path.insert(0, str(SRC))
+    from pipeline import Pipeline
+    from services import http_client
+
+    built = []
+
+    class SlowClient:
+        def __init__(self):
+            time.sleep(0.05)
+            built.append(self)
+
+    monkeypatch.setattr(http_client, "HttpClient", SlowClient)
+    pipeline = Pipeline(str(tmp_path / "test.db"))
+    barrier = threading.Barrier(8)
+    seen = []
+
+    def worker():
+        barrier.wait()
+        seen.append(pipeline.http)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert all(client is built[0] for client in seen)
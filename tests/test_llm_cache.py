@@ -0,0 +1,139 @@
+"""Тесты кэша ответов модели (Stage 2)."""
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+pytest.importorskip("requests")
+
+from models.llm_cache_entry import LLMCacheEntry
+from repositories.llm_cache_repo import LLMCacheRepository
+from services import ai_processor_service
+from services.ai_processor_service import AIProcessorService
+
+
+@pytest.fixture
+def cache_repo(tmp_path):
+    repo = LLMCacheRepository(str(tmp_path / "cache.db"))
+    repo.create_table()
+    return repo
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, content: str):
+        self._content = content
+
+    def json(self):
+        return {"choices": [{"message": {"content": self._content}}]}
+
+
+@pytest.fixture
+def counted_posts(monkeypatch):
+    """Подменяет requests.post ответом модели и считает запросы."""
+    calls = []
+
+    def fake_post(url, headers=None, json=None, timeout=None):
+        calls.append(json)
+        return FakeResponse('```json\n{"city": "Казань", "status": "ok"}\n```')
+
+    monkeypatch.setattr(ai_processor_service.requests, "post", fake_post)
+    return calls
+
+
+def test_identical_text_is_sent_once(cache_repo, counted_posts):
+    processor = AIProcessorService(api_key="test", cache_repo=cache_repo)
+
+    first = processor._call_openrouter("Текст закупки")
+    second = processor._call_openrouter("Текст закупки")
+
+    assert first == second == {"city": "Казань", "status": "ok"}
+    assert len(counted_posts) == 1
+    assert processor.cache_stats == {"hits": 1, "misses": 1, "stores": 1}
+
+    processor._call_openrouter("Другой текст")
+    assert len(counted_posts) == 2
+
+
+def test_prompt_or_model_change_misses_cache(cache_repo, counted_posts):
+    AIProcessorService(api_key="test", cache_repo=cache_repo)._call_openrouter("Текст")
+
+    other_model = AIProcessorService(api_key="test", model_name="other/model", cache_repo=cache_repo)
+    other_model._call_openrouter("Текст")
+
+    class NewPrompt(AIProcessorService):
+        SYSTEM_PROMPT = AIProcessorService.SYSTEM_PROMPT + "\nНовое правило."
+
+    NewPrompt(api_key="test", cache_repo=cache_repo)._call_openrouter("Текст")
+
+    assert len(counted_posts) == 3
+    assert cache_repo.count() == 3
+
+
+def test_failed_response_is_not_cached(cache_repo, monkeypatch):
+    monkeypatch.setattr(
+        ai_processor_service.requests, "post",
+        lambda *args, **kwargs: FakeResponse("не JSON")
+    )
+    processor = AIProcessorService(api_key="test", cache_repo=cache_repo)
+
+    result = processor._call_openrouter("Текст")
+
+    assert result == processor._empty_result()
+    assert cache_repo.count() == 0
+
+
+def test_cache_error_falls_back_to_request(counted_posts):
+    class BrokenRepo:
+        def get(self, *args, **kwargs):
+            raise RuntimeError("database disk image is malformed")
+
+        def save(self, entry):
+            raise RuntimeError("database disk image is malformed")
+
+    processor = AIProcessorService(api_key="test", cache_repo=BrokenRepo())
+
+    assert processor._call_openrouter("Текст")["city"] == "Казань"
+    assert len(counted_posts) == 1
+
+
+def _entry(text_hash: str, age_days: float, used_days_ago: float) -> LLMCacheEntry:
+    now = datetime.now()
+    return LLMCacheEntry(
+        model="m",
+        prompt_hash="p",
+        text_hash=text_hash,
+        response=json.dumps({"text": text_hash}),
+        created_at=now - timedelta(days=age_days),
+        last_used_at=now - timedelta(days=used_days_ago),
+    )
+
+
+def test_ttl_hides_and_evicts_old_entries(cache_repo):
+    cache_repo.save(_entry("old", age_days=40, used_days_ago=1))
+    cache_repo.save(_entry("new", age_days=1, used_days_ago=1))
+    ttl_s = 30 * 86400
+
+    assert cache_repo.get("m", "p", "old", ttl_s=ttl_s) is None
+    assert cache_repo.get("m", "p", "old") is not None
+    assert cache_repo.evict(ttl_s=ttl_s) == 1
+    assert [entry.text_hash for entry in cache_repo.get_all()] == ["new"]
+
+
+def test_size_limit_evicts_least_recently_used(cache_repo):
+    for index, used_days_ago in enumerate([5, 1, 3, 2]):
+        cache_repo.save(_entry(f"t{index}", age_days=10, used_days_ago=used_days_ago))
+
+    # Попадание обновляет last_used_at: t0 становится самой свежей записью
+    hit = cache_repo.get("m", "p", "t0")
+    assert hit.response == json.dumps({"text": "t0"})
+
+    assert cache_repo.evict(max_entries=2) == 2
+    remaining = {entry.text_hash: entry.hits for entry in cache_repo.get_all()}
+    assert remaining == {"t0": 1, "t1": 0}
@@ -0,0 +1,64 @@
+"""Тесты бэкендов извлечения текста из PDF (text_extraction.PDF_BACKENDS)."""
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+pytest.importorskip("pdfplumber")
+
+import text_extraction
+from text_extraction import PDF_BACKENDS, extract_text_from_pdf
+
+PDF_PATH = Path(__file__).resolve().parent / "fixtures" / "pdf" / "text_3_pages.pdf"
+
+
+def _available(name: str) -> bool:
+    try:
+        PDF_BACKENDS[name](str(PDF_PATH), 1)
+    except ImportError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("backend", list(PDF_BACKENDS))
+def test_backends_extract_same_lines(backend):
+    if not _available(backend):
+        pytest.skip(f"{backend} не установлен")
+    text = extract_text_from_pdf(str(PDF_PATH), backends=backend, max_pages=0)
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    assert lines[:2] == [
+        "TECHNICAL SPECIFICATION",
+        "Object: one-room apartment, total area not less than 33 sq m",
+    ]
+    assert "Address: Perm, Lenina st. 10" in lines
+
+
+@pytest.mark.parametrize("backend", list(PDF_BACKENDS))
+def test_page_cap_and_stream_source(backend):
+    if not _available(backend):
+        pytest.skip(f"{backend} не установлен")
+    stream = io.BytesIO(PDF_PATH.read_bytes())
+    text = extract_text_from_pdf(stream, backends=[backend], max_pages=2)
+    assert "DRAFT CONTRACT" in text
+    assert "Appendix 1" not in text
+
+
+def test_falls_back_to_next_backend(monkeypatch):
+    def broken(path, max_pages):
+        raise RuntimeError("damaged xref")
+
+    monkeypatch.setitem(text_extraction.PDF_BACKENDS, "broken", broken)
+    text = extract_text_from_pdf(str(PDF_PATH), backends="broken,pdfplumber", max_pages=0)
+    assert "TECHNICAL SPECIFICATION" in text
+
+    error = extract_text_from_pdf(str(PDF_PATH), backends=["broken"], max_pages=0)
+    assert error.startswith("Ошибка извлечения текста для PDF")
+    assert "damaged xref" in error
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        extract_text_from_pdf(str(PDF_PATH), backends="mupdf")
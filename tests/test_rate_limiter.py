@@ -0,0 +1,78 @@
+"""Тесты ограничителя частоты запросов (utils.rate_limiter)."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from utils.rate_limiter import AdaptiveRateLimiter, backoff_delay, parse_retry_after
+
+
+class FakeClock:
+    """Часы, которые двигает только sleep()."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers: dict = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def _limiter(clock: FakeClock, **kwargs) -> AdaptiveRateLimiter:
+    params = {"rate": 2.0, "max_rate": 4.0, "min_rate": 0.5}
+    params.update(kwargs)
+    return AdaptiveRateLimiter("test", clock=clock, sleep=clock.sleep, **params)
+
+
+def test_backoff_is_bounded():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base_s=1.0, max_s=8.0) <= 8.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_token_bucket_paces_requests():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    for _ in range(5):
+        limiter.acquire("host")
+    # Первый токен есть сразу, остальные — по 0.5 с при 2 запр/с
+    assert clock.now == 2.0
+
+
+def test_rate_adapts_to_errors():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    limiter.on_failure("host", throttled=True)
+    assert limiter.rate("host") == 1.0
+    limiter.on_failure("host", throttled=True)
+    limiter.on_failure("host", throttled=True)
+    assert limiter.rate("host") == 0.5
+    for _ in range(100):
+        limiter.on_success("host")
+    assert limiter.rate("host") == 4.0
+
+
+def test_call_honors_retry_after():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    responses = [FakeResponse(429, {"Retry-After": "30"}), FakeResponse(200)]
+
+    resp = limiter.call("host", lambda: responses.pop(0), attempts=3)
+
+    assert resp.status_code == 200
+    assert clock.now >= 30
+    assert limiter.stats["host"] == {"ok": 1, "throttled": 1, "errors": 0}
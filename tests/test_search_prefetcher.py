@@ -0,0 +1,74 @@
+"""Тесты упреждающей загрузки страниц поиска (services.search_prefetcher)."""
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from services.search_prefetcher import SearchPagePrefetcher
+
+
+class FakeSearch:
+    """Страницы поиска с задержкой; страницы из failed не загружаются."""
+
+    def __init__(self, delay_s: float = 0.0, failed=()):
+        self.delay_s = delay_s
+        self.failed = set(failed)
+        self.fetched = []
+        self._lock = threading.Lock()
+
+    def fetch(self, page: int):
+        time.sleep(random.uniform(0, self.delay_s))
+        with self._lock:
+            self.fetched.append(page)
+        if page in self.failed:
+            return None
+        return f"page-{page}"
+
+    @staticmethod
+    def parse(html: str):
+        return [{"reg_number": html}]
+
+
+def test_pages_come_in_order():
+    search = FakeSearch(delay_s=0.02, failed={3})
+    with SearchPagePrefetcher(search.fetch, search.parse, max_pages=8, prefetch=2, workers=4) as pages:
+        result = list(pages)
+
+    assert [page for page, _ in result] == list(range(1, 9))
+    assert result[2][1] is None
+    assert result[0][1] == [{"reg_number": "page-1"}]
+
+
+def test_early_stop_bounds_lookahead():
+    search = FakeSearch()
+    with SearchPagePrefetcher(search.fetch, search.parse, max_pages=100, prefetch=2, workers=2) as pages:
+        for page, _ in pages:
+            if page == 3:
+                break
+        time.sleep(0.05)
+
+    # Вперёд загружается не больше очереди и числа потоков
+    assert max(search.fetched) <= 3 + 2 + 2 + 1
+    fetched_after_close = len(search.fetched)
+    time.sleep(0.05)
+    assert len(search.fetched) == fetched_after_close
+
+
+def test_fetch_overlaps_with_processing():
+    search = FakeSearch()
+
+    def slow_fetch(page):
+        time.sleep(0.05)
+        return search.fetch(page)
+
+    start = time.perf_counter()
+    with SearchPagePrefetcher(slow_fetch, search.parse, max_pages=6, prefetch=2, workers=2) as pages:
+        for _ in pages:
+            time.sleep(0.05)  # обработка закупок страницы
+    elapsed = time.perf_counter() - start
+
+    # Последовательно было бы 6 * (0.05 + 0.05) = 0.6 с
+    assert elapsed < 0.5
@@ -0,0 +1,89 @@
+"""Тесты профилей поиска ЕИС (config.search_profiles) и обхода нескольких профилей."""
+import json
+import sys
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config.search_profiles import SearchProfile, default_search_profile, load_search_profiles
+from services.search_prefetcher import SearchPagePrefetcher, interleave_pages
+
+
+def _query(url: str) -> dict:
+    return {k: v[0] for k, v in parse_qs(urlparse(url).query).items()}
+
+
+def test_default_profile_url():
+    query = _query(default_search_profile().search_url(3))
+
+    assert query["okpd2IdsCodes"] == "68.10.11.000"
+    assert query["okpd2Ids"] == "8890776"
+    assert query["sortBy"] == "UPDATE_DATE"
+    assert query["search-filter"] == "Дате обновления"
+    assert query["pageNumber"] == "3"
+
+
+def test_profile_params_and_page_size():
+    profile = SearchProfile(
+        name="flats",
+        okpd2_codes=["68.10.11.000", "68.10.12.000"],
+        search_string="квартира",
+        records_per_page=500,
+        params={"fz44": "off"},
+    )
+    query = _query(profile.search_url(1))
+
+    assert query["recordsPerPage"] == "_500"
+    assert query["okpd2IdsCodes"] == "68.10.11.000,68.10.12.000"
+    assert query["searchString"] == "квартира"
+    assert query["fz44"] == "off"
+    assert "okpd2Ids" not in query
+
+
+def test_invalid_page_size_rejected():
+    with pytest.raises(ValueError):
+        SearchProfile(name="bad", records_per_page=30)
+
+
+def test_load_profiles_from_json(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps([
+        {"name": "a", "okpd2_codes": ["68.10.11.000"], "records_per_page": 100},
+        {"name": "b", "search_string": "жилое помещение"},
+    ]), encoding="utf-8")
+
+    profiles = load_search_profiles(str(path))
+
+    assert [p.name for p in profiles] == ["a", "b"]
+    assert profiles[0].records_per_page == 100
+
+    path.write_text(json.dumps([{"name": "a"}, {"name": "a"}]), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_search_profiles(str(path))
+
+
+def test_interleave_pages_round_robin_and_close():
+    def source(name, pages):
+        return SearchPagePrefetcher(
+            lambda page: f"{name}{page}",
+            lambda html: [html],
+            max_pages=pages,
+            prefetch=1,
+            workers=1,
+        )
+
+    sources = {"a": source("a", 3), "b": source("b", 5)}
+    seen = []
+    try:
+        for name, page, purchases in interleave_pages(sources):
+            seen.append(purchases[0])
+            if purchases[0] == "b2":
+                sources["b"].close()
+    finally:
+        for src in sources.values():
+            src.close()
+
+    assert seen == ["a1", "b1", "a2", "b2", "a3"]
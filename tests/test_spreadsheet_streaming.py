@@ -0,0 +1,74 @@
+"""Тесты потокового чтения таблиц с ограничениями на лист."""
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from config.settings import settings
+from text_extraction import SHEET_TRUNCATED, extract_text_from_excel
+
+
+def _xlsx_bytes(rows: list, title: str = "Смета") -> bytes:
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.title = title
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    def apply(rows=0, cols=0, chars=0):
+        monkeypatch.setattr(settings, "sheet_max_rows", rows)
+        monkeypatch.setattr(settings, "sheet_max_cols", cols)
+        monkeypatch.setattr(settings, "sheet_max_chars", chars)
+    apply()
+    return apply
+
+
+def test_values_are_read_row_by_row(limits):
+    content = _xlsx_bytes([["Наименование", "Кол-во"], ["Квартира", 3], [None, None], ["Итого", 3]])
+
+    text = extract_text_from_excel(io.BytesIO(content))
+
+    assert text == "=== Лист Смета ===\nНаименование Кол-во\nКвартира 3\nИтого 3"
+
+
+def test_row_and_column_caps(limits):
+    content = _xlsx_bytes([[f"r{i}c{j}" for j in range(5)] for i in range(50)])
+
+    limits(rows=3, cols=2)
+    text = extract_text_from_excel(io.BytesIO(content))
+
+    assert text.splitlines() == ["=== Лист Смета ===", "r0c0 r0c1", "r1c0 r1c1", "r2c0 r2c1", SHEET_TRUNCATED]
+
+
+def test_char_cap_per_sheet(limits):
+    content = _xlsx_bytes([["x" * 40] for _ in range(100)])
+
+    limits(chars=100)
+    text = extract_text_from_excel(io.BytesIO(content))
+
+    assert text.splitlines() == ["=== Лист Смета ==="] + ["x" * 40] * 2 + [SHEET_TRUNCATED]
+
+
+def test_distant_cell_does_not_pad_rows(limits):
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet["A1"] = "Начало"
+    sheet["XFD1000"] = "Конец"
+    buffer = io.BytesIO()
+    wb.save(buffer)
+
+    limits(cols=10)
+    text = extract_text_from_excel(buffer)
+
+    assert text == "=== Лист Sheet ===\nНачало"
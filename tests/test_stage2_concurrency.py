@@ -0,0 +1,92 @@
+"""Тесты параллельной ИИ-обработки закупок (Stage 2)."""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+pytest.importorskip("requests")
+
+from models.ai_result import AIResult
+from models.zakupka import Zakupka
+from services.ai_processor_service import AIProcessorService
+
+
+class SlowProcessor(AIProcessorService):
+    """Вместо OpenRouter — задержка; считает одновременные запросы."""
+
+    def __init__(self, repo=None, delay: float = 0.05):
+        super().__init__(repo, api_key="test")
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def process_zakupka(self, zakupka):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay * (3 if zakupka.reg_number == "0" else 1))
+            if zakupka.reg_number == "boom":
+                raise RuntimeError("сбой")
+            return AIResult.from_dict({"reg_number": zakupka.reg_number, "city": f"Город {zakupka.reg_number}"})
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FakeRepo:
+    def __init__(self, existing=()):
+        self.saved = {reg: AIResult.from_dict({"reg_number": reg}) for reg in existing}
+        self.save_threads = set()
+
+    def get_by_id(self, reg_number):
+        return self.saved.get(reg_number)
+
+    def save(self, result):
+        self.save_threads.add(threading.current_thread().name)
+        self.saved[result.reg_number] = result
+        return True
+
+
+def _zakupki(*reg_numbers):
+    return [Zakupka(reg_number=reg, combined_text="текст") for reg in reg_numbers]
+
+
+def test_in_flight_requests_are_bounded_and_results_arrive_as_completed():
+    processor = SlowProcessor()
+
+    started = time.monotonic()
+    results = list(processor.process_many(_zakupki(*map(str, range(8))), max_in_flight=3))
+    elapsed = time.monotonic() - started
+
+    assert processor.max_active == 3
+    assert sorted(z.reg_number for z, _result, _error in results) == sorted(map(str, range(8)))
+    # Долгая первая закупка не задерживает остальные
+    assert results[0][0].reg_number != "0"
+    assert elapsed < 8 * processor.delay
+
+
+def test_errors_are_reported_per_purchase():
+    processor = SlowProcessor()
+
+    results = {z.reg_number: (result, error) for z, result, error in processor.process_many(_zakupki("1", "boom"), 2)}
+
+    assert results["1"][0].city == "Город 1" and results["1"][1] is None
+    assert results["boom"][0] is None and isinstance(results["boom"][1], RuntimeError)
+
+
+def test_process_and_save_skips_existing_and_saves_in_caller_thread():
+    repo = FakeRepo(existing=["2"])
+    processor = SlowProcessor(repo)
+
+    processed, cities, errors = processor.process_and_save(_zakupki("1", "2", "3", "boom"), max_in_flight=4)
+
+    assert processed == 2
+    assert sorted(cities) == ["Город 1", "Город 3"]
+    assert errors == ["boom: сбой"]
+    assert repo.save_threads == {threading.current_thread().name}
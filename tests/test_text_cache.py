@@ -0,0 +1,67 @@
+"""Тесты кэша извлечённого текста (services.text_cache)."""
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+pytest.importorskip("pdfplumber")
+
+import text_extraction
+from config.settings import settings
+from services import text_cache
+from services.text_cache import TextCache
+
+PDF_PATH = Path(__file__).resolve().parent / "fixtures" / "pdf" / "text_3_pages.pdf"
+
+
+@pytest.fixture
+def counted_extraction(tmp_path, monkeypatch):
+    """Включает кэш в tmp_path и считает настоящие извлечения."""
+    monkeypatch.setattr(settings, "text_cache_enabled", True)
+    monkeypatch.setattr(settings, "text_cache_dir", str(tmp_path / "text_cache"))
+    monkeypatch.setattr(text_cache, "_text_cache", None)
+    calls = []
+    original = text_extraction._extract_uncached
+
+    def counting(path, name=None):
+        calls.append(name)
+        return original(path, name)
+
+    monkeypatch.setattr(text_extraction, "_extract_uncached", counting)
+    return calls
+
+
+def test_identical_files_extracted_once(counted_extraction, tmp_path):
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(PDF_PATH.read_bytes())
+
+    first = text_extraction.extract_text_from_any_file(str(PDF_PATH))
+    second = text_extraction.extract_text_from_any_file(str(copy))
+    third = text_extraction.extract_text_from_any_file(io.BytesIO(PDF_PATH.read_bytes()), "contract.pdf")
+
+    assert first == second == third
+    assert "TECHNICAL SPECIFICATION" in first
+    assert len(counted_extraction) == 1
+    assert text_cache.get_text_cache().stats == {"hits": 2, "misses": 1, "stores": 1}
+
+
+def test_errors_not_cached(counted_extraction, tmp_path):
+    unknown = tmp_path / "notes.bin"
+    unknown.write_bytes(b"\x00\x01 not a document")
+
+    for _ in range(2):
+        assert text_extraction.extract_text_from_any_file(str(unknown)).startswith("Неизвестный тип")
+    assert len(counted_extraction) == 2
+
+
+def test_version_change_invalidates(tmp_path):
+    old = TextCache(str(tmp_path), version="1;pdf=pdfplumber")
+    old.put("ab" * 32, "старый текст")
+    assert old.get("ab" * 32) == "старый текст"
+
+    new = TextCache(str(tmp_path), version="1;pdf=pypdfium2")
+    assert new.get("ab" * 32) is None
+    assert new.stats["misses"] == 1
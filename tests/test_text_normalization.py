@@ -0,0 +1,78 @@
+"""Тесты очистки текста перед сохранением в combined_text."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from text_normalization import PAGE_BREAK, NormalizationStats, ParagraphDeduplicator, normalize_text
+
+
+def _pdf_text(pages: int) -> str:
+    return PAGE_BREAK.join(
+        "Муниципальный контракт № 0148300012524000017\n"
+        f"Раздел {page}: квартира площадью {30 + page} кв. м\n"
+        "ДОКУМЕНТ ПОДПИСАН ЭЛЕКТРОННОЙ ПОДПИСЬЮ\n"
+        f"Страница {page} из {pages}"
+        for page in range(1, pages + 1)
+    )
+
+
+def test_repeated_headers_and_page_numbers_are_removed():
+    stats = NormalizationStats()
+
+    text = normalize_text(_pdf_text(5), stats)
+
+    assert text.splitlines() == ["Муниципальный контракт № 0148300012524000017"] + [
+        f"Раздел {page}: квартира площадью {30 + page} кв. м" for page in range(1, 6)
+    ]
+    assert stats.documents == 1
+    assert stats.repeated_lines == 4
+    assert stats.boilerplate_lines == 10
+    assert stats.bytes_after < stats.bytes_before // 2
+
+
+def test_short_documents_keep_lines_and_number_only_rows():
+    text = "Смета\n\n\n\n1\n2\t   Квартира  \n=== Файл внутри архива: 1.pdf ==="
+
+    assert normalize_text(text) == "Смета\n\n1\n2\tКвартира\n=== Файл внутри архива: 1.pdf ==="
+
+
+def test_archive_markers_are_not_treated_as_headers():
+    pages = [f"=== Файл внутри архива: {i}.pdf ===\nТекст {i}" for i in range(4)]
+
+    assert normalize_text(PAGE_BREAK.join(pages)) == "\n".join(pages)
+
+
+def test_paragraphs_seen_in_earlier_documents_are_removed():
+    shared = "Участник закупки должен соответствовать требованиям статьи 31 Закона № 44-ФЗ"
+    unique = "Квартира должна располагаться не выше пятого этажа многоквартирного дома"
+    row = "Жилое помещение, однокомнатная квартира, площадь не менее 33 кв. м"
+    dedup = ParagraphDeduplicator()
+    # bytes_after уже посчитан normalize_text, dedupe вычитает удалённое
+    stats = NormalizationStats(bytes_after=1000)
+
+    print_form = dedup.dedupe(f"{shared}\nИтого", stats)
+    spec = dedup.dedupe(
+        f"=== Файл внутри архива: ТЗ.docx ===\n{shared.upper()}\nИтого\n{unique}\n{row}\n{row}", stats
+    )
+    contract = dedup.dedupe(f"  {unique}  ", stats)
+
+    assert print_form == f"{shared}\nИтого"
+    # Короткие строки, маркеры и повторы внутри документа остаются
+    assert spec == f"=== Файл внутри архива: ТЗ.docx ===\nИтого\n{unique}\n{row}\n{row}"
+    assert contract == ""
+    assert stats.duplicate_lines == 2
+    removed = len(f"\n{shared.upper()}".encode()) + len(f"  {unique}  ".encode())
+    assert stats.bytes_after == 1000 - removed
+
+
+def test_owner_line_is_removed_only_inside_signature_stamp():
+    stamp = (
+        "Сведения о сертификате ЭП\n"
+        "Сертификат: 01 23 45 67 89 AB CD EF 01 23\n"
+        "Владелец: Иванов Иван Иванович\n"
+        "Действителен: с 01.02.2024 по 01.05.2025"
+    )
+    body = "Владелец: Петров Пётр Петрович\nКвартира в собственности с 2019 года"
+
+    assert normalize_text(f"{body}\n\n{stamp}") == body
@@ -0,0 +1,280 @@
+"""Тесты определения типа файла за один проход."""
+import builtins
+import io
+import struct
+import sys
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+pytest.importorskip("pdfplumber")
+
+import text_extraction
+from config.settings import settings
+from services import text_cache
+from test_doc_extraction import _word_streams
+
+PDF_PATH = Path(__file__).resolve().parent / "fixtures" / "pdf" / "text_3_pages.pdf"
+
+OLE_SECTOR = 512
+OLE_FREE, OLE_END, OLE_FATSECT = 0xFFFFFFFF, 0xFFFFFFFE, 0xFFFFFFFD
+
+
+def _ole_bytes(streams: dict) -> bytes:
+    """Составной файл OLE (CFB v3) с потоками в корне; потоки дополняются до 4096 байт."""
+    sectors, chains, entries = [], [], []
+    for name, data in streams.items():
+        data = data.ljust(4096, b"\0")
+        start, count = len(sectors), -(-len(data) // OLE_SECTOR)
+        sectors += [data[i * OLE_SECTOR:(i + 1) * OLE_SECTOR].ljust(OLE_SECTOR, b"\0") for i in range(count)]
+        chains.append((start, count))
+        entries.append((name, 2, start, len(data)))
+
+    # Каталог: корень, у него первый поток, остальные — цепочкой правых соседей
+    entries = [("Root Entry", 5, OLE_END, 0)] + entries
+    directory = b""
+    for index, (name, kind, start, size) in enumerate(entries):
+        encoded = (name + "\0").encode("utf-16-le")
+        child = 1 if index == 0 and len(entries) > 1 else OLE_FREE
+        right = index + 1 if 0 < index < len(entries) - 1 else OLE_FREE
+        directory += (
+            encoded.ljust(64, b"\0") + struct.pack("<HBB3I", len(encoded), kind, 1, OLE_FREE, right, child)
+            + bytes(36) + struct.pack("<IQ", start, size)
+        )
+    directory = directory.ljust(-(-len(directory) // OLE_SECTOR) * OLE_SECTOR, b"\0")
+    dir_start, dir_count = len(sectors), len(directory) // OLE_SECTOR
+    sectors += [directory[i * OLE_SECTOR:(i + 1) * OLE_SECTOR] for i in range(dir_count)]
+
+    fat_sector = len(sectors)
+    fat = [OLE_FREE] * 128
+    for start, count in chains + [(dir_start, dir_count)]:
+        for i in range(count):
+            fat[start + i] = start + i + 1 if i < count - 1 else OLE_END
+    fat[fat_sector] = OLE_FATSECT
+    sectors.append(struct.pack("<128I", *fat))
+    header = (
+        text_extraction.OLE_SIGNATURE + bytes(16)
+        + struct.pack("<5H", 0x3E, 3, 0xFFFE, 9, 6) + bytes(6)
+        + struct.pack("<9I", 0, 1, dir_start, 0, 4096, OLE_END, 0, OLE_END, 0)
+        + struct.pack("<109I", fat_sector, *([OLE_FREE] * 108))
+    )
+    return header + b"".join(sectors)
+
+
+def _biff_record(kind: int, data: bytes = b"") -> bytes:
+    return struct.pack("<HH", kind, len(data)) + data
+
+
+def _xls_bytes(rows: list, title: str = "Смета") -> bytes:
+    """Книга XLS (BIFF8) с одним листом: строки — текст, числа — NUMBER."""
+    def bof(kind):
+        return _biff_record(0x0809, struct.pack("<HHHHII", 0x0600, kind, 0, 0, 0, 0))
+
+    def boundsheet(offset):
+        return _biff_record(0x0085, struct.pack("<IBBBB", offset, 0, 0, len(title), 1) + title.encode("utf-16-le"))
+
+    workbook_globals = bof(0x05) + boundsheet(0) + _biff_record(0x000A)
+    cells = b""
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            if isinstance(value, str):
+                cells += _biff_record(0x0204, struct.pack("<HHHHB", r, c, 0, len(value), 1) + value.encode("utf-16-le"))
+            else:
+                cells += _biff_record(0x0203, struct.pack("<HHHd", r, c, 0, value))
+    dimensions = _biff_record(0x0200, struct.pack("<IIHHH", 0, len(rows), 0, max(map(len, rows)), 0))
+    sheet = bof(0x10) + dimensions + cells + _biff_record(0x000A)
+    workbook = bof(0x05) + boundsheet(len(workbook_globals)) + _biff_record(0x000A) + sheet
+    return _ole_bytes({"Workbook": workbook})
+
+
+def _doc_bytes() -> bytes:
+    word, tables = _word_streams("Hello\r", "Привет", len("Hello\r") + len("Привет"))
+    return _ole_bytes({"WordDocument": word, **tables})
+
+
+def _docx_bytes(text: str) -> bytes:
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _xlsx_bytes(rows: list) -> bytes:
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def counted_containers(monkeypatch):
+    """Считает открытия ZIP- и OLE-контейнеров, в том числе внутри python-docx, openpyxl и xlrd."""
+    counts = {"zip": 0, "ole": 0}
+
+    class CountingZipFile(zipfile.ZipFile):
+        def __init__(self, *args, **kwargs):
+            counts["zip"] += 1
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(text_extraction.zipfile, "ZipFile", CountingZipFile)
+    for module_name in ("docx.opc.phys_pkg", "openpyxl.reader.excel"):
+        module = pytest.importorskip(module_name)
+        monkeypatch.setattr(module, "ZipFile", CountingZipFile)
+
+    olefile = pytest.importorskip("olefile")
+    compdoc = pytest.importorskip("xlrd.compdoc")
+
+    class CountingOleFileIO(olefile.OleFileIO):
+        def __init__(self, *args, **kwargs):
+            counts["ole"] += 1
+            super().__init__(*args, **kwargs)
+
+    class CountingCompDoc(compdoc.CompDoc):
+        def __init__(self, *args, **kwargs):
+            counts["ole"] += 1
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(olefile, "OleFileIO", CountingOleFileIO)
+    monkeypatch.setattr(compdoc, "CompDoc", CountingCompDoc)
+    return counts
+
+
+@pytest.fixture
+def counted_opens(tmp_path, monkeypatch, counted_containers):
+    """Считает открытия файлов, ZIP-архивов и OLE-файлов внутри text_extraction."""
+    monkeypatch.setattr(settings, "text_cache_enabled", True)
+    monkeypatch.setattr(settings, "text_cache_dir", str(tmp_path / "text_cache"))
+    monkeypatch.setattr(text_cache, "_text_cache", None)
+    counts = counted_containers
+    counts["open"] = 0
+
+    def counting_open(*args, **kwargs):
+        counts["open"] += 1
+        return builtins.open(*args, **kwargs)
+
+    monkeypatch.setattr(text_extraction, "open", counting_open, raising=False)
+    return counts
+
+
+def test_file_is_opened_once_for_hash_sniff_and_extract(counted_opens):
+    text = text_extraction.extract_text_from_any_file(str(PDF_PATH))
+
+    assert text_extraction.is_extracted_text(text)
+    assert counted_opens["open"] == 1
+
+
+def test_archive_is_opened_once_and_handed_to_extractor(counted_opens, tmp_path):
+    archive = tmp_path / "docs.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(PDF_PATH, "a.pdf")
+        zf.write(PDF_PATH, "b.pdf")
+    counted_opens["zip"] = 0
+
+    text = text_extraction.extract_text_from_any_file(str(archive))
+
+    assert "=== Файл внутри архива: b.pdf ===" in text
+    assert counted_opens == {"open": 1, "zip": 1, "ole": 0}
+
+
+@pytest.mark.parametrize("name, make, expected", [
+    ("contract.docx", lambda: _docx_bytes("Проект контракта"), "Проект контракта"),
+    ("estimate.xlsx", lambda: _xlsx_bytes([["Квартира", 3]]), "Квартира 3"),
+    ("spec.doc", _doc_bytes, "Hello\nПривет"),
+    ("estimate.xls", lambda: _xls_bytes([["Квартира", 3.0]]), "Квартира\t3"),
+])
+def test_office_container_is_opened_once_and_handed_to_extractor(counted_opens, name, make, expected):
+    content = make()
+    counted_opens.update(zip=0, ole=0)
+
+    text = text_extraction.extract_text_from_any_file(io.BytesIO(content), name, use_cache=False)
+
+    assert expected in text
+    assert counted_opens["zip"] + counted_opens["ole"] == 1
+
+
+@pytest.mark.parametrize("members, expected", [
+    ({"word/document.xml": "<w/>"}, "docx"),
+    ({"xl/workbook.xml": "<x/>"}, "xlsx"),
+    ({"contract.docx": "x", "scan.pdf": "y"}, "zip"),
+])
+def test_zip_containers_are_classified(members, expected):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+
+    assert text_extraction.detect_type_by_signature(buffer) == expected
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.content = body
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_bytes(self, chunk_size: int):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+
+class FakeHttp:
+    def __init__(self, files: dict):
+        self.files = files
+
+    @contextmanager
+    def stream(self, url, headers=None, timeout=60, attempts=None):
+        yield FakeResponse(self.files[url])
+
+
+def test_downloader_with_pool_sniffs_each_attachment_once(tmp_path, monkeypatch, counted_containers):
+    pytest.importorskip("requests")
+    from services.eis_downloader_service import EISDownloaderService
+    from services.extraction_service import TextExtractionService
+
+    monkeypatch.setattr(settings, "http_cache_enabled", False)
+    monkeypatch.setattr(settings, "text_cache_enabled", False)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("ТЗ.docx", _docx_bytes("Техническое задание"))
+        zf.write(PDF_PATH, "scan.pdf")
+    files = {
+        "https://eis/zip": archive.getvalue(),
+        "https://eis/docx": _docx_bytes("Проект контракта"),
+        "https://eis/pdf": PDF_PATH.read_bytes(),
+    }
+    extractor = TextExtractionService(workers=1, timeout_s=60, memory_mb=0, max_tasks_per_child=0)
+    service = EISDownloaderService(
+        zakupki_dir=str(tmp_path / "zakupki"), http_client=FakeHttp(files), extractor=extractor
+    )
+    counted_containers.update(zip=0, ole=0)
+
+    try:
+        text = service.fetch_combined_text(
+            "0373100000124000001",
+            docs=[
+                {"name": "Документация.zip", "url": "https://eis/zip"},
+                {"name": "Проект контракта.docx", "url": "https://eis/docx"},
+                {"name": "Приложение.pdf", "url": "https://eis/pdf"},
+            ],
+            print_form_text="Извещение",
+        )
+    finally:
+        service.close()
+        extractor.shutdown()
+
+    assert "=== Файл внутри архива: ТЗ.docx ===\nТехническое задание" in text
+    assert "=== Файл внутри архива: scan.pdf ===" in text
+    assert "Проект контракта" in text
+    # В родительском процессе открыт только архив, один раз; остальное — в пуле
+    assert counted_containers == {"zip": 1, "ole": 0}
@@ -0,0 +1,50 @@
+"""Тест пакетной проверки наличия закупок (ZakupkaRepository.get_text_presence)."""
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from models.zakupka import Zakupka
+from repositories.zakupka_repo import ZakupkaRepository
+
+
+def _repo(tmp_path) -> ZakupkaRepository:
+    repo = ZakupkaRepository(str(tmp_path / "test.db"))
+    assert repo.create_table()
+    return repo
+
+
+def test_presence_flags(tmp_path):
+    repo = _repo(tmp_path)
+    repo.save(Zakupka(reg_number="A", combined_text="текст закупки"))
+    repo.save(Zakupka(reg_number="B", combined_text=""))
+
+    presence = repo.get_text_presence(["A", "B", "C"])
+
+    assert presence == {"A": True, "B": False}
+
+
+def test_presence_uses_covering_index(tmp_path):
+    repo = _repo(tmp_path)
+    with repo.get_connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT reg_number, text_length FROM zakupki "
+            "INDEXED BY idx_zakupki_text_length WHERE reg_number IN (?, ?)",
+            ("A", "B")
+        ).fetchall()
+    assert any("COVERING INDEX" in row[3] for row in plan)
+
+
+def test_text_length_backfilled_for_old_db(tmp_path):
+    db_path = tmp_path / "old.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE zakupki (reg_number TEXT PRIMARY KEY, combined_text TEXT)")
+    conn.execute("INSERT INTO zakupki VALUES ('OLD', 'старый текст')")
+    conn.commit()
+    conn.close()
+
+    repo = ZakupkaRepository(str(db_path))
+    assert repo.create_table()
+
+    assert repo.get_text_presence(["OLD"]) == {"OLD": True}
@@ -0,0 +1,138 @@
+"""Тесты чтения ZIP-архивов в памяти: отбор файлов, вложенность, zip-бомбы."""
+import io
+import sys
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+docx = pytest.importorskip("docx")
+
+from config.settings import settings
+from text_extraction import extract_text_from_any_file, extract_text_from_zip, is_zip_archive, iter_zip_members
+
+
+@pytest.fixture(autouse=True)
+def no_text_cache(monkeypatch):
+    monkeypatch.setattr(settings, "text_cache_enabled", False)
+
+
+def _docx_bytes(*paragraphs: str) -> bytes:
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _zip_bytes(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_zip_is_read_without_extractall(monkeypatch):
+    def forbidden(*args, **kwargs):
+        raise AssertionError("extractall не должен вызываться")
+
+    monkeypatch.setattr(zipfile.ZipFile, "extractall", forbidden)
+    archive = _zip_bytes({
+        "ТЗ.docx": _docx_bytes("Техническое задание"),
+        "scan.jpg": b"\xff\xd8\xff" + b"0" * 100,
+        "nested.zip": _zip_bytes({"contract.docx": _docx_bytes("Проект контракта")}),
+    })
+
+    assert is_zip_archive(io.BytesIO(archive))
+    names = [name for name, _data in iter_zip_members(io.BytesIO(archive))]
+    assert names == ["ТЗ.docx", "nested.zip/contract.docx"]
+
+    text = extract_text_from_any_file(io.BytesIO(archive), "docs.zip")
+    assert "=== Файл внутри архива: ТЗ.docx ===\nТехническое задание" in text
+    assert "=== Файл внутри архива: contract.docx ===\nПроект контракта" in text
+
+
+def test_cp866_member_names_are_decoded():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        info = zipfile.ZipInfo("placeholder.docx")
+        zf.writestr(info, _docx_bytes("Текст"))
+    # Имя в cp866 без флага UTF-8, как пишут архиваторы Windows
+    raw = buffer.getvalue().replace(b"placeholder", "договор№01".encode("cp866").ljust(11, b"_"))
+
+    names = [name for name, _data in iter_zip_members(io.BytesIO(raw))]
+    assert names == ["договор№01_.docx"]
+
+
+def test_nesting_depth_is_capped():
+    level2 = _zip_bytes({"deep.docx": _docx_bytes("Глубоко")})
+    level1 = _zip_bytes({"level2.zip": level2, "top.docx": _docx_bytes("Сверху")})
+    archive = _zip_bytes({"level1.zip": level1})
+
+    names = [name for name, _data in iter_zip_members(io.BytesIO(archive), max_depth=1)]
+    assert names == ["level1.zip/top.docx"]
+    names = [name for name, _data in iter_zip_members(io.BytesIO(archive), max_depth=0)]
+    assert names == []
+
+
+def test_zip_bomb_and_total_size_caps():
+    bomb = _zip_bytes({"bomb.docx": b"\0" * (5 * 1024 * 1024), "ok.doc": b"x" * 1000})
+    names = [name for name, _data in iter_zip_members(io.BytesIO(bomb), max_ratio=100)]
+    assert names == ["ok.doc"]
+
+    archive = _zip_bytes({f"{i}.pdf": bytes(range(256)) * 4 for i in range(5)})
+    members = list(iter_zip_members(io.BytesIO(archive), max_total_bytes=3 * 1024, max_ratio=0))
+    assert [name for name, _data in members] == ["0.pdf", "1.pdf", "2.pdf"]
+
+    members = list(iter_zip_members(io.BytesIO(archive), max_member_bytes=512, max_ratio=0))
+    assert members == []
+
+
+def test_members_are_extracted_through_submit_in_order():
+    archive = _zip_bytes({
+        f"part{i}.docx": _docx_bytes(f"Раздел {i}") for i in range(4)
+    })
+    submitted = []
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        def submit(data, name):
+            submitted.append(name)
+            return executor.submit(extract_text_from_any_file, io.BytesIO(data), name)
+
+        text = extract_text_from_zip(io.BytesIO(archive), submit=submit)
+
+    assert submitted == [f"part{i}.docx" for i in range(4)]
+    assert text.index("Раздел 0") < text.index("Раздел 1") < text.index("Раздел 3")
+
+
+
+def test_submit_keeps_at_most_window_members_in_flight():
+    archive = _zip_bytes({
+        f"part{i}.docx": _docx_bytes(f"Раздел {i}") for i in range(8)
+    })
+    submitted = []
+    collected = []
+    in_flight = []
+
+    class TrackedFuture(Future):
+        def result(self, timeout=None):
+            collected.append(self)
+            return super().result(timeout)
+
+    def submit(data, name):
+        future = TrackedFuture()
+        future.set_result(extract_text_from_any_file(io.BytesIO(data), name))
+        submitted.append(future)
+        in_flight.append(len(submitted) - len(collected))
+        return future
+
+    text = extract_text_from_zip(io.BytesIO(archive), submit=submit, window=2)
+
+    assert max(in_flight) == 2
+    assert len(collected) == 8
+    assert text.index("Раздел 0") < text.index("Раздел 4") < text.index("Раздел 7")